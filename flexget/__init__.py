@@ -10,12 +10,20 @@ from ._version import __version__  # noqa: F401
 
 # isort: split
 from flexget import log
-from flexget.manager import Manager
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
 
+# The manager is only imported when needed, so that commands for a running daemon can be sent without it
+def __getattr__(name: str):
+    if name == 'Manager':
+        from flexget.manager import Manager
+
+        return Manager
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
 def main(args: Sequence[str] | None = None):
     """Execute as the main entry point for Command Line Interface."""
     if args is None:
@@ -23,6 +31,15 @@ def main(args: Sequence[str] | None = None):
     try:
         log.initialize()
 
+        # Hand the command straight to a running daemon when there is one, before importing the
+        # manager, which pulls in the plugin system and the database.
+        from flexget import ipc_client
+
+        if ipc_client.forward_to_daemon(args):
+            return
+
+        from flexget.manager import Manager
+
         try:
             manager = Manager(args)
         except (OSError, ValueError):
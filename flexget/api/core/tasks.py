@@ -65,6 +65,7 @@ class ObjectsContainer:
                 'name': {'type': 'string'},
                 'current_phase': {'type': ['string', 'null']},
                 'current_plugin': {'type': ['string', 'null']},
+                'worker': {'type': ['integer', 'null']},
             },
         },
     }
@@ -378,10 +379,15 @@ class TaskQueueAPI(APIResource):
     @api.response(200, model=task_api_queue_schema)
     def get(self, session: Session = None) -> Response:
         """List task(s) in queue for execution."""
-        tasks = [_task_info_dict(task) for task in self.manager.task_queue.run_queue.queue]
-
-        if self.manager.task_queue.current_task:
-            tasks.insert(0, _task_info_dict(self.manager.task_queue.current_task))
+        task_queue = self.manager.task_queue
+        tasks = [
+            dict(_task_info_dict(task), worker=worker)
+            for worker, task in enumerate(task_queue.workers)
+            if task
+        ]
+        tasks.extend(
+            dict(_task_info_dict(task), worker=None) for task in sorted(task_queue.run_queue.queue)
+        )
 
         return jsonify(tasks)
 
@@ -2,7 +2,22 @@ import re
 from datetime import datetime
 
 from loguru import logger
-from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Table, Unicode
+from sqlalchemy import (
+    DDL,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    Unicode,
+    event,
+    literal_column,
+    select,
+    text,
+)
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm.exc import NoResultFound
 
@@ -11,7 +26,7 @@ from flexget.utils.sqlalchemy_utils import get_index_by_name, table_schema
 
 logger = logger.bind(name='archive.db')
 
-SCHEMA_VER = 0
+SCHEMA_VER = 1
 
 Base = db_schema.versioned_base('archive', SCHEMA_VER)
 
@@ -63,6 +78,76 @@ class ArchiveEntry(Base):
         )
 
 
+# Full text index of archive_entry titles. This is an external content FTS5 table, kept in sync by
+# triggers, so it is not part of Base.metadata and is only ever created with raw DDL.
+fts_table = Table(
+    'archive_entry_fts', MetaData(), Column('rowid', Integer), Column('title', Unicode)
+)
+
+FTS_DDL = [
+    'CREATE VIRTUAL TABLE IF NOT EXISTS archive_entry_fts USING fts5('
+    "title, content='archive_entry', content_rowid='id')",
+    'CREATE TRIGGER IF NOT EXISTS archive_entry_fts_ai AFTER INSERT ON archive_entry BEGIN '
+    'INSERT INTO archive_entry_fts(rowid, title) VALUES (new.id, new.title); END',
+    'CREATE TRIGGER IF NOT EXISTS archive_entry_fts_ad AFTER DELETE ON archive_entry BEGIN '
+    'INSERT INTO archive_entry_fts(archive_entry_fts, rowid, title) '
+    "VALUES ('delete', old.id, old.title); END",
+    'CREATE TRIGGER IF NOT EXISTS archive_entry_fts_au AFTER UPDATE OF title ON archive_entry BEGIN '
+    'INSERT INTO archive_entry_fts(archive_entry_fts, rowid, title) '
+    "VALUES ('delete', old.id, old.title); "
+    'INSERT INTO archive_entry_fts(rowid, title) VALUES (new.id, new.title); END',
+]
+
+
+def create_fts(connection):
+    """Create the full text index with its triggers and (re)build it from archive_entry.
+
+    :return: False if the SQLite library has no FTS5 support, searches then fall back to LIKE.
+    """
+    if connection.dialect.name != 'sqlite':
+        return False
+    try:
+        with connection.begin_nested():
+            for statement in FTS_DDL:
+                connection.execute(DDL(statement))
+            connection.execute(
+                text("INSERT INTO archive_entry_fts(archive_entry_fts) VALUES ('rebuild')")
+            )
+    except OperationalError as e:
+        logger.warning('Unable to create archive full text index, searches will be slow: {}', e)
+        return False
+    return True
+
+
+@event.listens_for(ArchiveEntry.__table__, 'after_create')
+def after_archive_entry_create(target, connection, **kw):
+    create_fts(connection)
+
+
+def fts_available(session):
+    """Return True if the archive full text index exists in the database."""
+    if session.bind.dialect.name != 'sqlite':
+        return False
+    return bool(
+        session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'archive_entry_fts'")
+        ).first()
+    )
+
+
+def fts_query(value):
+    """Build a FTS5 query matching titles which start with the words of the search text.
+
+    The last word is matched as a prefix and the others as whole words, like the regexp in `search`.
+
+    :return: MATCH expression or None if the text does not contain any words.
+    """
+    words = re.findall(r'[^\W_]+', value)
+    if not words:
+        return None
+    return '^"{}"*'.format(' '.join(words))
+
+
 class ArchiveTag(Base):
     __tablename__ = 'archive_tag'
 
@@ -117,6 +202,10 @@ def upgrade(ver, session):
             logger.critical('one time when you have time, it may take hours')
             logger.critical('----------------------------------------------')
         ver = 0
+    if ver == 0:
+        logger.info('Building archive full text index (may take a while) ...')
+        create_fts(session.connection())
+        ver = 1
     return ver
 
 
@@ -154,11 +243,19 @@ def search(session, text, tags=None, sources=None, desc=False):
     :param bool desc: Sort results descending
     :return: ArchiveEntries responding to query
     """
-    keyword = str(text).replace(' ', '%').replace('.', '%')
     # clean the text from any unwanted regexp, convert spaces and keep dots as dots
     normalized_re = re.escape(text.replace('.', ' ')).replace('\\ ', ' ').replace(' ', '.')
     find_re = re.compile(normalized_re, re.IGNORECASE)
-    query = session.query(ArchiveEntry).filter(ArchiveEntry.title.like('%' + keyword + '%'))
+    match = fts_query(text)
+    query = session.query(ArchiveEntry)
+    if match and fts_available(session):
+        # The index narrows candidates down to titles starting with the same words, the regexp below
+        # still decides what is an actual match
+        matching_ids = select(fts_table.c.rowid).where(literal_column(fts_table.name).match(match))
+        query = query.filter(ArchiveEntry.id.in_(matching_ids))
+    else:
+        keyword = str(text).replace(' ', '%').replace('.', '%')
+        query = query.filter(ArchiveEntry.title.like('%' + keyword + '%'))
     if tags:
         query = query.filter(ArchiveEntry.tags.any(ArchiveTag.name.in_(tags)))
     if sources:
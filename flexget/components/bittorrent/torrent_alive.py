@@ -1,8 +1,10 @@
 import binascii
-import itertools
+import contextvars
 import socket
 import struct
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from http.client import BadStatusLine
 from random import randrange
 from urllib.error import URLError
@@ -15,44 +17,59 @@ from flexget import plugin
 from flexget.event import event
 from flexget.utils import requests
 from flexget.utils.bittorrent import bdecode
+from flexget.utils.tools import chunked
 
 logger = logger.bind(name='torrent_alive')
 
-
-class TorrentAliveThread(threading.Thread):
-    _counter = itertools.count()
-
-    def __init__(self, tracker, info_hash):
-        threading.Thread.__init__(self, name=f'torrent_alive-{next(self._counter)}')
-        self.tracker = tracker
-        self.info_hash = info_hash
-        self.tracker_seeds = 0
-
-    def run(self):
-        self.tracker_seeds = get_tracker_seeds(self.tracker, self.info_hash)
-        logger.debug(
-            '{} seeds found from {}',
-            self.tracker_seeds,
-            get_scrape_url(self.tracker, self.info_hash),
-        )
-
-
-def max_seeds_from_threads(threads):
-    """Join the threads and return the maximum seeds found from any of them.
-
-    :param threads: A list of started `TorrentAliveThread`
-    :return: Maximum seeds found from any of the threads
-    """
-    seeds = 0
-    for background in threads:
-        logger.debug('Coming up next: {}', background.tracker)
-        background.join()
-        seeds = max(seeds, background.tracker_seeds)
-        logger.debug('Current highest number of seeds found: {}', seeds)
-    return seeds
-
-
-def get_scrape_url(tracker_url, info_hash):
+# Trackers are scraped concurrently, up to this many at a time
+MAX_WORKERS = 8
+# BEP 15 allows about 74 info hashes in one UDP scrape request
+UDP_MAX_HASHES = 74
+# Keep the query string of HTTP scrape requests to a length all servers accept
+HTTP_MAX_HASHES = 50
+# Connection ids may be used for one minute after the tracker handed them out (BEP 15)
+UDP_CONNECTION_TTL = 60
+UDP_PROTOCOL_ID = 0x41727101980
+
+
+class ScrapeCache:
+    """Seeds scraped from trackers, kept for a short time so tasks checking the same torrents share them."""
+
+    def __init__(self, ttl=300, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._seeds = {}
+        self._lock = threading.Lock()
+
+    def get(self, tracker, info_hash):
+        """Return cached seeds of `info_hash` on `tracker`, or None if they need to be scraped."""
+        with self._lock:
+            seeds, expires = self._seeds.get((tracker, info_hash), (None, 0))
+            if expires <= self.clock():
+                return None
+            return seeds
+
+    def update(self, tracker, seeds):
+        """Store seeds scraped from `tracker`, keyed by info hash."""
+        with self._lock:
+            now = self.clock()
+            expires = now + self.ttl
+            self._seeds = {key: value for key, value in self._seeds.items() if value[1] > now}
+            for info_hash, count in seeds.items():
+                self._seeds[tracker, info_hash] = (count, expires)
+
+
+scrape_cache = ScrapeCache()
+
+# Connection ids of UDP trackers by address, with the time they expire
+_udp_connections = {}
+_udp_connections_lock = threading.Lock()
+
+
+def get_scrape_url(tracker_url, info_hashes):
+    """Return the scrape url of an HTTP tracker for one or more info hashes."""
+    if isinstance(info_hashes, str):
+        info_hashes = [info_hashes]
     if 'announce' in tracker_url:
         v = urlsplit(tracker_url)
         result = urlunsplit([
@@ -67,107 +84,228 @@ def get_scrape_url(tracker_url, info_hash):
         result = tracker_url + '/scrape'
 
     result += '&' if '?' in result else '?'
-    result += f'info_hash={quote(binascii.unhexlify(info_hash))}'
+    result += '&'.join(
+        f'info_hash={quote(binascii.unhexlify(info_hash))}' for info_hash in info_hashes
+    )
     return result
 
 
-def get_udp_seeds(url, info_hash):
+def _udp_connection_id(clisocket, address):
+    """Return a connection id for the tracker at `address`, reusing the last one while it is valid."""
+    with _udp_connections_lock:
+        connection_id, expires = _udp_connections.get(address, (None, 0))
+    if expires > time.monotonic():
+        return connection_id
+    transaction_id = randrange(1, 65535)
+    # build packet with the protocol id, using 0 value for action, giving our transaction ID for this packet
+    clisocket.send(struct.pack(b'>QLL', UDP_PROTOCOL_ID, 0, transaction_id))
+    # set 16 bytes ["LLQ" = 16 bytes] for the fmq for unpack
+    action, response_transaction_id, connection_id = struct.unpack(b'>LLQ', clisocket.recv(16))
+    if action != 0 or response_transaction_id != transaction_id:
+        raise OSError('invalid connect response')
+    with _udp_connections_lock:
+        _udp_connections[address] = (connection_id, time.monotonic() + UDP_CONNECTION_TTL)
+    return connection_id
+
+
+def _forget_udp_connection(address):
+    with _udp_connections_lock:
+        _udp_connections.pop(address, None)
+
+
+def _udp_scrape_request(clisocket, address, chunk):
+    """Send one scrape request for the info hashes in `chunk`.
+
+    :return: Action and payload of the response, or None if the response is not for this request.
+    """
+    connection_id = _udp_connection_id(clisocket, address)
+    transaction_id = randrange(1, 65535)
+    # construct packet for scrape with decoded info_hashes setting action byte to 2 for scrape
+    packet = struct.pack(b'>QLL', connection_id, 2, transaction_id)
+    packet += b''.join(binascii.unhexlify(info_hash) for info_hash in chunk)
+    clisocket.send(packet)
+    # 8 bytes of header followed by 12 bytes for each requested torrent
+    res = clisocket.recv(8 + 12 * len(chunk))
+    action, response_transaction_id = struct.unpack(b'>LL', res[:8])
+    if response_transaction_id != transaction_id:
+        return None
+    return action, res[8:]
+
+
+def scrape_udp(url, info_hashes):
+    """Scrape seeds of the info hashes from a UDP tracker, as many as allowed in each request.
+
+    :return: Dict of seeds by info hash, 0 for torrents the tracker does not know. Hashes the tracker did not
+        answer for are left out.
+    """
     try:
         parsed_url = urlparse(url)
         port = parsed_url.port
     except ValueError:
         logger.error('UDP Port Error, url was {}', url)
-        return 0
-
-    logger.debug('Checking for seeds from {}', url)
-
-    connection_id = 0x41727101980  # connection id is always this
-    transaction_id = randrange(1, 65535)  # Random Transaction ID creation
+        return {}
 
     if port is None:
         logger.error('UDP Port Error, port was None')
-        return 0
+        return {}
 
     if port < 0 or port > 65535:
         logger.error('UDP Port Error, port was {}', port)
-        return 0
+        return {}
 
-    # Create the socket
+    logger.debug('Checking for seeds of {} torrents from {}', len(info_hashes), url)
+    address = (parsed_url.hostname, port)
+    seeds = {}
     try:
-        clisocket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        clisocket.settimeout(5.0)
-        clisocket.connect((parsed_url.hostname, port))
-
-        # build packet with connection_ID, using 0 value for action, giving our transaction ID for this packet
-        packet = struct.pack(b'>QLL', connection_id, 0, transaction_id)
-        clisocket.send(packet)
-
-        # set 16 bytes ["QLL" = 16 bytes] for the fmq for unpack
-        res = clisocket.recv(16)
-        # check recieved packet for response
-        action, transaction_id, connection_id = struct.unpack(b'>LLQ', res)
-
-        # build packet hash out of decoded info_hash
-        packet_hash = binascii.unhexlify(info_hash)
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as clisocket:
+            clisocket.settimeout(5.0)
+            clisocket.connect(address)
+            for chunk in chunked(info_hashes, UDP_MAX_HASHES):
+                response = _udp_scrape_request(clisocket, address, chunk)
+                if response and response[0] == 3:
+                    # Trackers may tie connection ids to the port they were handed out to, or expire them early
+                    logger.debug('{} rejected the connection id, getting a new one', url)
+                    _forget_udp_connection(address)
+                    response = _udp_scrape_request(clisocket, address, chunk)
+                if response and response[0] == 3:
+                    _forget_udp_connection(address)
+                    logger.error('There was a UDP Packet Error 3: {}', response[1])
+                    break
+                if not response or response[0] != 2:
+                    logger.warning('Invalid scrape response from {}', url)
+                    break
+                # seeders, completed and leechers for each requested torrent, in the same order
+                payload = response[1]
+                for index, info_hash in enumerate(chunk):
+                    if len(payload) < 12 * (index + 1):
+                        break
+                    (seeds[info_hash],) = struct.unpack_from(b'>L', payload, 12 * index)
+    except (OSError, ValueError, struct.error) as e:
+        logger.warning('Socket Error: {}', e)
+    logger.debug('scrape_udp is returning: {}', seeds)
+    return seeds
 
-        # construct packet for scrape with decoded info_hash setting action byte to 2 for scape
-        packet = struct.pack(b'>QLL', connection_id, 2, transaction_id) + packet_hash
 
-        clisocket.send(packet)
-        # set recieve size of 8 + 12 bytes
-        res = clisocket.recv(20)
+def _http_scrape(url, info_hashes):
+    """Scrape one request worth of info hashes from an HTTP tracker.
 
-    except OSError as e:
-        logger.warning('Socket Error: {}', e)
-        return 0
-    # Check for UDP error packet
-    (action,) = struct.unpack(b'>L', res[:4])
-    if action == 3:
-        logger.error('There was a UDP Packet Error 3')
-        return 0
-
-    # first 8 bytes are followed by seeders, completed and leechers for requested torrent
-    seeders, _, _ = struct.unpack(b'>LLL', res[8:20])
-    logger.debug('get_udp_seeds is returning: {}', seeders)
-    clisocket.close()
-    return seeders
-
-
-def get_http_seeds(url, info_hash):
-    url = get_scrape_url(url, info_hash)
-    if not url:
-        logger.debug('if not url is true returning 0')
-        return 0
+    :return: Dict of seeds by info hash, of the torrents the tracker knows, or None if it did not answer.
+    """
+    url = get_scrape_url(url, info_hashes)
     logger.debug('Checking for seeds from {}', url)
-
     try:
-        data = bdecode(requests.get(url).content).get('files')
+        data = bdecode(requests.get(url).content)
     except RequestException as e:
         logger.debug('Error scraping: {}', e)
-        return 0
+        return None
     except SyntaxError as e:
         logger.warning('Error decoding tracker response: {}', e)
-        return 0
+        return None
     except BadStatusLine as e:
         logger.warning('Error BadStatusLine: {}', e)
-        return 0
+        return None
     except OSError as e:
         logger.warning('Server error: {}', e)
-        return 0
-    if not data:
+        return None
+    if not isinstance(data, dict) or 'files' not in data:
         logger.debug('No data received from tracker scrape.')
-        return 0
-    logger.debug('get_http_seeds is returning: {}', next(iter(data.values()))['complete'])
-    return next(iter(data.values()))['complete']
+        return None
+    seeds = {}
+    for raw_hash, stats in (data['files'] or {}).items():
+        # Keys are binary, the decoder leaves them as text if they happen to be valid utf-8
+        if isinstance(raw_hash, str):
+            raw_hash = raw_hash.encode('utf-8')
+        seeds[binascii.hexlify(raw_hash).decode().upper()] = stats.get('complete', 0)
+    return seeds
+
+
+def scrape_http(url, info_hashes):
+    """Scrape seeds of the info hashes from an HTTP tracker, as many as allowed in each request.
+
+    :return: Dict of seeds by info hash, 0 for torrents the tracker does not know. Hashes the tracker did not
+        answer for are left out.
+    """
+    seeds = {}
+    for chunk in chunked(info_hashes, HTTP_MAX_HASHES):
+        chunk_seeds = _http_scrape(url, chunk)
+        if chunk_seeds is None:
+            continue
+        if len(chunk) > 1 and len(chunk_seeds) <= 1:
+            # Not all trackers support scraping several torrents at once, some only answer for one of them
+            logger.debug('{} answered for one torrent only, scraping the rest one by one', url)
+            for info_hash in chunk:
+                if info_hash in chunk_seeds:
+                    continue
+                single_seeds = _http_scrape(url, [info_hash])
+                if single_seeds is not None:
+                    chunk_seeds[info_hash] = single_seeds.get(info_hash, 0)
+        else:
+            chunk_seeds = dict.fromkeys(chunk, 0) | chunk_seeds
+        seeds.update(chunk_seeds)
+    logger.debug('scrape_http is returning: {}', seeds)
+    return seeds
+
+
+def scrape_tracker(url, info_hashes):
+    """Scrape seeds of the info hashes from a tracker.
+
+    :return: Dict of seeds by info hash, 0 for torrents the tracker does not know. Hashes the tracker did not
+        answer for are left out.
+    """
+    info_hashes = [info_hash.upper() for info_hash in info_hashes]
+    try:
+        if url.startswith('udp'):
+            return scrape_udp(url, info_hashes)
+        if url.startswith('http'):
+            return scrape_http(url, info_hashes)
+    except URLError as e:
+        logger.debug('Error scraping {}: {}', url, e)
+        return {}
+    logger.warning('Cannot scrape {}, only udp and http trackers are supported', url)
+    return {}
 
 
-def get_tracker_seeds(url, info_hash):
-    if url.startswith('udp'):
-        return get_udp_seeds(url, info_hash)
-    if url.startswith('http'):
-        return get_http_seeds(url, info_hash)
-    logger.warning('There is a problem with the get_tracker_seeds')
-    return 0
+def get_seeds(trackers_by_hash):
+    """Return the highest seeds found from any tracker of each torrent.
+
+    Torrents sharing trackers are scraped together, and trackers are scraped concurrently. Answers of the trackers
+    are cached for a while, so other tasks checking the same torrents do not scrape them again.
+
+    :param trackers_by_hash: Dict of tracker urls by info hash.
+    :return: Dict of seeds by info hash.
+    """
+    hashes_by_tracker = {}
+    for info_hash, trackers in trackers_by_hash.items():
+        for tracker in trackers:
+            if scrape_cache.get(tracker, info_hash) is None:
+                # Dict keys as an ordered set, torrents may list a tracker more than once
+                hashes_by_tracker.setdefault(tracker, {})[info_hash] = None
+
+    def scrape(tracker, info_hashes):
+        seeds = scrape_tracker(tracker, info_hashes)
+        logger.debug('{} torrents with seeds found from {}', len(seeds), tracker)
+        # Only answers are cached, torrents the tracker did not answer for are scraped again next time
+        scrape_cache.update(tracker, seeds)
+
+    if hashes_by_tracker:
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_WORKERS, len(hashes_by_tracker)),
+            thread_name_prefix='torrent_alive',
+        ) as executor:
+            # Scrapes run with a copy of the current context, so their logs are still attributed to this task
+            futures = [
+                executor.submit(contextvars.copy_context().run, scrape, tracker, list(info_hashes))
+                for tracker, info_hashes in hashes_by_tracker.items()
+            ]
+            for future in futures:
+                future.result()
+
+    return {
+        info_hash: max(
+            (scrape_cache.get(tracker, info_hash) or 0 for tracker in trackers), default=0
+        )
+        for info_hash, trackers in trackers_by_hash.items()
+    }
 
 
 class TorrentAlive:
@@ -216,6 +354,7 @@ class TorrentAlive:
         config = self.prepare_config(config)
         min_seeds = config['min_seeds']
 
+        checked = []
         for entry in task.accepted:
             # If torrent_seeds is filled, we will have already filtered in filter phase
             if entry.get('torrent_seeds'):
@@ -223,58 +362,39 @@ class TorrentAlive:
                     'Not checking trackers for seeds, as torrent_seeds is already filled.'
                 )
                 continue
-            logger.debug('Checking for seeds for {}:', entry['title'])
             torrent = entry.get('torrent')
-            if torrent:
-                logger.debug('started examining torrent: {}', torrent)
-                seeds = 0
-                info_hash = torrent.info_hash
-                announce_list = torrent.content.get('announce-list')
-                if announce_list:
-                    # Multitracker torrent
-                    threadlist = []
-                    for tier in announce_list:
-                        for tracker in tier:
-                            background = TorrentAliveThread(tracker, info_hash)
-                            try:
-                                background.start()
-                                threadlist.append(background)
-                            except threading.ThreadError:
-                                # If we can't start a new thread, wait for current ones to complete and continue
-                                logger.debug('Reached max threads, finishing current threads.')
-                                seeds = max(seeds, max_seeds_from_threads(threadlist))
-                                background.start()
-                                threadlist = [background]
-                            logger.debug(
-                                'Started thread to scrape {} with info hash {}', tracker, info_hash
-                            )
-
-                    seeds = max(seeds, max_seeds_from_threads(threadlist))
-                    logger.debug('Highest number of seeds found: {}', seeds)
-                elif torrent.content.get('announce'):
-                    # Single tracker
-                    tracker = torrent.content['announce']
-                    try:
-                        seeds = get_tracker_seeds(tracker, info_hash)
-                    except URLError as e:
-                        logger.debug('Error scraping {}: {}', tracker, e)
-                else:
-                    logger.warning(
-                        'Torrent {} does not seem to have a tracker specified, cannot check for seeders',
-                        entry['title'],
-                    )
-                    return
+            if not torrent:
+                continue
+            announce_list = torrent.content.get('announce-list')
+            if announce_list:
+                # Multitracker torrent
+                trackers = [tracker for tier in announce_list for tracker in tier]
+            elif torrent.content.get('announce'):
+                # Single tracker
+                trackers = [torrent.content['announce']]
+            else:
+                logger.warning(
+                    'Torrent {} does not seem to have a tracker specified, cannot check for seeders',
+                    entry['title'],
+                )
+                continue
+            checked.append((entry, torrent.info_hash, trackers))
 
-                # Reject if needed
-                if seeds < min_seeds:
-                    entry.reject(
-                        reason=f'Tracker(s) had < {min_seeds} required seeds. ({seeds})',
-                        remember_time=config['reject_for'],
-                    )
-                    # Maybe there is better match that has enough seeds
-                    task.rerun(plugin='torrent_alive', reason='Not enough seeds')
-                else:
-                    logger.debug('Found {} seeds from trackers', seeds)
+        if not checked:
+            return
+        seeds_by_hash = get_seeds({info_hash: trackers for _, info_hash, trackers in checked})
+        for entry, info_hash, _ in checked:
+            seeds = seeds_by_hash[info_hash]
+            # Reject if needed
+            if seeds < min_seeds:
+                entry.reject(
+                    reason=f'Tracker(s) had < {min_seeds} required seeds. ({seeds})',
+                    remember_time=config['reject_for'],
+                )
+                # Maybe there is better match that has enough seeds
+                task.rerun(plugin='torrent_alive', reason='Not enough seeds')
+            else:
+                logger.debug('Found {} seeds from trackers for {}', seeds, entry['title'])
 
 
 @event('plugin.register')
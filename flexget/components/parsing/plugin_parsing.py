@@ -1,16 +1,54 @@
+import copy
+from datetime import date
+from operator import itemgetter
+
 from loguru import logger
 
 from flexget import plugin
 from flexget.event import event
+from flexget.utils.tools import LRUCache
 
 logger = logger.bind(name='parsing')
 PARSER_TYPES = ['movie', 'series']
+PARSE_CACHE_SIZE = 10000
 
 # Mapping of parser type to (mapping of parser name to plugin instance)
 parsers = {}
 # Mapping from parser type to the name of the default/selected parser for that type
 default_parsers = {}
 selected_parsers = []
+# Parse results shared between tasks and phases, keyed on parser type, parser name, data and kwargs
+parse_cache = LRUCache(max_size=PARSE_CACHE_SIZE, name='Parse')
+
+
+def _freeze(value):
+    """Turn `value` into something hashable which compares equal for equal parser kwargs."""
+    if isinstance(value, dict):
+        return tuple(sorted(((k, _freeze(v)) for k, v in value.items()), key=itemgetter(0)))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def cached_parse(parser_type, parser_name, parse_func, data, **kwargs):
+    """Call `parse_func`, memoizing the result.
+
+    Callers are free to modify the returned result, a copy of the cached one is returned.
+    The current date is part of the key, as parsers validate dates and years against it.
+    """
+    try:
+        key = (parser_type, parser_name, data, _freeze(kwargs), date.today())
+        hash(key)
+    except TypeError:
+        logger.trace('not caching parse of `{}`, kwargs are not hashable', data)
+        return parse_func(data, **kwargs)
+    result = parse_cache.get(key)
+    if result is None:
+        result = parse_func(data, **kwargs)
+        parse_cache.put(key, result)
+    return copy.deepcopy(result)
 
 
 # We need to wait until manager startup to access other plugin instances, to make sure they have all been loaded
@@ -80,8 +118,9 @@ class PluginParsing:
 
         :returns: An object containing the parsed information. The `valid` attribute will be set depending on success.
         """
-        parser = parsers['series'][self.selected.get('series', default_parsers.get('series'))]
-        return parser.parse_series(data, name=name, **kwargs)
+        parser_name = self.selected.get('series', default_parsers.get('series'))
+        parser = parsers['series'][parser_name]
+        return cached_parse('series', parser_name, parser.parse_series, data, name=name, **kwargs)
 
     def parse_movie(self, data, **kwargs):
         """Use the selected movie parser to parse movie information from `data`.
@@ -90,8 +129,9 @@ class PluginParsing:
 
         :returns: An object containing the parsed information. The `valid` attribute will be set depending on success.
         """
-        parser = parsers['movie'][self.selected.get('movie') or default_parsers['movie']]
-        return parser.parse_movie(data, **kwargs)
+        parser_name = self.selected.get('movie') or default_parsers['movie']
+        parser = parsers['movie'][parser_name]
+        return cached_parse('movie', parser_name, parser.parse_movie, data, **kwargs)
 
 
 @event('plugin.register')
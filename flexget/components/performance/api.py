@@ -0,0 +1,109 @@
+from math import ceil
+
+from flask import jsonify, request
+from loguru import logger
+from sqlalchemy import asc, desc
+
+from flexget.api import APIResource, api
+from flexget.api.app import NotFoundError, etag, pagination_headers
+from flexget.api.core.server import server_api
+
+from . import db
+
+logger = logger.bind(name='performance.api')
+
+
+class ObjectsContainer:
+    stats_properties = {
+        'took': {'type': 'number'},
+        'cpu': {'type': 'number'},
+        'queries': {'type': 'integer'},
+        'query_time': {'type': 'number'},
+        'requests': {'type': 'integer'},
+        'request_bytes': {'type': 'integer'},
+        'request_time': {'type': 'number'},
+        'memory': {'type': 'integer'},
+    }
+
+    plugin_stats_object = {
+        'type': 'object',
+        'properties': {
+            'phase': {'type': 'string'},
+            'plugin': {'type': 'string'},
+            **stats_properties,
+        },
+        'additionalProperties': False,
+    }
+
+    phase_stats_object = {
+        'type': 'object',
+        'properties': stats_properties,
+        'additionalProperties': False,
+    }
+
+    perf_profile_object = {
+        'type': 'object',
+        'properties': {
+            'id': {'type': 'integer'},
+            'task': {'type': 'string'},
+            'started': {'type': 'string', 'format': 'date-time'},
+            'took': {'type': 'number'},
+            'phases': {'type': 'object', 'additionalProperties': phase_stats_object},
+            'plugins': {'type': 'array', 'items': plugin_stats_object},
+        },
+        'required': ['id', 'task', 'started', 'took', 'phases', 'plugins'],
+        'additionalProperties': False,
+    }
+
+    perf_profile_list_object = {'type': 'array', 'items': perf_profile_object}
+
+
+perf_profile_list_schema = api.schema_model(
+    'server.perf.list', ObjectsContainer.perf_profile_list_object
+)
+
+sort_choices = ('started', 'took', 'task')
+
+perf_parser = api.pagination_parser(sort_choices=sort_choices)
+perf_parser.add_argument('task', help='Filter by task name')
+
+
+@server_api.route('/perf/')
+@api.doc(expect=[perf_parser])
+class ServerPerfAPI(APIResource):
+    @etag
+    @api.response(NotFoundError)
+    @api.response(200, model=perf_profile_list_schema)
+    def get(self, session=None):
+        """List performance profiles of tasks run with debug_perf or --debug-perf."""
+        args = perf_parser.parse_args()
+        page = args['page']
+        per_page = min(args['per_page'], 100)
+
+        query = session.query(db.PerfProfile)
+        if args['task']:
+            query = query.filter(db.PerfProfile.task == args['task'])
+
+        total_items = query.count()
+        if not total_items:
+            pagination = pagination_headers(0, 0, 0, request)
+            rsp = jsonify([])
+            rsp.headers.extend(pagination)
+            return rsp
+
+        total_pages = ceil(total_items / float(per_page))
+        if page > total_pages:
+            raise NotFoundError(f'page {page} does not exist')
+
+        start = (page - 1) * per_page
+        order = desc if args['order'] == 'desc' else asc
+        items = (
+            query.order_by(order(getattr(db.PerfProfile, args['sort_by'])))
+            .slice(start, start + per_page)
+            .all()
+        )
+
+        pagination = pagination_headers(total_pages, total_items, len(items), request)
+        rsp = jsonify([item.to_dict() for item in items])
+        rsp.headers.extend(pagination)
+        return rsp
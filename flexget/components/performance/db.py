@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from loguru import logger
+from sqlalchemy import Column, DateTime, Float, Integer, Unicode
+
+from flexget import db_schema
+from flexget.event import event
+from flexget.utils.database import json_synonym
+
+logger = logger.bind(name='performance.db')
+Base = db_schema.versioned_base('performance', 0)
+
+
+class PerfProfile(Base):
+    __tablename__ = 'perf_profile'
+
+    id = Column(Integer, primary_key=True)
+    task = Column(Unicode, index=True)
+    started = Column(DateTime, index=True, default=datetime.now)
+    took = Column(Float)
+    _data = Column('data', Unicode)
+    data = json_synonym('_data')
+
+    def __repr__(self):
+        return f'<PerfProfile(id={self.id},task={self.task},started={self.started})>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'task': self.task,
+            'started': self.started.astimezone(),
+            'took': self.took,
+            'phases': self.data['phases'],
+            'plugins': self.data['plugins'],
+        }
+
+
+@event('manager.db_cleanup')
+def db_cleanup(manager, session):
+    result = (
+        session.query(PerfProfile)
+        .filter(PerfProfile.started < datetime.now() - timedelta(days=90))
+        .delete()
+    )
+    if result:
+        logger.verbose('Removed {} performance profiles older than 90 days', result)
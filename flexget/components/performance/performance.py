@@ -0,0 +1,433 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import sys
+import threading
+import time
+import tracemalloc
+from argparse import SUPPRESS, Action
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from loguru import logger
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import Engine
+
+from flexget import options, plugin
+from flexget.event import event
+from flexget.manager import Session
+from flexget.utils import requests
+from flexget.utils.tools import LRUCache
+
+from . import db
+
+logger = logger.bind(name='performance')
+
+query_count = 0
+
+# Statistics of the plugin running in the current context. Threads started by plugins with a copy of the context
+# (e.g. discover searches) add their SQL queries and HTTP requests to the plugin as well.
+_current_stats: contextvars.ContextVar[PluginStats | None] = contextvars.ContextVar(
+    'perf_current_stats', default=None
+)
+
+# Profiles written to files at the end of an execution, by id of the execution options
+_exports: dict[int, list[TaskProfile]] = {}
+
+
+def log_query_count(name_point):
+    """Debugging purposes, allows logging number of executed queries at :name_point:."""
+    logger.info('At point named `{}` total of {} queries were ran', name_point, query_count)
+
+
+class PluginStats:
+    """Resources used by a plugin during one phase of a task."""
+
+    def __init__(self, phase, plugin_name):
+        self.phase = phase
+        self.plugin = plugin_name
+        self.took = 0.0
+        self.cpu = 0.0
+        self.queries = 0
+        self.query_time = 0.0
+        self.requests = 0
+        self.request_bytes = 0
+        self.request_time = 0.0
+        self.memory = 0
+
+    def add(self, other: PluginStats):
+        for key, value in vars(other).items():
+            if key == 'memory':
+                self.memory = max(self.memory, value)
+            elif key not in ('phase', 'plugin'):
+                setattr(self, key, getattr(self, key) + value)
+
+    def to_dict(self):
+        return dict(vars(self))
+
+
+class TaskProfile:
+    """Profile of one task execution, including reruns."""
+
+    def __init__(self, task_name):
+        self.task = task_name
+        self.started = datetime.now()
+        self.took = 0.0
+        self.plugins: dict[tuple[str, str], PluginStats] = {}
+        # Sampled call stacks in collapsed format, without the frames of the task itself
+        self.stacks: Counter[str] = Counter()
+        self._start = time.perf_counter()
+        # State of the currently running plugin
+        self._running = None
+
+    def plugin_stats(self, phase, plugin_name) -> PluginStats:
+        key = (phase, plugin_name)
+        if key not in self.plugins:
+            self.plugins[key] = PluginStats(phase, plugin_name)
+        return self.plugins[key]
+
+    def phases(self) -> dict[str, dict]:
+        phases = {}
+        for stats in self.plugins.values():
+            if stats.phase not in phases:
+                phases[stats.phase] = PluginStats(stats.phase, None)
+            phases[stats.phase].add(stats)
+        result = {}
+        for phase, stats in phases.items():
+            result[phase] = stats.to_dict()
+            del result[phase]['phase'], result[phase]['plugin']
+        return result
+
+    def to_dict(self):
+        return {
+            'task': self.task,
+            'started': self.started.isoformat(),
+            'took': self.took,
+            'phases': self.phases(),
+            'plugins': [stats.to_dict() for stats in self.plugins.values()],
+        }
+
+    def collapsed_stacks(self) -> list[str]:
+        """Return the sampled stacks in the collapsed format used by flamegraph tools."""
+        return [f'{stack} {count}' for stack, count in self.stacks.items()]
+
+
+class Profiler:
+    """Installs the hooks measuring SQL, HTTP and memory use, and samples the stacks of running plugins.
+
+    The hooks are only installed while at least one task is being profiled.
+    """
+
+    sample_interval = 0.005
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        # Thread id -> (profile, stack prefix) of the threads running a profiled plugin
+        self.threads: dict[int, tuple[TaskProfile, str]] = {}
+        self.stopped = threading.Event()
+        self.sampler = None
+        self.original_request = None
+        self.started_tracemalloc = False
+
+    def start(self):
+        with self.lock:
+            self.active += 1
+            if self.active > 1:
+                return
+            logger.debug('Installing performance profiling hooks')
+            sa_event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            sa_event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            self.original_request = requests.Session.request
+            requests.Session.request = _profiled_request
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracemalloc = True
+            self.stopped.clear()
+            self.sampler = threading.Thread(target=self.sample, name='perf_sampler', daemon=True)
+            self.sampler.start()
+
+    def stop(self):
+        with self.lock:
+            self.active -= 1
+            if self.active:
+                return
+            logger.debug('Removing performance profiling hooks')
+            sa_event.remove(Engine, 'before_cursor_execute', _before_cursor_execute)
+            sa_event.remove(Engine, 'after_cursor_execute', _after_cursor_execute)
+            requests.Session.request = self.original_request
+            if self.started_tracemalloc:
+                tracemalloc.stop()
+                self.started_tracemalloc = False
+            self.stopped.set()
+            sampler, self.sampler = self.sampler, None
+        sampler.join()
+
+    def enter(self, profile: TaskProfile, prefix: str):
+        with self.lock:
+            self.threads[threading.get_ident()] = (profile, prefix)
+
+    def exit(self):
+        with self.lock:
+            self.threads.pop(threading.get_ident(), None)
+
+    def sample(self):
+        from flexget.event import Event
+        from flexget.task import Task
+
+        # Frames above the plugin method belong to the task itself
+        stop_code = Task._Task__run_plugin.__code__
+        handler_code = Event.__call__.__code__
+        while not self.stopped.wait(self.sample_interval):
+            frames = sys._current_frames()
+            with self.lock:
+                running = list(self.threads.items())
+            for thread_id, (profile, prefix) in running:
+                frame = frames.get(thread_id)
+                codes = []
+                while frame is not None and frame.f_code is not stop_code:
+                    codes.append(frame.f_code)
+                    frame = frame.f_back
+                if codes and codes[-1] is handler_code:
+                    # The phase handler wrapping the plugin method
+                    codes.pop()
+                if codes:
+                    stack = [
+                        f'{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})'
+                        for code in reversed(codes)
+                    ]
+                    profile.stacks[';'.join([prefix, *stack])] += 1
+
+
+profiler = Profiler()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('perf_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    global query_count
+    starts = conn.info.get('perf_query_start')
+    if not starts:
+        # Hooks were installed while the query was running
+        return
+    took = time.perf_counter() - starts.pop()
+    query_count += 1
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_time += took
+
+
+def _profiled_request(self, method, url, *args, **kwargs):
+    stats = _current_stats.get()
+    if stats is None:
+        return profiler.original_request(self, method, url, *args, **kwargs)
+    stream = kwargs.get('stream')
+    start = time.perf_counter()
+    response = None
+    try:
+        response = profiler.original_request(self, method, url, *args, **kwargs)
+    finally:
+        stats.requests += 1
+        elapsed = getattr(response, 'elapsed', None)
+        # Time to the response headers, without waiting for the domain limiters
+        stats.request_time += (
+            elapsed.total_seconds() if elapsed is not None else time.perf_counter() - start
+        )
+    if stream:
+        stats.request_bytes += int(response.headers.get('content-length') or 0)
+    else:
+        stats.request_bytes += len(response.content or b'')
+    return response
+
+
+def _profiling_enabled(task):
+    return getattr(task.options, 'debug_perf', False) or bool(task.config.get('debug_perf'))
+
+
+@event('task.execute.before_plugin')
+def before_plugin(task, keyword):
+    profile = getattr(task, 'perf_profile', None)
+    if profile is None:
+        # Checked here rather than when the task starts, so that templates are applied already
+        if not _profiling_enabled(task):
+            return
+        profile = task.perf_profile = TaskProfile(task.name)
+        profiler.start()
+    stats = PluginStats(task.current_phase, keyword)
+    token = _current_stats.set(stats)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    profile._running = (stats, token, time.perf_counter(), time.thread_time(), memory)
+    profiler.enter(profile, f'{task.name};{task.current_phase};{keyword}')
+
+
+@event('task.execute.after_plugin')
+def after_plugin(task, keyword):
+    profile = getattr(task, 'perf_profile', None)
+    if profile is None or profile._running is None:
+        return
+    profiler.exit()
+    stats, token, start, cpu_start, memory = profile._running
+    profile._running = None
+    _current_stats.reset(token)
+    stats.took = time.perf_counter() - start
+    stats.cpu = time.thread_time() - cpu_start
+    stats.memory = max(0, tracemalloc.get_traced_memory()[1] - memory)
+    profile.plugin_stats(stats.phase, stats.plugin).add(stats)
+
+
+@event('task.execute.completed')
+def finish_profile(task):
+    profile = getattr(task, 'perf_profile', None)
+    if profile is None:
+        return
+    task.perf_profile = None
+    if profile._running is not None:
+        # Finished from the abort phase, by the debug_perf plugin itself
+        profiler.exit()
+        _current_stats.reset(profile._running[1])
+        profile._running = None
+    profiler.stop()
+    profile.took = time.perf_counter() - profile._start
+    log_profile(profile)
+    with Session() as session:
+        session.add(
+            db.PerfProfile(
+                task=profile.task,
+                started=profile.started,
+                took=profile.took,
+                data=profile.to_dict(),
+            )
+        )
+    exports = _exports.get(id(task.options))
+    if exports is not None:
+        exports.append(profile)
+
+
+def log_profile(profile: TaskProfile):
+    logger.info('Performance results for task {} ({:0.2f} sec):', profile.task, profile.took)
+    for stats in profile.plugins.values():
+        if stats.took > 0.1 or stats.queries > 10 or stats.requests:
+            logger.info(
+                '{:<8} {:<15} took {:0.2f} sec (cpu {:0.2f} sec, {} queries {:0.2f} sec, '
+                '{} requests {:0.2f} sec {:0.1f} KiB, memory +{:0.1f} MiB)',
+                stats.phase,
+                stats.plugin,
+                stats.took,
+                stats.cpu,
+                stats.queries,
+                stats.query_time,
+                stats.requests,
+                stats.request_time,
+                stats.request_bytes / 1024,
+                stats.memory / 1024 / 1024,
+            )
+
+
+class DebugPerf:
+    """Profile the plugins of this task, like the --debug-perf option does for all tasks.
+
+    Results are logged when the task finishes, and stored for the /server/perf/ API endpoint.
+
+    Example::
+
+      debug_perf: yes
+    """
+
+    schema = {'type': 'boolean'}
+
+    # Make sure the profile is finished when the task is aborted
+    @plugin.priority(plugin.PRIORITY_LAST)
+    def on_task_abort(self, task, config):
+        finish_profile(task)
+
+
+@event('manager.execute.started')
+def startup(manager, options):
+    if not options.debug_perf:
+        return
+    global query_count
+    query_count = 0
+    logger.info('Enabling plugin and SQLAlchemy performance debugging')
+    for cache in LRUCache.named():
+        cache.reset_stats()
+    if options.debug_perf_json or options.debug_perf_flamegraph:
+        _exports[id(options)] = []
+
+
+@event('manager.execute.completed')
+def cleanup(manager, options):
+    if not options.debug_perf:
+        return
+
+    # Print summary
+    stats = manager.validation_stats
+    if stats:
+        logger.info(
+            'Config validation took {:0.2f} sec ({} of {} tasks validated)',
+            stats['took'],
+            stats['validated_tasks'],
+            stats['tasks'],
+        )
+    for cache in LRUCache.named():
+        stats = cache.stats
+        logger.info(
+            '{} cache: {} hits, {} misses, {} evictions ({} of {} slots used)',
+            cache.name,
+            stats['hits'],
+            stats['misses'],
+            stats['evictions'],
+            stats['size'],
+            stats['max_size'],
+        )
+    profiles = _exports.pop(id(options), [])
+    if options.debug_perf_json:
+        path = Path(options.debug_perf_json).expanduser()
+        path.write_text(json.dumps([profile.to_dict() for profile in profiles], indent=2))
+        logger.info('Wrote performance profiles to {}', path)
+    if options.debug_perf_flamegraph:
+        path = Path(options.debug_perf_flamegraph).expanduser()
+        lines = [line for profile in profiles for line in profile.collapsed_stacks()]
+        path.write_text(''.join(f'{line}\n' for line in lines))
+        logger.info('Wrote {} collapsed stacks for flamegraph tools to {}', len(lines), path)
+
+
+class _ExportAction(Action):
+    """Store the file to export profiles to, and enable profiling."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, values)
+        namespace.debug_perf = True
+
+
+@event('plugin.register')
+def register_plugin():
+    plugin.register(DebugPerf, 'debug_perf', builtin=True, debug=True, api_ver=2)
+
+
+@event('options.register')
+def register_parser_arguments():
+    execute_parser = options.get_parser('execute')
+    execute_parser.add_argument(
+        '--debug-perf', action='store_true', dest='debug_perf', default=False, help=SUPPRESS
+    )
+    # Giving a file to export to implies --debug-perf
+    execute_parser.add_argument(
+        '--debug-perf-json',
+        metavar='FILE',
+        dest='debug_perf_json',
+        action=_ExportAction,
+        help=SUPPRESS,
+    )
+    execute_parser.add_argument(
+        '--debug-perf-flamegraph',
+        metavar='FILE',
+        dest='debug_perf_flamegraph',
+        action=_ExportAction,
+        help=SUPPRESS,
+    )
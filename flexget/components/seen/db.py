@@ -31,6 +31,7 @@ from flexget.event import event
 from flexget.manager import Session
 from flexget.utils.database import with_session
 from flexget.utils.sqlalchemy_utils import table_add_column, table_schema
+from flexget.utils.tools import chunked
 
 try:
     # NOTE: Importing other plugins is discouraged!
@@ -240,6 +241,32 @@ def search_by_field_values(field_value_list, task_name, local=False, session=Non
     return found.first()
 
 
+@with_session
+def search_by_field_values_bulk(field_value_list, task_name, local=False, session=None):
+    """Resolve many field values at once, in chunked queries.
+
+    :param field_value_list: List of field values to match
+    :param task_name: Name of task to compare to in case local flag is sent
+    :param local: Local flag
+    :param session: Current session
+    :return: Dict mapping each matched value to a ``(SeenField, SeenEntry)`` tuple
+    """
+    found = {}
+    for chunk in chunked(list(set(field_value_list))):
+        query = (
+            session.query(SeenField, SeenEntry)
+            .join(SeenEntry, SeenField.seen_entry_id == SeenEntry.id)
+            .filter(SeenField.value.in_(chunk))
+        )
+        if local:
+            query = query.filter(SeenEntry.task == task_name)
+        else:
+            query = query.filter(or_(~SeenEntry.local, SeenEntry.local.is_(None)))
+        for seen_field, seen_entry in query.order_by(SeenField.id):
+            found.setdefault(seen_field.value, (seen_field, seen_entry))
+    return found
+
+
 @event('manager.db_cleanup')
 def db_cleanup(manager, session):
     # TODO: Look into this, is it still valid?
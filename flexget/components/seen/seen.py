@@ -66,8 +66,9 @@ class FilterSeen:
         fields = config.get('fields')
         local = config.get('local')
 
+        # construct list of values looked for each entry
+        entry_values = []
         for entry in task.entries:
-            # construct list of values looked
             values = []
             for field in fields:
                 if field not in entry:
@@ -75,29 +76,37 @@ class FilterSeen:
                 if entry[field] not in values and entry[field]:
                     values.append(str(entry[field]))
             if values:
-                logger.trace('querying for: {}', ', '.join(values))
-                # check if SeenField.value is any of the values
-                found = db.search_by_field_values(
-                    field_value_list=values, task_name=task.name, local=local, session=task.session
+                entry_values.append((entry, values))
+        if not entry_values:
+            return
+
+        # resolve all values in a few chunked queries instead of one query per entry
+        all_values = [value for _, values in entry_values for value in values]
+        logger.trace('querying for {} values', len(all_values))
+        found_map = db.search_by_field_values_bulk(
+            field_value_list=all_values, task_name=task.name, local=local, session=task.session
+        )
+        if not found_map:
+            return
+
+        for entry, values in entry_values:
+            for value in values:
+                if value not in found_map:
+                    continue
+                found, se = found_map[value]
+                logger.debug(
+                    "Rejecting '{}' '{}' because of seen '{}'",
+                    entry['url'],
+                    entry['title'],
+                    found.value,
+                )
+                entry.reject(
+                    'Entry with {} `{}` is already marked seen in the task {} at {}'.format(
+                        found.field, found.value, se.task, se.added.strftime('%Y-%m-%d %H:%M')
+                    ),
+                    remember=remember_rejected,
                 )
-                if found:
-                    logger.debug(
-                        "Rejecting '{}' '{}' because of seen '{}'",
-                        entry['url'],
-                        entry['title'],
-                        found.value,
-                    )
-                    se = (
-                        task.session.query(db.SeenEntry)
-                        .filter(db.SeenEntry.id == found.seen_entry_id)
-                        .one()
-                    )
-                    entry.reject(
-                        'Entry with {} `{}` is already marked seen in the task {} at {}'.format(
-                            found.field, found.value, se.task, se.added.strftime('%Y-%m-%d %H:%M')
-                        ),
-                        remember=remember_rejected,
-                    )
+                break
 
     def on_task_learn(self, task, config):
         """Remember succeeded entries."""
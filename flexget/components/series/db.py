@@ -21,11 +21,12 @@ from sqlalchemy import (
     func,
     select,
     text,
+    tuple_,
     update,
 )
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.hybrid import Comparator, hybrid_property
-from sqlalchemy.orm import backref, relationship
+from sqlalchemy.orm import backref, relationship, selectinload
 
 from flexget import db_schema, plugin
 from flexget.components.series.utils import normalize_series_name
@@ -40,7 +41,7 @@ from flexget.utils.sqlalchemy_utils import (
     table_exists,
     table_schema,
 )
-from flexget.utils.tools import parse_episode_identifier
+from flexget.utils.tools import chunked, parse_episode_identifier
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -1399,8 +1400,134 @@ def show_episodes(
     return episodes.slice(start, stop).all()
 
 
+class ReleaseIndex:
+    """In memory index of the seasons, episodes and releases a batch of parse results refers to.
+
+    Filled with a few chunked queries by :meth:`prefetch`, so that :func:`store_parser` can resolve
+    releases without querying and flushing once per release.
+    """
+
+    def __init__(self) -> None:
+        # (series id, season, identifier) -> Season
+        self.seasons: dict[tuple[int, int, str], Season] = {}
+        # (series id, identifier) -> Episode
+        self.episodes: dict[tuple[int, str], Episode] = {}
+        # (release table, id of Season or Episode object, title, quality, proper count) -> release
+        self.releases: dict[tuple, SeasonRelease | EpisodeRelease] = {}
+
+    @staticmethod
+    def release_key(table, entity, title, quality, proper_count) -> tuple:
+        # Releases are looked up by object identity of their entity, new entities have no id yet
+        return table, id(entity), title, quality, proper_count
+
+    def add_release(self, release: SeasonRelease | EpisodeRelease, entity: Season | Episode):
+        key = self.release_key(
+            type(release), entity, release.title, release._quality, release.proper_count
+        )
+        self.releases.setdefault(key, release)
+
+    def prefetch(
+        self, session: Session, parsers: Iterable[tuple[Series, list[SeriesParseResult]]]
+    ) -> None:
+        """Load all existing seasons and episodes referred to by `parsers`, along with their releases.
+
+        :param parsers: Pairs of series (which must have an id) and the parse results stored for it
+        """
+        episode_keys = set()
+        season_keys = set()
+        for series, series_parsers in parsers:
+            for parser in series_parsers:
+                # Identifiers are stored as strings, sequence ids are ints
+                keys = season_keys if parser.season_pack else episode_keys
+                keys.update((series.id, str(identifier)) for identifier in parser.identifiers)
+        # Each pair takes two parameters in the query
+        for chunk in chunked(sorted(episode_keys), 450):
+            for episode in (
+                session.query(Episode)
+                .filter(tuple_(Episode.series_id, Episode.identifier).in_(chunk))
+                .options(selectinload(Episode.releases))
+                .order_by(Episode.id)
+            ):
+                if (episode.series_id, episode.identifier) not in self.episodes:
+                    self.episodes[episode.series_id, episode.identifier] = episode
+                    for release in episode.releases:
+                        self.add_release(release, episode)
+        for chunk in chunked(sorted(season_keys), 450):
+            for season in (
+                session.query(Season)
+                .filter(tuple_(Season.series_id, Season.identifier).in_(chunk))
+                .options(selectinload(Season.releases))
+                .order_by(Season.id)
+            ):
+                key = (season.series_id, season.season, season.identifier)
+                if key not in self.seasons:
+                    self.seasons[key] = season
+                    for release in season.releases:
+                        self.add_release(release, season)
+
+
+def _store_parser_indexed(
+    session: Session,
+    index: ReleaseIndex,
+    parser: SeriesParseResult,
+    series: Series,
+    quality: Quality,
+) -> list[SeasonRelease | EpisodeRelease]:
+    """Like :func:`store_parser`, but resolves existing rows from `index` and does not flush."""
+    releases = []
+    for ix, identifier in enumerate(parser.identifiers):
+        if parser.season_pack:
+            entity = index.seasons.get((series.id, parser.season, str(identifier)))
+            if not entity:
+                logger.debug('adding season `{}` into series `{}`', identifier, parser.name)
+                entity = Season()
+                entity.identifier = identifier
+                entity.identified_by = parser.id_type
+                entity.season = parser.season
+                # Assign from the many side, so the (possibly large) collection on series is not loaded
+                entity.series = series
+                session.add(entity)
+                index.seasons[series.id, parser.season, str(identifier)] = entity
+            table = SeasonRelease
+        else:
+            entity = index.episodes.get((series.id, str(identifier)))
+            if not entity:
+                logger.debug('adding episode `{}` into series `{}`', identifier, parser.name)
+                entity = Episode()
+                entity.identifier = identifier
+                entity.identified_by = parser.id_type
+                if parser.id_type == 'ep':
+                    entity.season = parser.season
+                    entity.number = parser.episode + ix
+                elif parser.id_type == 'sequence':
+                    entity.season = 0
+                    entity.number = parser.id + ix
+                entity.series = series
+                session.add(entity)
+                index.episodes[series.id, str(identifier)] = entity
+            table = EpisodeRelease
+
+        key = index.release_key(table, entity, parser.data, quality.name, parser.proper_count)
+        release = index.releases.get(key)
+        if not release:
+            logger.debug('adding release `{}`', parser)
+            release = table()
+            release.quality = quality
+            release.proper_count = parser.proper_count
+            release.title = parser.data
+            entity.releases.append(release)
+            session.add(release)
+            index.releases[key] = release
+        releases.append(release)
+    return releases
+
+
 def store_parser(
-    session: Session, parser: SeriesParseResult, series: Series = None, quality: Quality = None
+    session: Session,
+    parser: SeriesParseResult,
+    series: Series = None,
+    quality: Quality = None,
+    index: ReleaseIndex | None = None,
 ) -> list[SeasonRelease | EpisodeRelease]:
     """Push series information into database. Returns added/existing release.
 
@@ -1408,10 +1535,15 @@ def store_parser(
     :param parser: parser for release that should be added to database
     :param series: Series in database to add release to. Will be looked up if not provided.
     :param quality: If supplied, this will override the quality from the series parser
+    :param index: If supplied (along with `series`), existing rows are looked up from this prefetched
+        :class:`ReleaseIndex` and nothing is flushed. The caller must flush the session before using
+        the ids of returned releases.
     :return: List of Releases
     """
     if quality is None:
         quality = parser.quality
+    if index is not None and series is not None:
+        return _store_parser_indexed(session, index, parser, series, quality)
     if not series:
         # if series does not exist in database, add new
         series = (
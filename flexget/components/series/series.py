@@ -15,6 +15,7 @@ from flexget.config_schema import one_or_more
 from flexget.event import event
 from flexget.manager import Session
 from flexget.utils import qualities
+from flexget.utils.database import QueryCounter
 from flexget.utils.log import log_once
 from flexget.utils.tools import chunked, get_config_as_array, merge_dict_from_to, parse_timedelta
 
@@ -458,135 +459,175 @@ class FilterSeries(FilterSeriesBase):
             ):
                 found_series.setdefault(entry['series_name'], []).append(entry)
 
-        # Prefetch series
-        with Session() as session:
-            # str() added to make sure number shows (e.g. 24) are turned into strings
-            series_names = [str(next(iter(s.keys()))) for s in config]
-            existing_series = (
-                session.query(db.Series)
-                .filter(db.Series.name.in_(series_names))
-                .options(joinedload(db.Series.alternate_names))
-                .all()
-            )
-            existing_series_map = {s.name_normalized: s for s in existing_series}
-            # Expunge so we can work on de-attached while processing the series to minimize db locks
-            session.expunge_all()
-
-        start_time = preferred_clock()
-        for series_item in config:
-            with Session() as session:
-                series_name, series_config = next(iter(series_item.items()))
-
-                if series_config.get('parse_only'):
-                    logger.debug(
-                        'Skipping filtering of series `{}` because of parse_only', series_name
-                    )
-                    continue
-
-                # Make sure number shows (e.g. 24) are turned into strings
-                series_name = str(series_name)
-                db_series = existing_series_map.get(normalize_series_name(series_name))
-                if not db_series:
-                    logger.debug('adding series `{}` into db', series_name)
-                    db_series = db.Series()
-                    db_series.name = series_name
-                    db_series.identified_by = series_config.get('identified_by', 'auto')
-                    session.add(db_series)
-                    logger.debug('-> added `{}`', db_series)
+        # Loaded objects are kept across the commits after each series
+        with Session(expire_on_commit=False) as session:
+            # Prefetch series, episodes, seasons and releases
+            start_time = preferred_clock()
+            with QueryCounter(session) as queries:
+                # str() added to make sure number shows (e.g. 24) are turned into strings
+                series_names = [str(next(iter(s.keys()))) for s in config]
+                existing_series_map = {}
+                for chunk in chunked(series_names):
+                    for db_series in (
+                        session.query(db.Series)
+                        .filter(db.Series.name.in_(chunk))
+                        .options(joinedload(db.Series.alternate_names))
+                    ):
+                        existing_series_map.setdefault(db_series.name_normalized, db_series)
+
+                filtered_series = []
+                new_series = []
+                for series_item in config:
+                    series_name, series_config = next(iter(series_item.items()))
+                    if series_config.get('parse_only'):
+                        logger.debug(
+                            'Skipping filtering of series `{}` because of parse_only', series_name
+                        )
+                        continue
+                    # Make sure number shows (e.g. 24) are turned into strings
+                    series_name = str(series_name)
+                    db_series = existing_series_map.get(normalize_series_name(series_name))
+                    if not db_series:
+                        logger.debug('adding series `{}` into db', series_name)
+                        db_series = db.Series()
+                        db_series.name = series_name
+                        db_series.identified_by = series_config.get('identified_by', 'auto')
+                        session.add(db_series)
+                        logger.debug('-> added `{}`', db_series)
+                        existing_series_map[db_series.name_normalized] = db_series
+                        new_series.append((db_series, series_name, series_config))
+                    filtered_series.append((db_series, series_name, series_config))
+                if new_series:
                     session.flush()  # Flush to get an id on series before adding alternate names.
-                    alts = series_config.get('alternate_name', [])
-                    if not isinstance(alts, list):
-                        alts = [alts]
-                    for alt in alts:
-                        db._add_alt_name(alt, db_series, series_name, session)
-                    existing_series_map[db_series.name_normalized] = db_series
-                else:
-                    # Add existing series back to session
-                    session.add(db_series)
+                    for db_series, series_name, series_config in new_series:
+                        alts = series_config.get('alternate_name', [])
+                        if not isinstance(alts, list):
+                            alts = [alts]
+                        for alt in alts:
+                            db._add_alt_name(alt, db_series, series_name, session)
+
+                index = db.ReleaseIndex()
+                index.prefetch(
+                    session,
+                    [
+                        (
+                            db_series,
+                            [entry['series_parser'] for entry in found_series[series_name]],
+                        )
+                        for db_series, series_name, _ in filtered_series
+                        if series_name in found_series
+                    ],
+                )
+            logger.debug(
+                'series prefetch took {} and {} queries',
+                preferred_clock() - start_time,
+                queries.count,
+            )
 
-                # Skip if series not within entries
-                if series_name not in found_series:
-                    continue
+            # Store found episodes into database and save reference for later use, then process them. Every
+            # series is committed on its own, so db locks are short and a failing series keeps the others.
+            session.commit()
+            start_time = preferred_clock()
+            with QueryCounter(session) as queries:
+                for db_series, series_name, series_config in filtered_series:
+                    series_releases = []
+                    for entry in found_series.get(series_name, []):
+                        releases = db.store_parser(
+                            session,
+                            entry['series_parser'],
+                            series=db_series,
+                            quality=entry.get('quality'),
+                            index=index,
+                        )
+                        series_releases.append((entry, releases))
+                    # Seasons and episodes are hashed by id, so they need to be flushed before grouping
+                    session.flush()
+                    series_entries = {}
+                    for entry, releases in series_releases:
+                        entry['series_releases'] = [r.id for r in releases]
+                        if hasattr(releases[0], 'episode'):
+                            entity = releases[0].episode
+                        else:
+                            entity = releases[0].season
+                        series_entries.setdefault(entity, []).append(entry)
+                    self.filter_series(task, db_series, series_name, series_config, series_entries)
+                    session.commit()
+            logger.debug(
+                'processing series took {} and {} queries',
+                preferred_clock() - start_time,
+                queries.count,
+            )
 
-                series_entries = {}
-                for entry in found_series[series_name]:
-                    # store found episodes into database and save reference for later use
-                    releases = db.store_parser(
-                        session,
-                        entry['series_parser'],
-                        series=db_series,
-                        quality=entry.get('quality'),
-                    )
-                    entry['series_releases'] = [r.id for r in releases]
-                    if hasattr(releases[0], 'episode'):
-                        entity = releases[0].episode
-                    else:
-                        entity = releases[0].season
-                    series_entries.setdefault(entity, []).append(entry)
+    def filter_series(self, task, db_series, series_name, series_config, series_entries):
+        """Update series state from newly stored releases and accept or reject entries of one series.
 
-                # If we didn't find any episodes for this series, continue
-                if not series_entries:
-                    logger.trace('No entries found for `{}` this run.', series_name)
-                    continue
+        :param task: Current Task
+        :param db_series: Series in database
+        :param series_name: Series name which is being processed
+        :param series_config: Series config being processed
+        :param series_entries: dict mapping Episodes or Seasons to entries for that episode or season_pack
+        """
+        # If we didn't find any episodes for this series, continue
+        if not series_entries:
+            logger.trace('No entries found for `{}` this run.', series_name)
+            return
 
-                # configuration always overrides everything
-                if series_config.get('identified_by', 'auto') != 'auto':
-                    db_series.identified_by = series_config['identified_by']
+        # configuration always overrides everything
+        if series_config.get('identified_by', 'auto') != 'auto':
+            db_series.identified_by = series_config['identified_by']
 
-                # if series doesn't have identified_by flag already set, calculate one now that new eps are added to db
-                auto_begin = False
-                if not db_series.identified_by or db_series.identified_by == 'auto':
-                    db_series.identified_by = db.auto_identified_by(db_series)
-                    logger.debug(
-                        'identified_by set to `{}` based on series history',
-                        db_series.identified_by,
-                    )
-                    # Update begin only if locked into ep or seq mode
-                    if db_series.identified_by in ['ep', 'seq']:
-                        auto_begin = True
-
-                # Remove begin episode if identified_by has now been set to a different type than begin ep
-                if db_series.begin and db_series.identified_by not in (
-                    'auto',
-                    db_series.begin.identified_by,
-                ):
-                    logger.warning(
-                        'Removing begin episode for {} ({}) because it does not match the identified_by type for series ({})',
-                        series_name,
-                        db_series.begin.identifier,
-                        db_series.identified_by,
+        # if series doesn't have identified_by flag already set, calculate one now that new eps are added to db
+        auto_begin = False
+        if not db_series.identified_by or db_series.identified_by == 'auto':
+            db_series.identified_by = db.auto_identified_by(db_series)
+            logger.debug(
+                'identified_by set to `{}` based on series history',
+                db_series.identified_by,
+            )
+            # Update begin only if locked into ep or seq mode
+            if db_series.identified_by in ['ep', 'seq']:
+                auto_begin = True
+
+        # Remove begin episode if identified_by has now been set to a different type than begin ep
+        if db_series.begin and db_series.identified_by not in (
+            'auto',
+            db_series.begin.identified_by,
+        ):
+            logger.warning(
+                'Removing begin episode for {} ({}) because it does not match the identified_by type for series ({})',
+                series_name,
+                db_series.begin.identifier,
+                db_series.identified_by,
+            )
+            del db_series.begin
+            auto_begin = True
+
+        # Set begin to latest release, or fall back to beginning
+        if auto_begin:
+            latest: db.Episode = db.get_latest_release(db_series)
+            ep_id = None
+            if latest:
+                if db_series.identified_by == 'ep':
+                    ep_id = f'S{latest.season}E01'
+                else:
+                    ep_id = latest.identifier
+                logger.verbose(
+                    f'Defaulting series `{series_name}` begin to start of current season `{ep_id}`'
+                )
+            else:
+                if db_series.identified_by == 'ep':
+                    ep_id = 'S01E01'
+                elif db_series.identified_by == 'sequence':
+                    ep_id = '01'
+                if ep_id is not None:
+                    logger.verbose(
+                        f'Defaulting series `{series_name}` begin to best guess `{ep_id}`'
                     )
-                    del db_series.begin
-                    auto_begin = True
-
-                # Set begin to latest release, or fall back to beginning
-                if auto_begin:
-                    latest: db.Episode = db.get_latest_release(entity.series)
-                    ep_id = None
-                    if latest:
-                        if db_series.identified_by == 'ep':
-                            ep_id = f'S{latest.season}E01'
-                        else:
-                            ep_id = latest.identifier
-                        logger.verbose(
-                            f'Defaulting series `{series_name}` begin to start of current season `{ep_id}`'
-                        )
-                    else:
-                        if db_series.identified_by == 'ep':
-                            ep_id = 'S01E01'
-                        elif db_series.identified_by == 'sequence':
-                            ep_id = '01'
-                        if ep_id is not None:
-                            logger.verbose(
-                                f'Defaulting series `{series_name}` begin to best guess `{ep_id}`'
-                            )
-
-                    if ep_id is not None:
-                        db.set_series_begin(entity.series, ep_id)
 
-                self.process_series(task, series_entries, series_config)
+            if ep_id is not None:
+                db.set_series_begin(db_series, ep_id)
 
-        logger.debug('processing series took {}', preferred_clock() - start_time)
+        self.process_series(task, series_entries, series_config)
 
     def parse_series(self, entries, series_name, config, db_identified_by=None):
         """Search for `series_name` and populate all `series_*` fields in entries when successfully parsed.
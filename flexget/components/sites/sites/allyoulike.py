@@ -70,7 +70,7 @@ class UrlRewriteAllyoulike:
         except RequestException as e:
             raise UrlRewritingError(str(e))
         try:
-            return get_soup(page.text)
+            return get_soup(page.text, plugin='allyoulike')
         except Exception as e:
             raise UrlRewritingError(str(e))
 
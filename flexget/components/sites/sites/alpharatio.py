@@ -251,7 +251,7 @@ class SearchAlphaRatio:
                 logger.error('AlphaRatio request failed: {}', e)
                 continue
 
-            soup = get_soup(page.content)
+            soup = get_soup(page.content, plugin='alpharatio')
 
             # extract the column indices
             header_soup = soup.find('tr', attrs={'class': 'colhead'})
@@ -27,7 +27,7 @@ class UrlRewriteBakaBT:
         txheaders = {'User-agent': 'Mozilla/4.0 (compatible; MSIE 5.5; Windows NT)'}
         page = requests.get(url, headers=txheaders)
         try:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='bakabt')
         except Exception as e:
             raise UrlRewritingError(e)
         tag_a = soup.find('a', attrs={'class': 'download_link'})
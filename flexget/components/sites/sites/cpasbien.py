@@ -94,7 +94,7 @@ class SearchCPASBIEN:
             logger.debug('search url: {}', url + '.html')
             # GET URL
             f = task.requests.get(url + '.html').content
-            soup = get_soup(f)
+            soup = get_soup(f, plugin='cpasbien')
             if soup.findAll(text=re.compile(' 0 torrents')):
                 logger.debug('search returned no results')
             else:
@@ -104,7 +104,7 @@ class SearchCPASBIEN:
                         newurl = url + '/page-' + str(nextpage)
                         logger.debug('-----> NEXT PAGE : {}', newurl)
                         f1 = task.requests.get(newurl).content
-                        soup = get_soup(f1)
+                        soup = get_soup(f1, plugin='cpasbien')
                     for result in soup.findAll('div', attrs={'class': re.compile('ligne')}):
                         entry = Entry()
                         link = result.find('a', attrs={'href': re.compile('dl-torrent')})
@@ -29,7 +29,7 @@ class UrlRewriteDeadFrog:
         txheaders = {'User-agent': 'Mozilla/4.0 (compatible; MSIE 5.5; Windows NT)'}
         page = requests.get(url, headers=txheaders)
         try:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='deadfrog')
         except Exception as e:
             raise UrlRewritingError(e)
         down_link = soup.find('a', attrs={'href': re.compile(r'download/\d+/.*\.torrent')})
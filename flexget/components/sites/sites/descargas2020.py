@@ -58,7 +58,7 @@ class UrlRewriteDescargas2020:
         except requests.RequestException as e:
             raise UrlRewritingError(e)
         try:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='descargas2020')
         except Exception as e:
             raise UrlRewritingError(e)
 
@@ -107,7 +107,7 @@ class UrlRewriteDescargas2020:
                 logger.error('Error searching Descargas2020: {}', e)
                 return results
             content = response.content
-            soup = get_soup(content)
+            soup = get_soup(content, plugin='descargas2020')
             soup2 = soup.find('ul', attrs={'class': 'buscar-list'})
             children = soup2.findAll('a', href=True)
             for child in children:
@@ -32,7 +32,7 @@ class UrlRewriteETTV:
         txheaders = {'User-agent': 'Mozilla/4.0 (compatible; MSIE 5.5; Windows NT)'}
         page = requests.get(url, headers=txheaders)
         try:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='ettv')
         except Exception as e:
             raise UrlRewritingError(e)
         tag_a = soup.select_one('a[href^="magnet:"]')
@@ -50,7 +50,7 @@ class Eztv:
 
         logger.debug('Eztv mirror `{}` chosen', url)
         try:
-            soup = get_soup(page)
+            soup = get_soup(page, plugin='eztv')
             mirrors = soup.find_all('a', attrs={'class': re.compile(r'download_\d')})
         except Exception as e:
             raise UrlRewritingError(e)
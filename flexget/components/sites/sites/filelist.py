@@ -143,7 +143,7 @@ class SearchFileList:
         try:
             # get validator token
             response = requests.get(BASE_URL + 'login.php')
-            soup = get_soup(response.content)
+            soup = get_soup(response.content, plugin='filelist')
 
             login_validator = soup.find('input', {'name': 'validator'})
 
@@ -210,7 +210,7 @@ class SearchFileList:
                 logger.error('FileList.ro request failed: {}', e)
                 continue
 
-            soup = get_soup(page.content)
+            soup = get_soup(page.content, plugin='filelist')
             for result in soup.findAll('div', attrs={'class': 'torrentrow'}):
                 e = Entry()
 
@@ -243,7 +243,7 @@ class SearchFileList:
                         except RequestException as e:
                             logger.error('FileList.ro request failed: {}', e)
                             continue
-                        title_soup = get_soup(request.content)
+                        title_soup = get_soup(request.content, plugin='filelist')
                         title = title_soup.find('div', attrs={'class': 'cblock-header'}).text
 
                 e['title'] = title
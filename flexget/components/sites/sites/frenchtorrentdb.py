@@ -32,7 +32,7 @@ class UrlRewriteFTDB:
     def parse_download_page(self, page_url, requests):
         page = requests.get(page_url)
         try:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='frenchtorrentdb')
         except Exception as e:
             raise UrlRewritingError(e)
         tag_a = soup.find('a', {'class': 'dl_link'})
@@ -72,7 +72,7 @@ class UrlRewriteFuzer:
             raise PluginError('Could not fetch results from Fuzer. Check config')
 
         logger.debug('Using {} as fuzer search url', page.url)
-        return get_soup(page.content)
+        return get_soup(page.content, plugin='fuzer')
 
     def extract_entry_from_soup(self, soup):
         table = soup.find('div', {'id': 'main_table'})
@@ -31,7 +31,7 @@ class UrlRewriteGoogleCse:
         txheaders = {'User-agent': 'Mozilla/4.0 (compatible; MSIE 5.5; Windows NT)'}
         try:
             page = task.requests.get(entry['url'], headers=txheaders)
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='google_cse')
             results = soup.find_all('a', attrs={'class': 'l'})
         except Exception as e:
             raise UrlRewritingError(e)
@@ -59,7 +59,7 @@ class UrlRewriteGoogle:
     def url_rewrite(self, task, entry):
         logger.debug('Requesting {}', entry['url'])
         page = requests.get(entry['url'])
-        soup = get_soup(page.text)
+        soup = get_soup(page.text, plugin='google')
 
         for link in soup.findAll('a', attrs={'href': re.compile(r'^/url')}):
             # Extract correct url from google internal link
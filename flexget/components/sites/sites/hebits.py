@@ -74,7 +74,7 @@ class SearchHeBits:
         authkey, passkey = None, None
         cookies = {'userid': f'{config["userid"]}', 'session': f'{config["session"]}'}
         response = requests.get(url, cookies=cookies, params={'id': config['userid']})
-        user_profile_soup = get_soup(response.text)
+        user_profile_soup = get_soup(response.text, plugin='hebits')
         for tag in user_profile_soup.find_all('meta'):
             if tag.get('name', None) == 'authkey':
                 authkey = tag.get('content')
@@ -33,7 +33,7 @@ class UrlRewriteHliang:
             raise UrlRewritingError(msg)
 
         try:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='hliang')
         except Exception as e:
             raise UrlRewritingError(str(e))
 
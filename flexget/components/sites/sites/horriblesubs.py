@@ -22,7 +22,7 @@ class HorribleSubs:
         entries = []
 
         try:
-            soup = get_soup(requests.get(page_url).content)
+            soup = get_soup(requests.get(page_url).content, plugin='horriblesubs')
         except RequestException as e:
             logger.error('HorribleSubs request failed: {}', e)
             return entries
@@ -51,7 +51,7 @@ class HorribleSubs:
         entries = []
 
         try:
-            soup = get_soup(requests.get(page_url).content)
+            soup = get_soup(requests.get(page_url).content, plugin='horriblesubs')
         except RequestException as e:
             logger.error('HorribleSubs request failed: {}', e)
             return entries
@@ -65,7 +65,9 @@ class HorribleSubs:
             episode = re.sub(r'.*#', '', url)
             # Get show ID
             try:
-                soup = get_soup(requests.get(f'https://horriblesubs.info/{url}').content)
+                soup = get_soup(
+                    requests.get(f'https://horriblesubs.info/{url}').content, plugin='horriblesubs'
+                )
             except RequestException as e:
                 logger.error('HorribleSubs request failed: {}', e)
                 return entries
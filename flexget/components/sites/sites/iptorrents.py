@@ -163,7 +163,7 @@ class UrlRewriteIPTorrents:
             if '/u/' + str(config['uid']) not in req.text:
                 raise plugin.PluginError('Invalid cookies (user not logged in)...')
 
-            soup = get_soup(req.content, parser='html5lib')
+            soup = get_soup(req.content, parser='html5lib', plugin='iptorrents')
             torrents = soup.find('table', {'id': 'torrents'})
             seeders_idx = None
             leechers_idx = None
@@ -27,7 +27,7 @@ class UrlRewriteKoreus:
         txheaders = {'User-agent': 'Mozilla/4.0 (compatible; MSIE 5.5; Windows NT)'}
         page = requests.get(url, headers=txheaders)
         try:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='koreus')
         except Exception as e:
             raise UrlRewritingError(e)
         down_link = soup.find('a', attrs={'href': re.compile('.+mp4')})
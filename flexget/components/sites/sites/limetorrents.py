@@ -94,7 +94,7 @@ class Limetorrents:
                 logger.error('Limetorrents request failed: {}', e)
                 continue
 
-            soup = get_soup(page.content)
+            soup = get_soup(page.content, plugin='limetorrents')
             if soup.find('a', attrs={'class': 'csprite_dl14'}) is not None:
                 for link in soup.findAll('a', attrs={'class': 'csprite_dl14'}):
                     row = link.find_parent('tr')
@@ -331,7 +331,7 @@ class LostFilm:
                     )
                 continue
 
-            page = get_soup(response.content)
+            page = get_soup(response.content, plugin='lostfilm')
 
             download_page_url = None
             find_item = page.find('html', recursive=False)
@@ -374,7 +374,7 @@ class LostFilm:
                 )
                 continue
 
-            page = get_soup(response.content)
+            page = get_soup(response.content, plugin='lostfilm')
 
             if not perfect_match:
                 logger.trace('Trying to find series names in the final torrents download page')
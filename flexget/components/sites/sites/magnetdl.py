@@ -58,7 +58,7 @@ class MagnetDL:
         if page.status_code != 200:
             raise plugin.PluginError(f'HTTP Request failed {page.status_code}. Url: {url}')
 
-        soup = get_soup(page.text)
+        soup = get_soup(page.text, parser='html5lib', plugin='magnetdl')
         soup_table = soup.find('table', class_='download')
         if not soup_table:
             # very likely no result
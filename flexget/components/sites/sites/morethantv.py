@@ -273,7 +273,7 @@ class SearchMoreThanTV:
                 logger.error('MoreThanTV request failed: {}', e)
                 continue
 
-            soup = get_soup(page.content)
+            soup = get_soup(page.content, plugin='morethantv')
             for result in soup.findAll('tr', attrs={'class': 'torrent'}):
                 group_info = result.find('td', attrs={'class': 'big_info'}).find(
                     'div', attrs={'class': 'group_info'}
@@ -80,7 +80,7 @@ class UrlRewriteNcore:
         }
 
         page = task.requests.post(URL + '/login.php', data=data, headers=HEADERS)
-        soup = get_soup(page.content)
+        soup = get_soup(page.content, plugin='ncore')
         passkey_line = str(soup.find('link', href=re.compile(r'rss\.php\?key=')))
         passkey = passkey_line[passkey_line.find('key=') : passkey_line.find('"', 20, 90)]
 
@@ -101,7 +101,7 @@ class UrlRewriteNcore:
                 data['hogyan'] = 'DESC'
 
             page = task.requests.post(URL + '/torrents.php', data=data, headers=HEADERS)
-            soup = get_soup(page.content)
+            soup = get_soup(page.content, plugin='ncore')
             for a in soup.findAll('a', title=re.compile('.+')):
                 if 'details' in a.get('href'):
                     e = Entry()
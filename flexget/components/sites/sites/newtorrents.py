@@ -90,7 +90,7 @@ class NewTorrents:
         # TODO: should use beautifulsoup massage
         html = re.sub(r'(</SCR.*?)...(.*?IPT>)', r'\1\2', html)
 
-        soup = get_soup(html)
+        soup = get_soup(html, plugin='newtorrents')
         # saving torrents in dict
         torrents = []
         for link in soup.find_all('a', attrs={'href': re.compile('down.php')}):
@@ -1,9 +1,9 @@
-from bs4 import BeautifulSoup
 from loguru import logger
 
 from flexget import plugin
 from flexget.event import event
 from flexget.utils import requests
+from flexget.utils.soup import get_soup
 
 logger = logger.bind(name='nnm-club')
 
@@ -22,7 +22,7 @@ class UrlRewriteNnmClub:
             entry['url'] = None
             return
         html = r.content
-        soup = BeautifulSoup(html)
+        soup = get_soup(html, plugin='nnm-club', parse_only='a')
         links = soup.findAll('a', href=True)
         magnets = [x for x in links if x.get('href').startswith('magnet')]
         if not magnets:
@@ -134,7 +134,7 @@ class SearchPTN:
                 logger.error('Error searching ptn: {}', e)
                 continue
             # html5parser doesn't work properly for some reason
-            soup = get_soup(r.text, parser='html.parser')
+            soup = get_soup(r.text, parser='html.parser', plugin='ptn')
             for movie in soup.select('.torrentstd'):
                 imdb_id = movie.find('a', href=re.compile(r'.*imdb\.com/title/tt'))
                 if imdb_id:
@@ -90,7 +90,7 @@ class UrlRewriteRlsbb:
         except RequestException as e:
             raise UrlRewritingError(str(e))
         try:
-            return get_soup(page.text)
+            return get_soup(page.text, plugin='rlsbb')
         except Exception as e:
             raise UrlRewritingError(str(e))
 
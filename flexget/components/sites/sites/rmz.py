@@ -66,7 +66,7 @@ class UrlRewriteRmz:
         except RequestException as e:
             raise UrlRewritingError(str(e))
         try:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, plugin='rmz')
         except Exception as e:
             raise UrlRewritingError(str(e))
         link_elements = soup.find_all('pre', class_='links')
@@ -87,7 +87,7 @@ class UrlRewriteSerienjunkies:
     def parse_downloads(self, series_url, search_title):
         page = requests.get(series_url).content
         try:
-            soup = get_soup(page)
+            soup = get_soup(page, plugin='serienjunkies')
         except Exception as e:
             raise UrlRewritingError(e)
 
@@ -1,6 +1,7 @@
 import re
 from urllib.parse import quote
 
+from bs4 import SoupStrainer
 from loguru import logger
 
 from flexget import plugin
@@ -58,7 +59,7 @@ class Site1337x:
             logger.error('1337x request failed: {}', e)
             raise UrlRewritingError(f'1337x request failed: {e}')
 
-        soup = get_soup(page.content)
+        soup = get_soup(page.content, plugin='1337x', parse_only='a')
 
         magnet_url = str(soup.find('a', href=re.compile(r'^magnet:\?')).get('href')).lower()
         torrent_url = str(soup.find('a', href=re.compile(r'\.torrent$')).get('href')).lower()
@@ -95,7 +96,11 @@ class Site1337x:
                 logger.error('1337x request failed: {}', e)
                 continue
 
-            soup = get_soup(page.content)
+            soup = get_soup(
+                page.content,
+                plugin='1337x',
+                parse_only=SoupStrainer('div', class_=re.compile(r'\btable-list-wrap\b')),
+            )
             if soup.find('div', attrs={'class': 'table-list-wrap'}) is not None:
                 for link in soup.find('div', attrs={'class': 'table-list-wrap'}).findAll(
                     'a', href=re.compile('^/torrent/')
@@ -22,7 +22,12 @@ from flexget.event import event, fire_event
 from flexget.terminal import console
 from flexget.utils import json, qualities, template
 from flexget.utils.template import get_template
-from flexget.utils.tools import parse_episode_identifier, parse_filesize, parse_timedelta
+from flexget.utils.tools import (
+    LRUCache,
+    parse_episode_identifier,
+    parse_filesize,
+    parse_timedelta,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -36,6 +41,25 @@ BaseValidator = jsonschema.Draft202012Validator
 # Type hint for json schemas. (If we upgrade to a newer json schema version, the type might allow more than dicts.)
 JsonSchema = dict[str, Any] | bool
 schema_paths: dict[str, JsonSchema | Callable[..., JsonSchema]] = {}
+# Validators built by `process_config`, keyed by (id of schema, set_defaults). Values are (schema, validator)
+validator_cache = LRUCache(max_size=100)
+# Registry holding all registered schemas, built when first needed
+_registry: _Registry | None = None
+# Incremented whenever a registered schema changes
+_schema_version = 0
+
+
+def clear_validator_cache() -> None:
+    """Forget validators and the schema registry, needed whenever a registered schema changes."""
+    global _registry, _schema_version
+    validator_cache.clear()
+    _registry = None
+    _schema_version += 1
+
+
+def get_schema_version() -> int:
+    """Return a number which changes whenever a schema is registered, for caches of validation results."""
+    return _schema_version
 
 
 class ConfigValidationError(ValidationError):
@@ -54,6 +78,7 @@ def register_schema(path: str, schema: JsonSchema | Callable[..., JsonSchema]):
     :param schema: The schema, or function which returns the schema
     """
     schema_paths[path] = schema
+    clear_validator_cache()
 
 
 # Validator that handles root structure of config.
@@ -75,6 +100,7 @@ def register_config_key(key: str, schema: JsonSchema, required: bool = False):
     if required:
         root_schema.setdefault('required', []).append(key)
     register_schema(f'/schema/config/{key}', schema)
+    clear_validator_cache()
 
 
 def get_schema() -> JsonSchema:
@@ -128,6 +154,37 @@ def retrieve_resource(uri: str) -> Resource:
     return Resource.from_contents(resolve_ref(uri))
 
 
+def _iter_refs(schema: Any):
+    """Yield all $refs in `schema`."""
+    if isinstance(schema, dict):
+        for key, value in schema.items():
+            if key == '$ref' and isinstance(value, str):
+                yield value
+            else:
+                yield from _iter_refs(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            yield from _iter_refs(value)
+
+
+def get_registry() -> _Registry:
+    """Return a crawled registry of all registered schemas.
+
+    Looking up a $ref which is not in the registry crawls the whole registry and the retrieved schema again, so the
+    schemas generated from a function for the $refs used by the registered schemas are added here as well.
+    """
+    global _registry
+    if _registry is None:
+        static = {path: schema for path, schema in schema_paths.items() if not callable(schema)}
+        resources = {path: Resource.from_contents(resolve_ref(path)) for path in static}
+        for ref in _iter_refs(list(static.values())):
+            uri = ref.partition('#')[0]
+            if uri not in resources and urlparse(uri).path in schema_paths:
+                resources[uri] = retrieve_resource(uri)
+        _registry = Registry().with_resources(resources.items()).crawl()
+    return _registry
+
+
 def process_config(
     config: Any, schema: JsonSchema | None = None, set_defaults: bool = True
 ) -> list[ConfigValidationError]:
@@ -141,16 +198,11 @@ def process_config(
     if schema is None:
         schema = get_schema()
 
-    registry = Registry()
     if set_defaults:
         # Use the jsonschema 'validates' decorator to make sure our custom behavior continues across $refs
         # which declare a $schema. https://github.com/python-jsonschema/jsonschema/issues/994
         jsonschema.validators.validates(f'{BASE_SCHEMA_NAME} w defaults')(SchemaValidatorWDefaults)
-        validator = SchemaValidatorWDefaults(
-            schema, registry=registry, format_checker=format_checker
-        )
-    else:
-        validator = SchemaValidator(schema, registry=registry, format_checker=format_checker)
+    validator = get_validator(schema, set_defaults)
     try:
         errors: list[ValidationError] = list(validator.iter_errors(config))
     finally:
@@ -163,6 +215,22 @@ def process_config(
     return errors
 
 
+def get_validator(schema: JsonSchema, set_defaults: bool = True) -> jsonschema.protocols.Validator:
+    """Return a validator for `schema`, reusing the one built for the same schema object if possible.
+
+    :param set_defaults: Whether the validator fills in defaults from the schema.
+    """
+    key = (id(schema), set_defaults)
+    cached = validator_cache.get(key)
+    # The schema is kept in the value, so its id can't be reused for another schema while cached
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    validator_class = SchemaValidatorWDefaults if set_defaults else SchemaValidator
+    validator = validator_class(schema, registry=get_registry(), format_checker=format_checker)
+    validator_cache.put(key, (schema, validator))
+    return validator
+
+
 def parse_time(time_string: str) -> datetime.time:
     """Parse a time string from the config into a :class:`datetime.time` object."""
     formats = ['%I:%M %p', '%H:%M', '%H:%M:%S']
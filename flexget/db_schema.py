@@ -11,8 +11,8 @@ from sqlalchemy.ext.declarative import DeclarativeMeta
 from sqlalchemy.orm import as_declarative
 
 import flexget
+from flexget.db_session import Base, Session
 from flexget.event import event
-from flexget.manager import Base, Session
 from flexget.utils.database import with_session
 from flexget.utils.sqlalchemy_utils import table_schema
 from flexget.utils.tools import get_current_flexget_version
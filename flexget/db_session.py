@@ -0,0 +1,14 @@
+"""Declarative base and session factory of the FlexGet database.
+
+They are defined apart from the manager, which binds the session factory to its database, so that the modules
+defining tables can be imported on their own.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+from flexget.utils.sqlalchemy_utils import ContextSession
+
+Base = declarative_base()
+Session: type[ContextSession] = sessionmaker(class_=ContextSession)
@@ -13,7 +13,12 @@ from loguru import logger
 
 from flexget import plugin
 from flexget.utils.lazy_dict import LazyDict, LazyLookup
-from flexget.utils.serialization import Serializer, deserialize, serialize
+from flexget.utils.serialization import (
+    Serializer,
+    compact_deserialize,
+    compact_serialize,
+    deserialize,
+)
 from flexget.utils.template import CoercingDateTime, FlexGetTemplate, render_from_entry
 
 if TYPE_CHECKING:
@@ -321,6 +326,11 @@ class Entry(LazyDict, Serializer):
         logger.trace('rendering: {}', template)
         return render_from_entry(template, self, native=native)
 
+    @classmethod
+    def serializer_version(cls) -> int:
+        # Version 2 uses the compact encoding for fields and lazy lookups
+        return 2
+
     @classmethod
     def serialize(cls, entry: Entry) -> dict:
         fields = {}
@@ -328,13 +338,13 @@ class Entry(LazyDict, Serializer):
             if key.startswith('_') or entry.is_lazy(key):
                 continue
             try:
-                fields[key] = serialize(entry[key])
+                fields[key] = compact_serialize(entry[key])
             except TypeError as exc:
                 logger.debug('field {} was not serializable. {}', key, exc)
         lazy_lookups = []
         for ll in entry.lazy_lookups:
             try:
-                lazy_lookups.append(serialize(ll))
+                lazy_lookups.append(compact_serialize(ll))
             except TypeError:
                 logger.exception(
                     'BUG: Lazy lookup was not compatible with serialization. Please file a bug report'
@@ -343,10 +353,11 @@ class Entry(LazyDict, Serializer):
 
     @classmethod
     def deserialize(cls, data, version) -> Entry:
+        decode = compact_deserialize if version >= 2 else deserialize
         result = cls()
         for key, value in data['fields'].items():
-            result[key] = deserialize(value)
-        for lazy_lookup in deserialize(data['lazy_lookups']):
+            result[key] = decode(value)
+        for lazy_lookup in decode(data['lazy_lookups']):
             result.add_lazy_fields(*lazy_lookup)
         return result
 
@@ -65,6 +65,11 @@ def get_events(name: str) -> list[Event]:
     return _events[name]
 
 
+def get_all_events() -> list[Event]:
+    """Return every registered :class:`Event`, for all event names."""
+    return [event for events in _events.values() for event in events]
+
+
 def add_event_handler(name: str, func: Callable, priority: int = 128) -> Event:
     """Return event created.
 
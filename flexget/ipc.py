@@ -12,7 +12,13 @@ import rpyc
 from loguru import logger
 from rpyc.utils.server import ThreadedServer
 
-from flexget import terminal
+from flexget.ipc_client import (  # noqa: F401
+    AUTH_ERROR,
+    AUTH_SUCCESS,
+    IPC_VERSION,
+    ClientService,
+    IPCClient,
+)
 from flexget.log import capture_logs
 from flexget.options import get_parser
 
@@ -21,14 +27,6 @@ if TYPE_CHECKING:
 
 logger = logger.bind(name='ipc')
 
-# Allow some attributes from dict interface to be called over the wire
-rpyc.core.protocol.DEFAULT_CONFIG['safe_attrs'].update(['items'])
-rpyc.core.protocol.DEFAULT_CONFIG['allow_pickle'] = True
-
-IPC_VERSION = 4
-AUTH_ERROR = b'authentication error'
-AUTH_SUCCESS = b'authentication success'
-
 
 class RemoteStream:
     """Used as a filelike to stream text to remote client.
@@ -105,30 +103,6 @@ class DaemonService(rpyc.Service):
         return self._conn.root.log_sink(message)
 
 
-class ClientService(rpyc.Service):
-    def on_connect(self, conn):
-        self._conn = conn
-        """Make sure the client version matches our own."""
-        daemon_version = self._conn.root.version()
-        if daemon_version != IPC_VERSION:
-            self._conn.close()
-            raise ValueError('Daemon is different version than client.')
-        super().on_connect(conn)
-
-    def exposed_version(self):
-        return IPC_VERSION
-
-    def exposed_console(self, text, *args, **kwargs):
-        text = rpyc.classic.obtain(text)
-        terminal.console(text, *args, **kwargs)
-
-    def exposed_log_sink(self, message):
-        message = rpyc.classic.obtain(message)
-        record = message.record
-        level, message = record['level'].name, record['message']
-        logger.patch(lambda r: r.update(record)).log(level, message)
-
-
 class IPCServer:
     def __init__(self, manager, port=None):
         self.daemon = True
@@ -178,23 +152,3 @@ class IPCServer:
     def shutdown(self):
         if self.server:
             self.server.close()
-
-
-class IPCClient:
-    def __init__(self, port, password: str):
-        channel = rpyc.Channel(rpyc.SocketStream.connect('127.0.0.1', port))
-        channel.send(password.encode('utf-8'))
-        response = channel.recv()
-        if response == AUTH_ERROR:
-            # TODO: What to raise here. I guess we create a custom error
-            raise ValueError('Invalid password for daemon')
-        self.conn = rpyc.utils.factory.connect_channel(
-            channel, service=ClientService, config={'sync_request_timeout': None}
-        )
-
-    def close(self):
-        self.conn.close()
-
-    def __getattr__(self, item):
-        """Proxy all other calls to the exposed daemon service."""
-        return getattr(self.conn.root, item)
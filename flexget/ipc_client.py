@@ -0,0 +1,227 @@
+"""Client side of the IPC connection to a running FlexGet daemon.
+
+This module is imported before anything else when FlexGet is run from the command line, so that commands for an
+already running daemon can be forwarded to it without loading plugins, the database or the config. Keep its
+imports to a minimum.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import rpyc
+from loguru import logger
+
+from flexget import log
+from flexget.options import CoreArgumentParser, ParserError, manager_parser
+from flexget.utils.tools import pid_exists
+
+if TYPE_CHECKING:
+    import argparse
+    from collections.abc import Callable, Sequence
+
+logger = logger.bind(name='ipc')
+
+# Allow some attributes from dict interface to be called over the wire
+rpyc.core.protocol.DEFAULT_CONFIG['safe_attrs'].update(['items'])
+rpyc.core.protocol.DEFAULT_CONFIG['allow_pickle'] = True
+
+IPC_VERSION = 4
+AUTH_ERROR = b'authentication error'
+AUTH_SUCCESS = b'authentication success'
+
+
+def _terminal_console(text, *args, **kwargs) -> None:
+    from flexget.terminal import console
+
+    console(text, *args, **kwargs)
+
+
+class ClientService(rpyc.Service):
+    def __init__(self, console: Callable | None = None):
+        """:param console: Function to print text sent by the daemon. Defaults to `flexget.terminal.console`."""
+        self.console = console or _terminal_console
+
+    def on_connect(self, conn):
+        self._conn = conn
+        """Make sure the client version matches our own."""
+        daemon_version = self._conn.root.version()
+        if daemon_version != IPC_VERSION:
+            self._conn.close()
+            raise ValueError('Daemon is different version than client.')
+        super().on_connect(conn)
+
+    def exposed_version(self):
+        return IPC_VERSION
+
+    def exposed_console(self, text, *args, **kwargs):
+        text = rpyc.classic.obtain(text)
+        self.console(text, *args, **kwargs)
+
+    def exposed_log_sink(self, message):
+        message = rpyc.classic.obtain(message)
+        record = message.record
+        level, message = record['level'].name, record['message']
+        logger.patch(lambda r: r.update(record)).log(level, message)
+
+
+class IPCClient:
+    def __init__(self, port, password: str, console: Callable | None = None):
+        channel = rpyc.Channel(rpyc.SocketStream.connect('127.0.0.1', port))
+        channel.send(password.encode('utf-8'))
+        response = channel.recv()
+        if response == AUTH_ERROR:
+            # TODO: What to raise here. I guess we create a custom error
+            raise ValueError('Invalid password for daemon')
+        self.conn = rpyc.utils.factory.connect_channel(
+            channel, service=ClientService(console), config={'sync_request_timeout': None}
+        )
+
+    def close(self):
+        self.conn.close()
+
+    def __getattr__(self, item):
+        """Proxy all other calls to the exposed daemon service."""
+        return getattr(self.conn.root, item)
+
+
+def find_config(config: str | os.PathLike) -> tuple[Path | None, list[Path]]:
+    """Look for the config file in the standard locations.
+
+    :param config: Config file as given on the command line.
+    :return: Tuple of the config path (None if it was not found) and the list of directories searched.
+    """
+    options_config = Path(config).expanduser()
+    if options_config.is_absolute():
+        # explicit path given, don't try anything
+        return options_config, [options_config]
+
+    possible = []
+    logger.debug('Figuring out config load paths')
+    try:
+        possible.append(Path.cwd())
+    except OSError:
+        logger.debug('current directory invalid, not searching for config there')
+    # for virtualenv / dev sandbox
+    if hasattr(sys, 'real_prefix'):
+        logger.debug('Adding virtualenv path')
+        possible.append(Path(sys.prefix))
+    # normal lookup locations
+    possible.append(Path('~/.flexget').expanduser())
+    if sys.platform.startswith('win'):
+        # On windows look in ~/flexget as well, as explorer does not let you create a folder starting with a dot
+        possible.append(Path('~/flexget').expanduser())
+    else:
+        # The freedesktop.org standard config location
+        xdg_config = os.environ.get('XDG_CONFIG_HOME', '~/.config')
+        possible.append(Path(xdg_config, 'flexget').expanduser())
+
+    for path in possible:
+        candidate = path / options_config
+        if candidate.exists():
+            logger.debug('Found config: {}', candidate)
+            return candidate, possible
+    return None, possible
+
+
+def lockfile_path(config_path: Path, test: bool = False) -> Path:
+    """Return the lock file used by the manager for given config file."""
+    prefix = '.test-' if test else '.'
+    return config_path.parent.resolve() / f'{prefix}{config_path.stem}-lock'
+
+
+def read_lock(lockfile: str | os.PathLike | None) -> dict | None:
+    """Read the values from a lock file. Returns None if there is no current lock file."""
+    if lockfile and os.path.exists(lockfile):
+        result: dict[str, str | int] = {}
+        with open(lockfile, encoding='utf-8') as f:
+            lines = [line for line in f if line]
+        for line in lines:
+            try:
+                key, value = line.split(':', 1)
+            except ValueError:
+                logger.debug('Invalid line in lock file: {}', line)
+                continue
+            result[key.strip().lower()] = value.strip()
+        for key, value in result.items():
+            if value.isdigit():
+                result[key] = int(value)
+        result.setdefault('pid', None)
+        if not result['pid']:
+            logger.error('Invalid lock file. Make sure FlexGet is not running, then delete it.')
+        elif not pid_exists(result['pid']):
+            return None
+        return result
+    return None
+
+
+def parse_manager_options(args: Sequence[str]) -> argparse.Namespace | None:
+    """Parse the manager options the same way `Manager.parse_initial_options` does.
+
+    :return: The parsed options, or None if they could not be parsed, or need the manager to be handled.
+    """
+    args = list(args)
+    try:
+        options = CoreArgumentParser().parse_known_args(args, do_help=False)[0]
+    except ParserError:
+        try:
+            # Plugin commands are not known before plugins are loaded
+            options = manager_parser.parse_known_args(args, do_help=False)[0]
+        except ParserError:
+            # Let the manager print the error
+            return None
+    if options.profile:
+        return None
+    return options
+
+
+def forward_to_daemon(args: Sequence[str]) -> bool:
+    """Send the command to a running daemon for this config, if there is one, and stream back the output.
+
+    Only the lock file is read to find the daemon, the rest of FlexGet does not need to be loaded.
+
+    :return: True if the command was handled by a daemon, False if it needs to be run by a local manager.
+    """
+    options = parse_manager_options(args)
+    if options is None:
+        return False
+    config, _ = find_config(options.config)
+    if not config or not config.is_file():
+        return False
+    ipc_info = read_lock(lockfile_path(config, options.test))
+    if not ipc_info or 'port' not in ipc_info:
+        return False
+    console = _rich_console()
+    try:
+        client = IPCClient(ipc_info['port'], ipc_info['password'], console=console)
+    except (OSError, ValueError) as e:
+        # Let the manager deal with stale lock files and bad passwords
+        logger.debug('Could not connect to daemon: {}', e)
+        return False
+
+    # The daemon is already handling the log file.
+    log.start(level=options.loglevel, to_file=False, to_console=not options.cron)
+    console('There is a FlexGet process already running for this config, sending execution there.')
+    logger.debug('Sending command to running FlexGet process: {}', args)
+    try:
+        client.handle_cli(list(args))
+        client.close()
+    except KeyboardInterrupt:
+        logger.error(
+            'Disconnecting from daemon due to ctrl-c. Executions will still continue in the background.'
+        )
+    except EOFError:
+        logger.error('Connection from daemon was severed.')
+    return True
+
+
+def _rich_console() -> Callable:
+    import rich.console
+
+    kwargs = {'markup': True}
+    if 'PYCHARM_HOSTED' in os.environ:
+        kwargs['color_system'] = 'truecolor'
+    return rich.console.Console(**kwargs).print
@@ -12,6 +12,7 @@ import shutil
 import signal
 import sys
 import threading
+import time
 import traceback
 from contextlib import contextmanager
 from datetime import datetime, timedelta
@@ -24,29 +25,28 @@ import sqlalchemy
 import yaml
 from loguru import logger
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.orm import declarative_base, sessionmaker
 
-# These need to be declared before we start importing from other flexget modules, since they might import them
+import flexget.log
+from flexget import config_schema, db_schema, plugin
 from flexget.config_schema import ConfigError
-from flexget.utils.sqlalchemy_utils import ContextSession
-from flexget.utils.tools import get_current_flexget_version, io_encoding, pid_exists
-
-Base = declarative_base()
-Session: type[ContextSession] = sessionmaker(class_=ContextSession)
-
-import flexget.log  # noqa: E402
-from flexget import config_schema, db_schema, plugin  # noqa: E402
-from flexget.event import fire_event  # noqa: E402
-from flexget.ipc import IPCClient, IPCServer  # noqa: E402
-from flexget.options import (  # noqa: E402
+from flexget.db_session import Base, Session
+from flexget.event import fire_event
+from flexget.ipc import IPCClient, IPCServer
+from flexget.ipc_client import find_config, read_lock
+from flexget.options import (
     CoreArgumentParser,
     ParserError,
     get_parser,
     manager_parser,
 )
-from flexget.task import Task  # noqa: E402
-from flexget.task_queue import TaskQueue  # noqa: E402
-from flexget.terminal import console, get_console_output  # noqa: E402
+from flexget.task import Task
+from flexget.task_queue import TaskQueue
+from flexget.terminal import console, get_console_output
+from flexget.utils.tools import (
+    get_config_hash,
+    get_current_flexget_version,
+    io_encoding,
+)
 
 if TYPE_CHECKING:
     import argparse
@@ -148,6 +148,10 @@ class Manager:
         self.config: dict = {}
         # user_config is exactly as loaded from the user's config file. No defaults set or manipulation done.
         self.user_config: dict | None = None
+        # Tasks which passed validation, mapping task name to (hash of config before validation, validated config)
+        self._validated_tasks: dict[str, tuple[tuple[int, str], dict]] = {}
+        # Timing of the last config validation, reported with --debug-perf
+        self.validation_stats: dict[str, float | int] = {}
 
         self.options = self.parse_initial_options(args)
         self._init_config(create=False)
@@ -225,6 +229,9 @@ class Manager:
         plugin.load_plugins(
             extra_plugins=[self.config_base / 'plugins'],
             extra_components=[self.config_base / 'components'],
+            manifest=self.config_base / '.plugin-manifest.json',
+            # Executions only need the plugins their config uses, import the rest on demand
+            lazy=getattr(self.options, 'cli_command', None) == 'execute' and not self.unit_test,
         )
 
         # Reparse CLI options now that plugins are loaded
@@ -431,6 +438,7 @@ class Manager:
                     ' any previous error logs.'
                 )
                 self.task_queue = TaskQueue()
+                self.task_queue.configure(self.config.get('task_queue'))
                 self.task_queue.start()
             if len(self.task_queue):
                 logger.verbose('There is a task already running, execution queued.')
@@ -555,45 +563,13 @@ class Manager:
         :param bool create: If a config file is not found, and create is True, one will be created in the home folder
         :raises: `OSError` when no config file could be found, and `create` is False.
         """
-        home_path = Path('~/.flexget').expanduser()
         options_config = Path(self.options.config).expanduser()
-
-        possible = []
-        if options_config.is_absolute():
-            # explicit path given, don't try anything
-            config = options_config
-            possible = [config]
-        else:
-            logger.debug('Figuring out config load paths')
-            try:
-                possible.append(Path.cwd())
-            except OSError:
-                logger.debug('current directory invalid, not searching for config there')
-            # for virtualenv / dev sandbox
-            if hasattr(sys, 'real_prefix'):
-                logger.debug('Adding virtualenv path')
-                possible.append(Path(sys.prefix))
-            # normal lookup locations
-            possible.append(home_path)
-            if sys.platform.startswith('win'):
-                # On windows look in ~/flexget as well, as explorer does not let you create a folder starting with a dot
-                home_path = Path('~/flexget').expanduser()
-                possible.append(home_path)
-            else:
-                # The freedesktop.org standard config location
-                xdg_config = os.environ.get('XDG_CONFIG_HOME', '~/.config')
-                possible.append(Path(xdg_config, 'flexget').expanduser())
-
-            for path in possible:
-                config = path / options_config
-                if config.exists():
-                    logger.debug('Found config: {}', config)
-                    break
-            else:
-                config = None
+        config, possible = find_config(options_config)
 
         if create and not (config and config.exists()):
-            config = home_path / options_config
+            # On windows, explorer does not let you create a folder starting with a dot
+            home_path = Path('~/flexget' if sys.platform.startswith('win') else '~/.flexget')
+            config = home_path.expanduser() / options_config
             logger.info('Config file {} not found. Creating new config {}', options_config, config)
             with config.open('w') as newconfig:
                 # Write empty tasks to the config
@@ -754,11 +730,45 @@ class Manager:
         """
         conf = config if config else self.config
         conf = fire_event('manager.before_config_validate', conf, self)
-        errors = config_schema.process_config(conf)
+        start_time = time.perf_counter()
+        tasks = conf.get('tasks')
+        task_hashes = {}
+        validated_names = []
+        if isinstance(tasks, dict):
+            # Tasks which are unchanged since they last passed validation against the same schemas are not
+            # validated again
+            schema_version = config_schema.get_schema_version()
+            for name, task_config in tasks.items():
+                task_hashes[name] = (schema_version, get_config_hash(task_config))
+                if self._validated_tasks.get(name, (None,))[0] != task_hashes[name]:
+                    validated_names.append(name)
+            conf['tasks'] = {name: tasks[name] for name in validated_names}
+        try:
+            errors = config_schema.process_config(conf)
+        finally:
+            if isinstance(tasks, dict):
+                validated = conf['tasks']
+                conf['tasks'] = {
+                    name: validated[name]
+                    if name in validated
+                    else copy.deepcopy(self._validated_tasks[name][1])
+                    for name in tasks
+                }
+        self.validation_stats = {
+            'took': time.perf_counter() - start_time,
+            'tasks': len(task_hashes),
+            'validated_tasks': len(validated_names),
+        }
         if errors:
             err = ConfigError('Did not pass schema validation.')
             err.errors = errors
             raise err
+        self._validated_tasks = {
+            name: (task_hashes[name], copy.deepcopy(conf['tasks'][name]))
+            if name in validated_names
+            else self._validated_tasks[name]
+            for name in task_hashes
+        }
         return conf
 
     def init_sqlalchemy(self) -> None:
@@ -820,29 +830,7 @@ class Manager:
 
     def _read_lock(self) -> dict | None:
         """Read the values from the lock file. Returns None if there is no current lock file."""
-        if self.lockfile and os.path.exists(self.lockfile):
-            result: dict[str, str | int] = {}
-            with open(self.lockfile, encoding='utf-8') as f:
-                lines = [line for line in f if line]
-            for line in lines:
-                try:
-                    key, value = line.split(':', 1)
-                except ValueError:
-                    logger.debug('Invalid line in lock file: {}', line)
-                    continue
-                result[key.strip().lower()] = value.strip()
-            for key, value in result.items():
-                if value.isdigit():
-                    result[key] = int(value)
-            result.setdefault('pid', None)
-            if not result['pid']:
-                logger.error(
-                    'Invalid lock file. Make sure FlexGet is not running, then delete it.'
-                )
-            elif not pid_exists(result['pid']):
-                return None
-            return result
-        return None
+        return read_lock(self.lockfile)
 
     def check_lock(self) -> bool:
         """Return True if there is a lock on the database."""
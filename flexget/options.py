@@ -19,7 +19,6 @@ from argparse import ArgumentParser as ArgParser
 from typing import IO, TYPE_CHECKING, Any, TextIO
 
 import flexget
-from flexget.entry import Entry
 from flexget.event import fire_event
 from flexget.utils.tools import get_current_flexget_version, get_latest_flexget_version_number
 
@@ -127,6 +126,8 @@ class CronAction(Action):
 # This makes the old --inject form forwards compatible
 class InjectAction(Action):
     def __call__(self, parser, namespace, values, option_string=None):
+        from flexget.entry import Entry
+
         kwargs = {'title': values.pop(0)}
         if values:
             kwargs['url'] = values.pop(0)
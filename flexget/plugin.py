@@ -1,27 +1,32 @@
 from __future__ import annotations
 
+import inspect
+import json
 import os
 import re
+import sys
+import threading
 import time
-from functools import total_ordering
+from functools import partial, total_ordering
 from http.client import BadStatusLine
 from importlib import import_module
 from importlib.metadata import entry_points
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 from urllib.error import HTTPError, URLError
 
 import loguru
 from requests import RequestException
 
+from flexget import __version__, config_schema
 from flexget import components as components_pkg
-from flexget import config_schema
 from flexget import plugins as plugins_pkg
 from flexget.event import add_event_handler as add_phase_handler
-from flexget.event import event, fire_event, remove_event_handlers
+from flexget.event import event, get_all_events, get_events, remove_event_handlers
 
 if TYPE_CHECKING:
     from collections.abc import Callable, Iterable
+    from types import ModuleType
 
     from flexget.event import Event
 
@@ -198,6 +203,28 @@ plugins_loaded = False
 
 _loaded_plugins = {}
 _plugin_options = []
+
+# Bumped when the layout of the plugin manifest changes
+MANIFEST_FORMAT = 1
+
+
+class LazyPluginInfo(NamedTuple):
+    """What the plugin manifest tells about a plugin whose module has not been imported yet."""
+
+    name: str
+    module: str
+    interfaces: list[str]
+    builtin: bool
+    debug: bool
+    api_ver: int
+    category: str | None
+    phases: list[str]
+    schema_id: str | None
+
+
+# Plugins listed in the plugin manifest which are imported on first use, by plugin name
+_lazy_plugins: dict[str, LazyPluginInfo] = {}
+_lazy_lock = threading.RLock()
 _new_phase_queue: dict[str, list[str | None]] = {}
 
 
@@ -442,13 +469,10 @@ def _import_plugin(module_name: str, plugin_path: str | Path) -> None:
         logger.trace('Loaded module {} from {}', module_name, plugin_path)
 
 
-def _load_plugins_from_dirs(dirs: list[Path]) -> None:
-    """:param list dirs: Directories from where plugins are loaded from"""
-    logger.debug('Trying to load plugins from: {}', dirs)
-    dir_paths = [d for d in dirs if d.is_dir()]
-    # add all dirs to plugins_pkg load path so that imports work properly from any of the plugin dirs
-    plugins_pkg.__path__ = [str(d) for d in dir_paths]
-    for plugins_dir in dir_paths:
+def _find_plugin_modules(dirs: list[Path], package_name: str) -> list[tuple[str, Path]]:
+    """Return module name and path of the plugin modules in `dirs`, which are imported as part of `package_name`."""
+    modules = []
+    for plugins_dir in dirs:
         for plugin_path in plugins_dir.glob('**/*.py'):
             if plugin_path.name == '__init__.py':
                 continue
@@ -456,31 +480,46 @@ def _load_plugins_from_dirs(dirs: list[Path]) -> None:
             plugin_subpackages = [
                 _f for _f in plugin_path.relative_to(plugins_dir).parent.parts if _f
             ]
-            module_name = '.'.join([plugins_pkg.__name__, *plugin_subpackages, plugin_path.stem])
+            module_name = '.'.join([package_name, *plugin_subpackages, plugin_path.stem])
+            modules.append((module_name, plugin_path))
+    return modules
+
+
+def _load_plugins_from_dirs(dirs: list[Path], only: set[str] | None = None) -> list[str]:
+    """Import plugin modules from `dirs`.
+
+    :param list dirs: Directories from where plugins are loaded from
+    :param set only: Import only these modules, instead of all found.
+    :return: Names of all plugin modules found.
+    """
+    logger.debug('Trying to load plugins from: {}', dirs)
+    dir_paths = [d for d in dirs if d.is_dir()]
+    # add all dirs to plugins_pkg load path so that imports work properly from any of the plugin dirs
+    plugins_pkg.__path__ = [str(d) for d in dir_paths]
+    modules = _find_plugin_modules(dir_paths, plugins_pkg.__name__)
+    for module_name, plugin_path in modules:
+        if only is None or module_name in only:
             _import_plugin(module_name, plugin_path)
     _check_phase_queue()
+    return [module_name for module_name, _ in modules]
 
 
 # TODO: this is now identical to _load_plugins_from_dirs, REMOVE
-def _load_components_from_dirs(dirs: list[Path]) -> None:
-    """:param list dirs: Directories where plugin components are loaded from"""
+def _load_components_from_dirs(dirs: list[Path], only: set[str] | None = None) -> list[str]:
+    """Import component modules from `dirs`.
+
+    :param list dirs: Directories where plugin components are loaded from
+    :param set only: Import only these modules, instead of all found.
+    :return: Names of all component modules found.
+    """
     logger.debug('Trying to load components from: {}', dirs)
     dir_paths = [d for d in dirs if d.is_dir()]
-    for component_dir in dir_paths:
-        for component_path in component_dir.glob('**/*.py'):
-            if component_path.name == '__init__.py':
-                continue
-            # Split the relative path from the plugins dir to current file's parent dir to find subpackage names
-            plugin_subpackages = [
-                _f for _f in component_path.relative_to(component_dir).parent.parts if _f
-            ]
-            package_name = '.'.join([
-                components_pkg.__name__,
-                *plugin_subpackages,
-                component_path.stem,
-            ])
-            _import_plugin(package_name, component_path)
+    modules = _find_plugin_modules(dir_paths, components_pkg.__name__)
+    for module_name, component_path in modules:
+        if only is None or module_name in only:
+            _import_plugin(module_name, component_path)
     _check_phase_queue()
+    return [module_name for module_name, _ in modules]
 
 
 def _load_plugins_from_packages() -> None:
@@ -517,13 +556,206 @@ def _load_plugins_from_packages() -> None:
     _check_phase_queue()
 
 
+def _register_plugins() -> tuple[dict[str, list[str]], set[str]]:
+    """Fire `plugin.register`, then remove its handlers as plugins should only be registered once.
+
+    :return: Names of the plugins registered by each module, and the modules which registered new task phases.
+    """
+    registered: dict[str, list[str]] = {}
+    phase_modules = set()
+    try:
+        handlers = list(get_events('plugin.register'))
+    except KeyError:
+        handlers = []
+    for handler in handlers:
+        known_plugins = set(plugins)
+        phase_count = len(task_phases) + len(_new_phase_queue)
+        handler()
+        module_name = handler.func.__module__
+        registered.setdefault(module_name, []).extend(
+            name for name in plugins if name not in known_plugins
+        )
+        if len(task_phases) + len(_new_phase_queue) != phase_count:
+            phase_modules.add(module_name)
+    remove_event_handlers('plugin.register')
+    return registered, phase_modules
+
+
+def _manifest_version() -> str:
+    return f'{MANIFEST_FORMAT}:{__version__}:{sys.version}'
+
+
+def _manifest_files(dirs: list[Path]) -> dict[str, int]:
+    """Return modification times of all python files in `dirs`, a manifest is only valid if these did not change."""
+    return {
+        str(path): path.stat().st_mtime_ns
+        for plugins_dir in dirs
+        if plugins_dir.is_dir()
+        for path in plugins_dir.glob('**/*.py')
+    }
+
+
+def _read_manifest(path: Path, files: dict[str, int]) -> dict | None:
+    """Return the plugin manifest at `path`, or None if it is missing or outdated."""
+    try:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError) as e:
+        logger.debug('Unable to read plugin manifest {}: {}', path, e)
+        return None
+    if manifest.get('version') != _manifest_version() or manifest.get('files') != files:
+        logger.debug('Plugin manifest {} is outdated', path)
+        return None
+    return manifest
+
+
+def _has_import_side_effects(module: ModuleType) -> bool:
+    """Whether `module` defines database tables or api endpoints, which need to be there from the start."""
+    from sqlalchemy import Table
+
+    for value in vars(module).values():
+        if isinstance(value, Table) or (isinstance(value, type) and '__table__' in vars(value)):
+            return True
+        if inspect.ismodule(value):
+            source = value.__name__
+        elif isinstance(value, type) or inspect.isfunction(value):
+            source = value.__module__
+        else:
+            source = type(value).__module__
+        if (source or '').startswith('flexget.api'):
+            return True
+    return False
+
+
+def _write_manifest(
+    path: Path,
+    files: dict[str, int],
+    modules: list[str],
+    registered: dict[str, list[str]],
+    phase_modules: set[str],
+) -> None:
+    """Write the plugin manifest, telling which modules must be imported at startup and which plugins the others define.
+
+    Only modules which do nothing but register plugins can be imported on demand. Anything else they do when imported
+    (handle events, add phases, define lazy lookups, database tables or api endpoints) may be needed before any of
+    their plugins are used.
+    """
+    from flexget.entry import lazy_func_registry
+
+    eager = set(phase_modules)
+    for module_name in modules:
+        module = sys.modules.get(module_name)
+        # Modules which failed to import are tried again every time, their dependencies may get installed
+        if module is None or _has_import_side_effects(module):
+            eager.add(module_name)
+    eager.update(
+        handler.func.__module__
+        for handler in get_all_events()
+        if not handler.name.startswith('plugin.')
+    )
+    eager.update(lazy_func._func.__module__ for lazy_func in lazy_func_registry.values())
+    eager.update(
+        module_name
+        for module_name, names in registered.items()
+        if any(plugins[name].builtin for name in names)
+    )
+    eager.intersection_update(modules)
+    manifest_plugins = {
+        name: {
+            'module': module_name,
+            'interfaces': plugins[name].interfaces,
+            'builtin': plugins[name].builtin,
+            'debug': plugins[name].debug,
+            'api_ver': plugins[name].api_ver,
+            'category': plugins[name].category,
+            'phases': list(plugins[name].phase_handlers),
+            'schema_id': plugins[name].schema_id,
+        }
+        for module_name, names in registered.items()
+        if module_name in modules and module_name not in eager
+        for name in names
+    }
+    manifest = {
+        'version': _manifest_version(),
+        'files': files,
+        'eager': sorted(eager),
+        'plugins': manifest_plugins,
+    }
+    temp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    try:
+        temp_path.write_text(json.dumps(manifest), encoding='utf-8')
+        temp_path.replace(path)
+    except OSError as e:
+        logger.warning('Unable to write plugin manifest {}: {}', path, e)
+        return
+    logger.debug(
+        'Wrote plugin manifest {}, {} of {} plugin modules are needed at startup',
+        path,
+        len(eager),
+        len(modules),
+    )
+
+
+def _add_lazy_plugin(info: LazyPluginInfo) -> None:
+    _lazy_plugins[info.name] = info
+    if info.schema_id is not None:
+        # Looking up the schema, usually while validating the config, imports the plugin
+        config_schema.register_schema(info.schema_id, partial(_lazy_plugin_schema, info.name))
+
+
+def _lazy_plugin_schema(name: str) -> config_schema.JsonSchema:
+    if not _load_lazy_plugin(name):
+        # The module no longer registers this plugin, e.g. a dependency got uninstalled
+        return {'not': {}}
+    return plugins[name].schema
+
+
+def _load_lazy_plugin(name: str) -> bool:
+    """Import the module of plugin `name` if it is only known from the plugin manifest.
+
+    :return: True if the plugin is registered.
+    """
+    with _lazy_lock:
+        info = _lazy_plugins.get(name)
+        if info is None:
+            return name in plugins
+        start_time = time.time()
+        _import_plugin(info.module, 'plugin manifest')
+        _register_plugins()
+        for plugin in list(plugins.values()):
+            plugin.initialize()
+        # Forget the module whether the import worked or not, it is not tried again
+        for lazy in list(_lazy_plugins.values()):
+            if lazy.module == info.module or lazy.name in plugins:
+                del _lazy_plugins[lazy.name]
+        logger.debug(
+            'Imported {} for plugin {} in {:.3f} seconds',
+            info.module,
+            name,
+            time.time() - start_time,
+        )
+        return name in plugins
+
+
+def load_lazy_plugins(names: Iterable[str]) -> None:
+    """Import the plugins in `names` which are only known from the plugin manifest so far."""
+    for name in names:
+        if name in _lazy_plugins:
+            _load_lazy_plugin(name)
+
+
 def load_plugins(
-    extra_plugins: list[Path] | None = None, extra_components: list[Path] | None = None
+    extra_plugins: list[Path] | None = None,
+    extra_components: list[Path] | None = None,
+    manifest: Path | None = None,
+    lazy: bool = False,
 ) -> None:
     """Load plugins from the standard plugin and component paths.
 
     :param list extra_plugins: Extra directories from where plugins are loaded.
     :param list extra_components: Extra directories from where components are loaded.
+    :param manifest: Plugin manifest file. It is (re)written whenever all plugin modules get imported.
+    :param lazy: Only import the plugin modules needed at startup according to `manifest`, others are imported on
+        first use of one of their plugins. All plugins are imported if the manifest is missing or outdated.
     """
     global plugins_loaded
 
@@ -537,22 +769,64 @@ def load_plugins(
     extra_components.extend(_get_standard_components_path())
 
     start_time = time.time()
+    files = _manifest_files(extra_plugins + extra_components) if manifest else {}
+    cached_manifest = _read_manifest(manifest, files) if manifest and lazy else None
+    eager = set(cached_manifest['eager']) if cached_manifest else None
+    imported_before = set(sys.modules)
     # Import all the plugins
-    _load_plugins_from_dirs(extra_plugins)
-    _load_components_from_dirs(extra_components)
+    modules = _load_plugins_from_dirs(extra_plugins, only=eager)
+    modules += _load_components_from_dirs(extra_components, only=eager)
     _load_plugins_from_packages()
     # Register them
-    fire_event('plugin.register')
-    # Plugins should only be registered once, remove their handlers after
-    remove_event_handlers('plugin.register')
+    registered, phase_modules = _register_plugins()
+    with _lazy_lock:
+        _lazy_plugins.clear()
+        if cached_manifest:
+            for name, info in cached_manifest['plugins'].items():
+                # It may have been imported by one of the eager modules
+                if name not in plugins:
+                    _add_lazy_plugin(LazyPluginInfo(name=name, **info))
     # After they have all been registered, instantiate them
     for plugin in list(plugins.values()):
         plugin.initialize()
     took = time.time() - start_time
     plugins_loaded = True
+    if cached_manifest:
+        logger.debug(
+            'Plugins took {:.2f} seconds to load. {} plugins in registry, {} more imported on demand.',
+            took,
+            len(plugins.keys()),
+            len(_lazy_plugins),
+        )
+        return
     logger.debug(
         'Plugins took {:.2f} seconds to load. {} plugins in registry.', took, len(plugins.keys())
     )
+    # We only know what each module does at import if they were all imported just now
+    if manifest and imported_before.isdisjoint(modules):
+        _write_manifest(manifest, files, modules, registered, phase_modules)
+
+
+def _matches(
+    plugin: PluginInfo | LazyPluginInfo,
+    phase: str | None = None,
+    interface: str | None = None,
+    category: str | None = None,
+    name: str | None = None,
+    min_api: int | None = None,
+) -> bool:
+    if phase is not None and phase not in phase_methods:
+        raise ValueError(f'Unknown phase {phase}')
+    phases = plugin.phases if isinstance(plugin, LazyPluginInfo) else plugin.phase_handlers
+    if phase and phase not in phases:
+        return False
+    if interface and interface not in plugin.interfaces:
+        return False
+    if category and category != plugin.category:
+        return False
+    if name is not None and name != plugin.name:
+        return False
+    return not (min_api is not None and plugin.api_ver < min_api)
 
 
 def get_plugins(
@@ -561,6 +835,7 @@ def get_plugins(
     category: str | None = None,
     name: str | None = None,
     min_api: int | None = None,
+    loaded_only: bool = False,
 ) -> Iterable[PluginInfo]:
     """Query other plugins characteristics.
 
@@ -569,30 +844,33 @@ def get_plugins(
     :param string category: Type of plugin, phase names.
     :param string name: Name of the plugin.
     :param int min_api: Minimum api version.
+    :param bool loaded_only: Don't import matching plugins which are only known from the plugin manifest.
     :return: List of PluginInfo instances.
     """
-
-    def matches(plugin):
-        if phase is not None and phase not in phase_methods:
-            raise ValueError(f'Unknown phase {phase}')
-        if phase and phase not in plugin.phase_handlers:
-            return False
-        if interface and interface not in plugin.interfaces:
-            return False
-        if category and category != plugin.category:
-            return False
-        if name is not None and name != plugin.name:
-            return False
-        return not (min_api is not None and plugin.api_ver < min_api)
-
-    return filter(matches, iter(plugins.values()))
+    query = {
+        'phase': phase,
+        'interface': interface,
+        'category': category,
+        'name': name,
+        'min_api': min_api,
+    }
+    if not loaded_only:
+        for lazy in list(_lazy_plugins.values()):
+            if _matches(lazy, **query):
+                _load_lazy_plugin(lazy.name)
+    return filter(partial(_matches, **query), iter(plugins.values()))
 
 
 def plugin_schemas(**kwargs) -> config_schema.JsonSchema:
     """Create a dict schema that matches plugins specified by `kwargs`."""
+    properties = {p.name: {'$ref': p.schema_id} for p in get_plugins(loaded_only=True, **kwargs)}
+    # Plugins not imported yet are imported once their schema gets looked up
+    properties.update(
+        (p.name, {'$ref': p.schema_id}) for p in _lazy_plugins.values() if _matches(p, **kwargs)
+    )
     return {
         'type': 'object',
-        'properties': {p.name: {'$ref': p.schema_id} for p in get_plugins(**kwargs)},
+        'properties': properties,
         'additionalProperties': False,
         'error_additionalProperties': '{{message}} Only known plugin names are valid keys.',
         'patternProperties': {'^_': {'title': 'Disabled Plugin'}},
@@ -626,7 +904,7 @@ def get_plugin_by_name(name: str, issued_by: str = '???') -> PluginInfo:
 
     :returns PluginInfo instance
     """
-    if name not in plugins:
+    if not _load_lazy_plugin(name):
         raise DependencyError(issued_by=issued_by, missing=name)
     return plugins[name]
 
@@ -637,7 +915,7 @@ def get(name: str, requested_by: str | object) -> object:
     :param str name: Name of the requested plugin
     :param requested_by: Plugin class instance OR string value who is making the request.
     """
-    if name not in plugins:
+    if not _load_lazy_plugin(name):
         if hasattr(requested_by, 'plugin_info'):
             who = requested_by.plugin_info.name
         else:
@@ -1,3 +1,5 @@
+from contextlib import contextmanager
+
 from loguru import logger
 
 from flexget import options
@@ -7,7 +9,18 @@ from flexget.terminal import console
 
 logger = logger.bind(name='perftests')
 
-TESTS = ['imdb_query']
+TESTS = [
+    'imdb_query',
+    'quality_parse',
+    'bdecode',
+    'crossmatch',
+    'archive_search',
+    'ipc_client',
+    'serialization',
+    'cached_input',
+    'soup',
+    'suite',
+]
 
 
 def cli_perf_test(manager, options):
@@ -18,6 +31,24 @@ def cli_perf_test(manager, options):
     try:
         if options.test_name == 'imdb_query':
             imdb_query(session)
+        elif options.test_name == 'quality_parse':
+            quality_parse()
+        elif options.test_name == 'bdecode':
+            bdecode()
+        elif options.test_name == 'crossmatch':
+            crossmatch()
+        elif options.test_name == 'archive_search':
+            archive_search()
+        elif options.test_name == 'ipc_client':
+            ipc_client()
+        elif options.test_name == 'serialization':
+            serialization()
+        elif options.test_name == 'cached_input':
+            cached_input()
+        elif options.test_name == 'soup':
+            soup()
+        elif options.test_name == 'suite':
+            suite(manager, options)
     finally:
         session.close()
 
@@ -31,7 +62,7 @@ def imdb_query(session):
 
     # NOTE: importing other plugins directly is discouraged
     from flexget.components.imdb.db import Movie
-    from flexget.plugins.cli.performance import log_query_count
+    from flexget.components.performance.performance import log_query_count
 
     imdb_urls = []
 
@@ -75,7 +106,638 @@ def imdb_query(session):
     logger.debug('Took {:.2f} seconds to query {} movies', took, len(imdb_urls))
 
 
+def quality_parse(rounds=5):
+    """Compare quality parsing throughput of the plain sequential scan, the prefiltered scan and the cache."""
+    import random
+    import re
+    import time
+    from unittest import mock
+
+    from flexget.utils import qualities
+    from flexget.utils.tools import LRUCache
+
+    names = [c.name for c in qualities.all_components()]
+    rand = random.Random(0)
+    titles = [
+        'Some.Title.S01E02.' + '.'.join(rand.sample(names, rand.randint(0, 4))) + '-GRP'
+        for _ in range(2000)
+    ]
+
+    def run(clear_cache):
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            if clear_cache:
+                qualities._parse_cache.clear()
+            for title in titles:
+                qualities.Quality(title)
+        return len(titles) * rounds / (time.perf_counter() - start_time)
+
+    with (
+        mock.patch.object(
+            qualities, '_detectors', dict.fromkeys(qualities._detectors, re.compile(''))
+        ),
+        mock.patch.object(qualities, '_parse_cache', LRUCache(max_size=0)),
+    ):
+        sequential = run(clear_cache=False)
+    prefiltered = run(clear_cache=True)
+    cached = run(clear_cache=False)
+
+    console(f'sequential scan:  {sequential:10.0f} parses/sec')
+    console(f'prefiltered scan: {prefiltered:10.0f} parses/sec ({prefiltered / sequential:.1f}x)')
+    console(f'cached:           {cached:10.0f} parses/sec ({cached / sequential:.1f}x)')
+
+
+def bdecode(file_count=20000, rounds=5):
+    """Time decoding and info hashing of a synthetic season pack torrent with many files."""
+    import time
+
+    from flexget.utils.bittorrent import Torrent, bencode
+
+    piece_length = 4 * 1024 * 1024
+    files = [
+        {'length': 700 * 1024 * 1024 + i, 'path': ['Season 01', f'Some.Show.S01E{i:05d}.mkv']}
+        for i in range(file_count)
+    ]
+    pieces = sum(f['length'] for f in files) // piece_length + 1
+    content = bencode({
+        'announce': 'http://localhost/announce',
+        'info': {
+            'name': 'Some.Show.S01',
+            'piece length': piece_length,
+            'pieces': b'\x00' * 20 * pieces,
+            'files': files,
+        },
+    })
+    console(f'synthetic torrent: {file_count} files, {len(content) / 1024 / 1024:.1f} MiB')
+
+    for load_pieces in (True, False):
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            torrent = Torrent(content, load_pieces=load_pieces)
+            torrent.info_hash  # noqa: B018 force hashing
+            torrent.size  # noqa: B018 force file list walk
+        took = (time.perf_counter() - start_time) / rounds
+        console(f'load_pieces={load_pieces!s:<5}: {took * 1000:8.1f} ms per torrent')
+
+    torrent = Torrent(content)
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        torrent.encode()
+    took = (time.perf_counter() - start_time) / rounds
+    console(f'encode:            {took * 1000:8.1f} ms per torrent')
+
+
+def crossmatch(task_size=1000, library_sizes=(1000, 4000, 16000), max_pairwise=4000):
+    """Compare crossmatch filter run time of pairwise matching and indexed matching as the library grows."""
+    import contextlib
+    import random
+    import time
+    from unittest import mock
+
+    from flexget.entry import Entry
+    from flexget.plugins.filter import crossmatch as plugin_crossmatch
+
+    rand = random.Random(0)
+
+    def title():
+        return f'Some Movie {rand.randint(0, 10**6)} {rand.randint(1950, 2030)} 1080p BluRay'
+
+    def run(library, exact, pairwise):
+        task = mock.Mock(entries=[Entry(title=title()) for _ in range(task_size // 2)])
+        task.entries += [Entry(title=rand.choice(library)['title']) for _ in range(task_size // 2)]
+        config = {
+            'fields': ['title'],
+            'action': 'accept',
+            'from': [],
+            'all_fields': False,
+            'exact': exact,
+            'case_sensitive': False,
+        }
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                mock.patch.object(plugin_crossmatch, 'aggregate_inputs', return_value=library)
+            )
+            if pairwise:
+                # Every library entry is a candidate, like the plain nested loop
+                stack.enter_context(
+                    mock.patch.object(
+                        plugin_crossmatch.FieldIndex,
+                        'candidates',
+                        return_value=range(len(library)),
+                    )
+                )
+            start_time = time.perf_counter()
+            plugin_crossmatch.CrossMatch().on_task_filter(task, config)
+            return time.perf_counter() - start_time
+
+    for library_size in library_sizes:
+        library = [Entry(title=title()) for _ in range(library_size)]
+        for exact in (True, False):
+            indexed = run(library, exact, pairwise=False)
+            line = f'{task_size} x {library_size:6} exact={exact!s:<5}: indexed {indexed:7.3f}s'
+            if library_size <= max_pairwise:
+                pairwise = run(library, exact, pairwise=True)
+                line += f', pairwise {pairwise:7.3f}s ({pairwise / indexed:.0f}x)'
+            console(line)
+
+
+def archive_search(row_count=1_000_000, search_count=20):
+    """Compare archive search time with the full text index and the LIKE scan on a synthetic archive."""
+    import random
+    import time
+    from datetime import datetime
+    from unittest import mock
+
+    import sqlalchemy
+    from sqlalchemy.orm import Session as SASession
+
+    # NOTE: importing other plugins directly is discouraged
+    from flexget.components.archive import db
+
+    rand = random.Random(0)
+    words = [f'{rand.choice("bcdfghklmnprstvz")}{rand.choice("aeiou")}{i}' for i in range(5000)]
+
+    def title():
+        return '.'.join([*rand.sample(words, rand.randint(1, 4)), f'S01E{rand.randint(1, 24):02}'])
+
+    engine = sqlalchemy.create_engine('sqlite://')
+    db.ArchiveEntry.__table__.create(engine)
+    queries = []
+    start_time = time.perf_counter()
+    with engine.begin() as connection:
+        for start in range(0, row_count, 10000):
+            rows = [
+                {'title': title(), 'added': datetime.now()}
+                for _ in range(min(10000, row_count - start))
+            ]
+            connection.execute(db.ArchiveEntry.__table__.insert(), rows)
+            # search for the beginning of some existing titles
+            queries.append(' '.join(rows[0]['title'].split('.')[:2]))
+    console(f'{row_count} rows inserted in {time.perf_counter() - start_time:.1f}s')
+
+    queries = queries[:search_count]
+    with SASession(engine) as session:
+        for use_fts in (True, False):
+            with mock.patch.object(db, 'fts_available', return_value=use_fts):
+                start_time = time.perf_counter()
+                found = sum(len(list(db.search(session, query))) for query in queries)
+                took = (time.perf_counter() - start_time) / search_count
+            method = 'fts5' if use_fts else 'like'
+            console(f'{method}: {took * 1000:8.1f} ms per search ({found} results)')
+
+
+def ipc_client(rounds=5):
+    """Compare the startup time of sending a command to a daemon with the thin client and the full manager."""
+    import os
+    import subprocess
+    import sys
+    import tempfile
+    import time
+    from argparse import Namespace
+    from pathlib import Path
+
+    from flexget.ipc import IPCServer
+
+    class StubManager:
+        """Stands in for the daemon, only answers the forwarded command."""
+
+        options = Namespace(loglevel='WARNING')
+
+        def __init__(self, lockfile):
+            self.lockfile = lockfile
+
+        def write_lock(self, ipc_info):
+            with open(self.lockfile, 'w', encoding='utf-8') as f:
+                f.write(f'PID: {os.getpid()}\n')
+                f.writelines(f'{key}: {ipc_info[key]}\n' for key in sorted(ipc_info))
+
+        def handle_cli(self, options):
+            console('ok')
+
+    scripts = {
+        'thin client': 'import flexget; flexget.main()',
+        'manager': (
+            'import sys\n'
+            'from flexget import log\n'
+            'from flexget.manager import Manager\n'
+            'log.initialize()\n'
+            'manager = Manager(sys.argv[1:])\n'
+            'log.start(level=manager.options.loglevel, to_file=False)\n'
+            'manager.start()\n'
+        ),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        config = Path(tmp, 'config.yml')
+        config.write_text('tasks: {}\n')
+        lockfile = Path(tmp, '.config-lock')
+        server = IPCServer(StubManager(lockfile))
+        server.start()
+        try:
+            while not lockfile.exists():
+                time.sleep(0.1)
+            for name, script in scripts.items():
+                command = [
+                    sys.executable,
+                    '-c',
+                    script,
+                    '-c',
+                    str(config),
+                    '-L',
+                    'warning',
+                    'execute',
+                ]
+                start_time = time.perf_counter()
+                for _ in range(rounds):
+                    output = subprocess.run(command, capture_output=True, text=True, check=True)
+                took = (time.perf_counter() - start_time) / rounds
+                if 'ok' not in output.stdout:
+                    console(f'{name}: command was not sent to the daemon')
+                console(f'{name + ":":<13} {took * 1000:8.1f} ms per command')
+        finally:
+            server.shutdown()
+
+
+def serialization(entry_count=5000, rounds=5):
+    """Compare entry round trip time and size of the legacy and the compact serialization format."""
+    import random
+    import time
+    from datetime import datetime, timedelta
+
+    from flexget.entry import Entry
+    from flexget.utils import json
+    from flexget.utils.qualities import Quality
+    from flexget.utils.serialization import dumps, loads, serialize
+
+    rand = random.Random(0)
+    qualities = [Quality(q) for q in ('720p hdtv', '1080p webdl h264', '2160p bluray hevc')]
+    start = datetime(2020, 1, 1)
+    entries = []
+    for i in range(entry_count):
+        published = start + timedelta(minutes=rand.randint(0, 10**6))
+        entry = Entry(
+            title=f'Some.Show.S01E{i:03}.720p.HDTV-GRP',
+            url=f'http://localhost/download/{i}.torrent',
+            description='Lorem ipsum dolor sit amet ' * 4,
+            content_size=rand.randint(10**8, 10**10),
+            torrent_seeds=rand.randint(0, 1000),
+            rss_pubdate=published,
+            series_date=published.date(),
+            quality=rand.choice(qualities),
+            series_id=('S01', i),
+            tags={'tv', 'hd'},
+            rss_enclosures=[{'url': f'http://localhost/{i}', 'added': published}],
+        )
+        entries.append(entry)
+
+    def legacy_dumps(entry):
+        fields = {key: serialize(entry[key]) for key in entry if not key.startswith('_')}
+        value = {'fields': fields, 'lazy_lookups': []}
+        return json.dumps({'serializer': 'Entry', 'version': 1, 'value': value})
+
+    for name, dump in (('legacy', legacy_dumps), ('compact', dumps)):
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            texts = [dump(entry) for entry in entries]
+        dump_took = (time.perf_counter() - start_time) / rounds
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            loaded = [loads(text) for text in texts]
+        load_took = (time.perf_counter() - start_time) / rounds
+        if [dict(e) for e in loaded] != [dict(e) for e in entries]:
+            console(f'{name}: entries did not survive the round trip')
+        size = sum(len(text) for text in texts) / entry_count
+        console(
+            f'{name + ":":<8} dumps {dump_took * 1000:7.1f} ms, loads {load_took * 1000:7.1f} ms'
+            f' per {entry_count} entries, {size:.0f} bytes per entry'
+        )
+
+
+def cached_input(entry_count=50000, changed=500):
+    """Compare time and peak memory of storing and restoring a large persisted input cache.
+
+    The previous implementation rewrote all rows when storing and restored all entries up front.
+    """
+    import copy
+    import time
+    import tracemalloc
+    from unittest import mock
+
+    import sqlalchemy
+    from sqlalchemy.orm import sessionmaker
+
+    from flexget.entry import Entry
+    from flexget.utils import cached_input as plugin_cached_input
+    from flexget.utils.cached_input import InputCache, InputCacheEntry, cached
+    from flexget.utils.sqlalchemy_utils import ContextSession
+
+    def make_entries(start):
+        return [
+            Entry(
+                title=f'Some Movie {i} 1080p BluRay',
+                url=f'http://localhost/movie/{i}',
+                imdb_id=f'tt{i:07}',
+                description='Lorem ipsum dolor sit amet ' * 4,
+            )
+            for i in range(start, start + entry_count)
+        ]
+
+    def full_store(entries):
+        with plugin_cached_input.Session() as session:
+            db_cache = session.query(InputCache).filter(InputCache.name == 'perf').first()
+            db_cache.entries = [InputCacheEntry(entry=entry) for entry in entries]
+
+    def full_load():
+        with plugin_cached_input.Session() as session:
+            db_cache = session.query(InputCache).filter(InputCache.name == 'perf').first()
+            entries = [row.entry for row in db_cache.entries]
+            memory_cache = copy.deepcopy(entries)
+        return entries, memory_cache
+
+    def measure(name, func, *args):
+        tracemalloc.start()
+        start_time = time.perf_counter()
+        result = func(*args)
+        took = time.perf_counter() - start_time
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        console(f'{name + ":":<24} {took:6.2f}s, peak memory {peak / 1024 / 1024:7.1f} MiB')
+        return result
+
+    engine = sqlalchemy.create_engine('sqlite://', poolclass=sqlalchemy.pool.StaticPool)
+    InputCache.__table__.create(engine)
+    InputCacheEntry.__table__.create(engine)
+    cache = cached('perf', persist='1 day')
+    cache.cache_name = cache.config_hash = 'perf'
+    first, second = make_entries(0), make_entries(changed)
+    console(f'{entry_count} entries, {changed} changed between runs')
+    with mock.patch.object(
+        plugin_cached_input, 'Session', sessionmaker(bind=engine, class_=ContextSession)
+    ):
+        measure('first store', cache.store_to_db, first)
+        measure('full rewrite', full_store, second)
+        measure('differential store', cache.store_to_db, first)
+        measure('full restore', full_load)
+        measure('streamed restore', lambda: list(cache.load_from_db()))
+
+
+def soup(page_count=20, rounds=3):
+    """Compare parse throughput of the available html parsers over pages saved in the test cassettes."""
+    import time
+    from pathlib import Path
+
+    import yaml
+
+    import flexget
+    from flexget.utils.soup import HTML_PARSERS, get_soup, lxml_available
+
+    cassettes = Path(flexget.__file__).parent.parent / 'tests' / 'cassettes'
+    if not cassettes.is_dir():
+        console(f'Saved pages not found in {cassettes}, this test needs a source checkout')
+        return
+    loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+    pages = {}
+    for path in sorted(cassettes.iterdir()):
+        with path.open(encoding='utf-8') as f:
+            interactions = yaml.load(f, Loader=loader)['interactions']
+        for interaction in interactions:
+            headers = {k.lower(): v for k, v in interaction['response']['headers'].items()}
+            body = interaction['response']['body'].get('string')
+            if 'text/html' in str(headers.get('content-type')) and isinstance(body, str):
+                pages.setdefault(interaction['request']['uri'], body)
+        if len(pages) >= page_count:
+            break
+    size = sum(len(page) for page in pages.values())
+    console(f'{len(pages)} pages, {size / 1024 / 1024:.1f} MiB')
+
+    runs = [(parser, None) for parser in HTML_PARSERS if parser != 'lxml' or lxml_available()]
+    # Partial parse of the links only, like search plugins limited to their result tables
+    runs += [(parser, 'a') for parser in ('lxml', 'html.parser') if parser in dict(runs)]
+    for parser, parse_only in runs:
+        start_time = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages.values():
+                get_soup(page, parser=parser, parse_only=parse_only)
+        took = (time.perf_counter() - start_time) / rounds
+        name = parser + (f' ({parse_only} only)' if parse_only else '')
+        console(f'{name + ":":<22} {size / took / 1024 / 1024:6.2f} MiB/sec')
+
+
+def _titles(count, seed=0):
+    """Distinct release titles, so that no parse result comes from a cache."""
+    import random
+
+    rand = random.Random(seed)
+    qualities = ['720p HDTV x264', '1080p WEB-DL DD5.1 H.264', '2160p BluRay HEVC', 'DVDRip XviD']
+    return [
+        f'Some.Show.S{rand.randint(1, 20):02}E{rand.randint(1, 24):02}.{rand.choice(qualities)}-GRP{i}'
+        for i in range(count)
+    ]
+
+
+def benchmark_series_parse(manager, count=5000):
+    from flexget.utils.benchmark import measure
+    from flexget.utils.parsers.series import SeriesParser
+
+    return measure(lambda title: SeriesParser(name='Some Show').parse(title), _titles(count))
+
+
+def benchmark_quality_parse(manager, count=20000):
+    from flexget.utils.benchmark import measure
+    from flexget.utils.qualities import Quality
+
+    return measure(Quality, _titles(count))
+
+
+def benchmark_bdecode(manager, count=50, file_count=1000):
+    from flexget.utils.benchmark import measure
+    from flexget.utils.bittorrent import Torrent, bencode
+
+    files = [
+        {'length': 700 * 1024 * 1024 + i, 'path': ['Season 01', f'Some.Show.S01E{i:04d}.mkv']}
+        for i in range(file_count)
+    ]
+    content = bencode({
+        'announce': 'http://localhost/announce',
+        'info': {
+            'name': 'Some.Show.S01',
+            'piece length': 4 * 1024 * 1024,
+            'pieces': b'\x00' * 20 * (sum(f['length'] for f in files) // (4 * 1024 * 1024) + 1),
+            'files': files,
+        },
+    })
+
+    def decode(_):
+        torrent = Torrent(content)
+        torrent.info_hash  # noqa: B018 force hashing
+        torrent.size  # noqa: B018 force file list walk
+
+    return measure(decode, range(count))
+
+
+def _entries(count):
+    from datetime import datetime, timedelta
+
+    from flexget.entry import Entry
+    from flexget.utils.qualities import Quality
+
+    quality = Quality('720p hdtv')
+    return [
+        Entry(
+            title=title,
+            url=f'http://localhost/download/{i}.torrent',
+            description='Lorem ipsum dolor sit amet ' * 4,
+            content_size=10**9 + i,
+            rss_pubdate=datetime(2020, 1, 1) + timedelta(minutes=i),
+            quality=quality,
+            tags={'tv', 'hd'},
+        )
+        for i, title in enumerate(_titles(count))
+    ]
+
+
+def benchmark_template_render(manager, count=10000):
+    from flexget.utils.benchmark import measure
+    from flexget.utils.template import render_from_entry
+
+    template = '{{ title|pathscrub }}/{{ quality|upper }} {{ rss_pubdate|formatdate("%Y-%m-%d") }}.torrent'
+    return measure(lambda entry: render_from_entry(template, entry), _entries(count))
+
+
+def benchmark_entry_serialization(manager, count=10000):
+    from flexget.utils.benchmark import measure
+    from flexget.utils.serialization import dumps, loads
+
+    return measure(lambda entry: loads(dumps(entry)), _entries(count))
+
+
+def _run_tasks(manager, configs, entry_count):
+    """Measure complete runs of tasks with given configs."""
+    from flexget.task import Task
+    from flexget.utils.benchmark import measure
+
+    def run(config):
+        task = Task(manager, 'benchmark', config=config, suppress_warnings=['output'])
+        task.execute()
+        if task.aborted:
+            raise RuntimeError(f'Benchmark task aborted: {task.abort_reason}')
+
+    return measure(run, configs, items_per_op=entry_count)
+
+
+def benchmark_seen_filter(manager, entry_count=1000, rounds=10):
+    config = {'mock': _titles(entry_count, seed=1), 'seen': 'local', 'accept_all': True}
+    # Everything is seen on later runs
+    _run_tasks(manager, [config], entry_count)
+    return _run_tasks(manager, [config] * rounds, entry_count)
+
+
+def _mock_task(entry_count, rounds):
+    def benchmark(manager):
+        # Every run gets new titles, otherwise the builtin seen filter rejects all of them after the first one
+        configs = [
+            {'mock': _titles(entry_count, seed=seed), 'accept_all': True} for seed in range(rounds)
+        ]
+        return _run_tasks(manager, configs, entry_count)
+
+    return benchmark
+
+
+BENCHMARKS = {
+    'series_parse': benchmark_series_parse,
+    'quality_parse': benchmark_quality_parse,
+    'bdecode': benchmark_bdecode,
+    'template_render': benchmark_template_render,
+    'entry_serialization': benchmark_entry_serialization,
+    'seen_filter': benchmark_seen_filter,
+    'mock_task_1k': _mock_task(1000, rounds=10),
+    'mock_task_10k': _mock_task(10000, rounds=3),
+    'mock_task_100k': _mock_task(100000, rounds=1),
+}
+
+
+@contextmanager
+def throwaway_database(manager):
+    """Point the database sessions of all plugins to an empty temporary database."""
+    import tempfile
+
+    import sqlalchemy
+
+    from flexget.manager import Base
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sqlalchemy.create_engine(
+            f'sqlite:///{tmp}/benchmark.sqlite', connect_args={'check_same_thread': False}
+        )
+        Base.metadata.create_all(bind=engine)
+        Session.configure(bind=engine)
+        try:
+            yield
+        finally:
+            Session.configure(bind=manager.engine)
+            engine.dispose()
+
+
+def suite(manager, options):
+    """Run the benchmark suite against a throwaway database, optionally comparing it to a saved baseline."""
+    import json
+
+    from loguru import logger as root_logger
+
+    from flexget.utils.benchmark import compare, results_document
+
+    if manager.is_daemon:
+        console('The benchmark suite cannot be run in a daemon, stop it first.')
+        return
+    baseline = None
+    if options.baseline:
+        with open(options.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {}
+    with throwaway_database(manager):
+        # Logging would dominate some of the workloads and flood the console
+        root_logger.disable('flexget')
+        try:
+            for name in options.benchmarks or BENCHMARKS:
+                results[name] = BENCHMARKS[name](manager)
+                console(
+                    f'{name + ":":<20} {results[name]["ops_per_sec"]:12.1f} ops/sec'
+                    f'  p50 {results[name]["p50_ms"]:9.3f} ms  p99 {results[name]["p99_ms"]:9.3f} ms'
+                )
+        finally:
+            root_logger.enable('flexget')
+
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as f:
+            json.dump(results_document(results), f, indent=2)
+        console(f'Results written to {options.json}')
+    if baseline:
+        changes = compare(results, baseline)
+        console(f'Compared to baseline from {baseline["created"]}:')
+        for name, change in changes.items():
+            flag = '  REGRESSION' if change < -options.threshold else ''
+            console(f'{name + ":":<20} {change:+7.1f}%{flag}')
+
+
 @event('options.register')
 def register_parser_arguments():
     perf_parser = options.register_command('perf-test', cli_perf_test)
     perf_parser.add_argument('test_name', metavar='<test name>', choices=TESTS)
+    perf_parser.add_argument(
+        '--benchmarks',
+        nargs='+',
+        choices=BENCHMARKS,
+        metavar='NAME',
+        help='only run these benchmarks of the suite',
+    )
+    perf_parser.add_argument('--json', metavar='FILE', help='write results of the suite to FILE')
+    perf_parser.add_argument(
+        '--baseline', metavar='FILE', help='compare results of the suite to those saved in FILE'
+    )
+    perf_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=10,
+        metavar='PERCENT',
+        help='flag benchmarks this much slower than the baseline as regressions (default: %(default)s)',
+    )
@@ -1,8 +1,10 @@
 import base64
 import os
 import re
+import struct
 import sys
 import time
+import zlib
 from pathlib import Path
 
 import pendulum
@@ -16,6 +18,108 @@ from flexget.utils.template import RenderError
 
 logger = logger.bind(name='deluge')
 
+RPC_RESPONSE = 1
+RPC_ERROR = 2
+RPC_EVENT = 3
+
+# Seconds the enabled plugins and the labels of a daemon are trusted before they are fetched again
+DAEMON_STATE_TTL = 300
+
+# Label plugin state of the daemons we talked to, by host and port
+_daemon_states = {}
+
+
+class PendingCall:
+    """A call queued on a :class:`RPCPipeline`, its result is available once the pipeline is flushed."""
+
+    def __init__(self, method):
+        self.method = method
+        self.error = None
+        self._result = None
+
+    @property
+    def result(self):
+        if self.error:
+            raise self.error
+        return self._result
+
+
+class RPCPipeline:
+    """Send calls that don't depend on each other to the deluge daemon in a single message.
+
+    Every request carries its own id and the daemon answers each of the requests in a message, so all the calls
+    queued before a :meth:`flush` cost one round trip instead of one each. Uses the socket of a connected
+    `DelugeRPCClient`, which can still be used for single calls between flushes.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.queued = []
+        self.pending = {}
+        self.buffer = b''
+
+    def call(self, method, *args, **kwargs):
+        self.client.request_id += 1
+        self.queued.append((self.client.request_id, method, args, kwargs))
+        self.pending[self.client.request_id] = pending = PendingCall(method)
+        return pending
+
+    def flush(self):
+        """Send the queued calls and wait for all of their results."""
+        from deluge_client.rencode import dumps
+
+        if not self.queued:
+            return
+        message = zlib.compress(dumps(tuple(self.queued)))
+        logger.debug('Sending {} calls to deluge', len(self.queued))
+        self.queued = []
+        if self.client.deluge_version == 2:
+            if self.client.deluge_protocol_version is None:
+                message = b'D' + struct.pack('!i', len(message)) + message
+            else:
+                message = (
+                    struct.pack('!BI', self.client.deluge_protocol_version, len(message)) + message
+                )
+        self.client._socket.sendall(message)
+        while self.pending:
+            msg_type, request_id, *data = self._receive()
+            if msg_type == RPC_EVENT or request_id not in self.pending:
+                continue
+            pending = self.pending.pop(request_id)
+            if msg_type == RPC_RESPONSE:
+                pending._result = data[0]
+            elif self.client.deluge_version == 2:
+                # Deluge 2 sends the arguments of the exception, deluge 1 its message
+                pending.error = plugin.PluginError(
+                    f'{data[0]}: {", ".join(str(arg) for arg in data[1])}'
+                )
+            else:
+                pending.error = plugin.PluginError(f'{data[0][0]}: {data[0][1]}')
+
+    def _receive(self):
+        from deluge_client.rencode import loads
+
+        while True:
+            if self.client.deluge_version == 2:
+                if len(self.buffer) >= 5:
+                    end = 5 + struct.unpack('!I', self.buffer[1:5])[0]
+                    if len(self.buffer) >= end:
+                        data = zlib.decompress(self.buffer[5:end])
+                        self.buffer = self.buffer[end:]
+                        break
+            elif self.buffer:
+                # Deluge 1 messages have no header, they end where the compressed stream ends
+                decompressor = zlib.decompressobj()
+                data = decompressor.decompress(self.buffer)
+                if decompressor.eof:
+                    self.buffer = decompressor.unused_data
+                    break
+            chunk = self.client._socket.recv(65536)
+            if not chunk:
+                raise ConnectionError('Connection to the deluge daemon was closed')
+            self.buffer += chunk
+        return list(loads(data, decode_utf8=self.client.decode_utf8))
+
 
 class DelugePlugin:
     """Base class for deluge plugins, contains settings and methods for connecting to a deluge daemon."""
@@ -322,6 +426,17 @@ class OutputDeluge(DelugePlugin):
             client.disconnect()
             return
 
+        try:
+            self._output(client, RPCPipeline(client), task, config)
+        except OSError as exc:
+            raise plugin.PluginError(
+                f'Error talking to deluge daemon: {exc}', logger=logger
+            ) from exc
+        finally:
+            client.disconnect()
+
+    def _output(self, client, pipeline, task, config):
+        session_state = pipeline.call('core.get_session_state')
         # loop through entries to get a list of labels to add
         labels = set()
         for entry in task.accepted:
@@ -335,27 +450,12 @@ class OutputDeluge(DelugePlugin):
                     continue
                 labels.add(label)
         if labels:
-            # Make sure the label plugin is available and enabled, then add appropriate labels
-
-            enabled_plugins = client.call('core.get_enabled_plugins')
-            label_enabled = 'Label' in enabled_plugins
-            if not label_enabled:
-                available_plugins = client.call('core.get_available_plugins')
-                if 'Label' in available_plugins:
-                    logger.debug('Enabling label plugin in deluge')
-                    label_enabled = client.call('core.enable_plugin', 'Label')
-                else:
-                    logger.error('Label plugin is not installed in deluge')
+            self._add_labels(client, pipeline, labels)
+        pipeline.flush()
+        torrent_ids = session_state.result
 
-            if label_enabled:
-                d_labels = client.call('label.get_labels')
-                for label in labels:
-                    if label not in d_labels:
-                        logger.debug('Adding the label `{}` to deluge', label)
-                        client.call('label.add', label)
-
-        # add the torrents
-        torrent_ids = client.call('core.get_session_state')
+        # Torrents that were loaded in deluge already and the options to update, and torrents being added
+        loaded, adding = [], []
         for entry in task.accepted:
             # Generate deluge options dict for torrent add
             add_opts = {}
@@ -412,86 +512,164 @@ class OutputDeluge(DelugePlugin):
                 # Entry has a deluge id, verify the torrent is still in the deluge session and apply options
                 # Since this is already loaded in deluge, we may also need to change the path
                 modify_opts['path'] = add_opts.pop('download_location', None)
-                client.call('core.set_torrent_options', [torrent_id], add_opts)
-                self._set_torrent_options(client, torrent_id, entry, modify_opts)
+                loaded.append((torrent_id, entry, add_opts, modify_opts))
             elif config['action'] != 'add':
                 logger.warning(
                     'Cannot {} {}, because it is not loaded in deluge.',
                     config['action'],
                     entry['title'],
                 )
-                continue
+            elif entry.get('url', '').startswith('magnet:'):
+                logger.verbose('Adding {} to deluge.', entry['title'])
+                adding.append((
+                    pipeline.call('core.add_torrent_magnet', entry['url'], add_opts),
+                    entry,
+                    modify_opts,
+                ))
+            elif not os.path.exists(entry['file']):
+                entry.fail("Downloaded temp file '{}' doesn't exist!".format(entry['file']))
+                del entry['file']
             else:
-                magnet, filedump = None, None
-                if entry.get('url', '').startswith('magnet:'):
-                    magnet = entry['url']
-                else:
-                    if not os.path.exists(entry['file']):
-                        entry.fail(
-                            "Downloaded temp file '{}' doesn't exist!".format(entry['file'])
-                        )
-                        del entry['file']
-                        return
-                    with open(entry['file'], 'rb') as f:
-                        filedump = base64.encodebytes(f.read())
-
+                with open(entry['file'], 'rb') as f:
+                    filedump = base64.encodebytes(f.read())
                 logger.verbose('Adding {} to deluge.', entry['title'])
-                added_torrent = None
-                if magnet:
-                    try:
-                        added_torrent = client.call('core.add_torrent_magnet', magnet, add_opts)
-                    except Exception as exc:
-                        logger.error('{} was not added to deluge! {}', entry['title'], exc)
-                        logger.opt(exception=True).debug('Error adding magnet:')
-                        entry.fail('Could not be added to deluge')
-                    else:
-                        if config.get('magnetization_timeout'):
-                            timeout = config['magnetization_timeout']
-                            logger.verbose(
-                                'Waiting {} seconds for "{}" to magnetize', timeout, entry['title']
-                            )
-                            for _ in range(timeout):
-                                time.sleep(1)
-                                try:
-                                    status = client.call(
-                                        'core.get_torrent_status', added_torrent, ['files']
-                                    )
-                                except Exception as err:
-                                    logger.error('wait_for_metadata Error: {}', err)
-                                    break
-                                if status.get('files'):
-                                    logger.info('"{}" magnetization successful', entry['title'])
-                                    break
-                            else:
-                                logger.warning(
-                                    '"{}" did not magnetize before the timeout elapsed, '
-                                    'file list unavailable for processing.',
-                                    entry['title'],
-                                )
-                else:
-                    try:
-                        added_torrent = client.call(
-                            'core.add_torrent_file', entry['title'], filedump, add_opts
-                        )
-                    except Exception as e:
-                        logger.error('{} was not added to deluge! {}', entry['title'], e)
-                        entry.fail('Could not be added to deluge')
-                if not added_torrent:
-                    logger.error('There was an error adding {} to deluge.', entry['title'])
-                else:
-                    logger.info('{} successfully added to deluge.', entry['title'])
-                    self._set_torrent_options(client, added_torrent, entry, modify_opts)
+                adding.append((
+                    pipeline.call('core.add_torrent_file', entry['title'], filedump, add_opts),
+                    entry,
+                    modify_opts,
+                ))
+        pipeline.flush()
+
+        torrents = []
+        magnets = {}
+        for added, entry, modify_opts in adding:
+            if added.error:
+                logger.error('{} was not added to deluge! {}', entry['title'], added.error)
+                entry.fail('Could not be added to deluge')
+            elif not added.result:
+                logger.error('There was an error adding {} to deluge.', entry['title'])
+            else:
+                logger.info('{} successfully added to deluge.', entry['title'])
+                torrents.append((added.result, entry, modify_opts))
+                if added.method == 'core.add_torrent_magnet':
+                    magnets[added.result] = entry
+        if magnets and config.get('magnetization_timeout'):
+            self._wait_for_metadata(client, magnets, config['magnetization_timeout'])
+
+        self._set_torrent_options(client, pipeline, loaded, torrents)
+
+        if loaded and config['action'] != 'add':
+            calls = []
             if config['action'] in ('remove', 'purge'):
-                client.call('core.remove_torrent', torrent_id, config['action'] == 'purge')
-                logger.info('{} removed from deluge.', entry['title'])
-            elif config['action'] == 'pause':
-                client.call('core.pause_torrent', [torrent_id])
-                logger.info('{} has been paused in deluge.', entry['title'])
-            elif config['action'] == 'resume':
-                client.call('core.resume_torrent', [torrent_id])
-                logger.info('{} has been resumed in deluge.', entry['title'])
+                for torrent_id, entry, _, _ in loaded:
+                    calls.append((
+                        entry,
+                        pipeline.call(
+                            'core.remove_torrent', torrent_id, config['action'] == 'purge'
+                        ),
+                    ))
+            else:
+                ids = [torrent_id for torrent_id, _, _, _ in loaded]
+                pending = pipeline.call(f'core.{config["action"]}_torrent', ids)
+                calls.extend((entry, pending) for _, entry, _, _ in loaded)
+            pipeline.flush()
+            action = {
+                'remove': 'removed from',
+                'purge': 'removed from',
+                'pause': 'has been paused in',
+                'resume': 'has been resumed in',
+            }[config['action']]
+            for entry, pending in calls:
+                if not pending.error:
+                    logger.info('{} {} deluge.', entry['title'], action)
+            self._log_failures(calls)
+
+    def _add_labels(self, client, pipeline, labels):
+        """Make sure the label plugin is enabled and `labels` exist in deluge.
+
+        What the daemon told us about its plugins and labels is kept for a while, so that tasks running
+        often don't have to ask again.
+        """
+        key = (client.host, client.port)
+        state = _daemon_states.get(key)
+        if state is None or time.monotonic() - state['fetched'] > DAEMON_STATE_TTL:
+            enabled_plugins = pipeline.call('core.get_enabled_plugins')
+            available_plugins = pipeline.call('core.get_available_plugins')
+            # Fails if the label plugin is disabled, it usually isn't though
+            d_labels = pipeline.call('label.get_labels')
+            pipeline.flush()
+            label_enabled = 'Label' in enabled_plugins.result
+            if label_enabled:
+                d_labels = d_labels.result
+            elif 'Label' in available_plugins.result:
+                logger.debug('Enabling label plugin in deluge')
+                label_enabled = client.call('core.enable_plugin', 'Label')
+                d_labels = client.call('label.get_labels') if label_enabled else []
+            else:
+                logger.error('Label plugin is not installed in deluge')
+            state = _daemon_states[key] = {
+                'label_enabled': label_enabled,
+                'labels': set(d_labels) if label_enabled else set(),
+                'fetched': time.monotonic(),
+            }
+        if state['label_enabled']:
+            added = {}
+            for label in labels - state['labels']:
+                logger.debug('Adding the label `{}` to deluge', label)
+                added[label] = pipeline.call('label.add', label)
+            pipeline.flush()
+            for label, pending in added.items():
+                if pending.error:
+                    logger.error(
+                        'Could not add the label `{}` to deluge: {}', label, pending.error
+                    )
+                else:
+                    state['labels'].add(label)
+
+    def _wait_for_metadata(self, client, magnets, timeout):
+        """Wait until deluge got the file lists of the added magnets, checking all of them at once."""
+        logger.verbose('Waiting {} seconds for {} magnets to magnetize', timeout, len(magnets))
+        waiting = dict(magnets)
+        for _ in range(timeout):
+            time.sleep(1)
+            try:
+                status = client.call('core.get_torrents_status', {'id': list(waiting)}, ['files'])
+            except Exception as err:
+                logger.error('wait_for_metadata Error: {}', err)
+                break
+            for torrent_id, torrent_status in status.items():
+                if torrent_status.get('files') and torrent_id in waiting:
+                    logger.info('"{}" magnetization successful', waiting.pop(torrent_id)['title'])
+            if not waiting:
+                return
+        for entry in waiting.values():
+            logger.warning(
+                '"{}" did not magnetize before the timeout elapsed, '
+                'file list unavailable for processing.',
+                entry['title'],
+            )
 
-        client.disconnect()
+    @staticmethod
+    def _log_failures(calls):
+        for entry, pending in calls:
+            if pending.error:
+                logger.error('{} failed for {}: {}', pending.method, entry['title'], pending.error)
+
+    @staticmethod
+    def _grouped(updates):
+        """Group `(torrent_id, value)` pairs with equal values, deluge can apply a value to many torrents at once.
+
+        :return: Lists of torrent ids with their value.
+        """
+        groups = []
+        for torrent_id, value in updates:
+            for ids, group_value in groups:
+                if group_value == value:
+                    ids.append(torrent_id)
+                    break
+            else:
+                groups.append(([torrent_id], value))
+        return groups
 
     def on_task_learn(self, task, config):
         """Make sure all temp files are cleaned up when entries are learned."""
@@ -511,28 +689,73 @@ class OutputDeluge(DelugePlugin):
             return 'No Label'
         return re.sub(r'[^\w-]+', '_', label.lower())
 
-    def _set_torrent_options(self, client, torrent_id, entry, opts):
-        """Get called when a torrent was added to the daemon."""
-        entry['deluge_id'] = torrent_id
+    def _set_torrent_options(self, client, pipeline, loaded, added):
+        """Apply the options of torrents that were loaded in deluge already or just added.
+
+        Calls for all the torrents are sent together, options that are the same for several torrents are set with
+        a single call.
 
-        if opts.get('move_completed_path'):
-            client.call(
+        :param loaded: `(torrent_id, entry, add_opts, modify_opts)` of the torrents that were loaded already.
+        :param added: `(torrent_id, entry, modify_opts)` of the torrents just added.
+        """
+        torrents = [(torrent_id, entry, opts) for torrent_id, entry, _, opts in loaded]
+        torrents.extend(added)
+        if not torrents:
+            return
+        calls = []
+
+        def call(entries, method, *args):
+            pending = pipeline.call(method, *args)
+            calls.extend((entry, pending) for entry in entries)
+
+        entries = {}
+        for torrent_id, entry, _ in torrents:
+            entry['deluge_id'] = torrent_id
+            entries[torrent_id] = entry
+        for ids, add_opts in self._grouped(
+            (torrent_id, add_opts) for torrent_id, _, add_opts, _ in loaded
+        ):
+            call([entries[i] for i in ids], 'core.set_torrent_options', ids, add_opts)
+        for ids, move_completed_path in self._grouped(
+            (torrent_id, opts['move_completed_path'])
+            for torrent_id, _, opts in torrents
+            if opts.get('move_completed_path')
+        ):
+            call(
+                [entries[i] for i in ids],
                 'core.set_torrent_options',
-                [torrent_id],
-                {'move_completed': True, 'move_completed_path': opts['move_completed_path']},
+                ids,
+                {'move_completed': True, 'move_completed_path': move_completed_path},
             )
-            logger.debug(
-                '{} move on complete set to {}', entry['title'], opts['move_completed_path']
+            for torrent_id in ids:
+                logger.debug(
+                    '{} move on complete set to {}',
+                    entries[torrent_id]['title'],
+                    move_completed_path,
+                )
+        label_calls = []
+        for torrent_id, entry, opts in torrents:
+            if opts.get('label'):
+                label_calls.append((
+                    entry,
+                    pipeline.call('label.set_torrent', torrent_id, opts['label']),
+                ))
+        for ids, queue_to_top in self._grouped(
+            (torrent_id, opts['queue_to_top'])
+            for torrent_id, _, opts in torrents
+            if opts.get('queue_to_top') is not None
+        ):
+            call(
+                [entries[i] for i in ids],
+                'core.queue_top' if queue_to_top else 'core.queue_bottom',
+                ids,
             )
-        if opts.get('label'):
-            client.call('label.set_torrent', torrent_id, opts['label'])
-        if opts.get('queue_to_top') is not None:
-            if opts['queue_to_top']:
-                client.call('core.queue_top', [torrent_id])
-                logger.debug('{} moved to top of queue', entry['title'])
-            else:
-                client.call('core.queue_bottom', [torrent_id])
-                logger.debug('{} moved to bottom of queue', entry['title'])
+            for torrent_id in ids:
+                logger.debug(
+                    '{} moved to {} of queue',
+                    entries[torrent_id]['title'],
+                    'top' if queue_to_top else 'bottom',
+                )
 
         status_keys = [
             'files',
@@ -542,28 +765,57 @@ class OutputDeluge(DelugePlugin):
             'move_on_completed',
             'progress',
         ]
-        status = client.call('core.get_torrent_status', torrent_id, status_keys)
-        # Determine where the file should be
-        move_now_path = None
-        if opts.get('move_completed_path'):
-            if status['progress'] == 100:
-                move_now_path = opts['move_completed_path']
-            else:
-                # Deluge will unset the move completed option if we move the storage, forgo setting proper
-                # path, in favor of leaving proper final location.
-                logger.debug(
-                    'Not moving storage for {}, as this will prevent move_completed_path.',
-                    entry['title'],
-                )
-        elif opts.get('path'):
-            move_now_path = opts['path']
-
-        if move_now_path and os.path.normpath(move_now_path) != os.path.normpath(
-            status['save_path']
-        ):
-            logger.debug('Moving storage for {} to {}', entry['title'], move_now_path)
-            client.call('core.move_storage', [torrent_id], move_now_path)
-
+        statuses = pipeline.call('core.get_torrents_status', {'id': list(entries)}, status_keys)
+        pipeline.flush()
+        if any(pending.error for _, pending in label_calls):
+            # The labels we know of are out of date
+            _daemon_states.pop((client.host, client.port), None)
+        self._log_failures(calls + label_calls)
+        statuses = statuses.result
+        calls.clear()
+
+        # Determine where the files should be
+        moves = []
+        for torrent_id, entry, opts in torrents:
+            status = statuses.get(torrent_id)
+            if status is None:
+                continue
+            move_now_path = None
+            if opts.get('move_completed_path'):
+                if status['progress'] == 100:
+                    move_now_path = opts['move_completed_path']
+                else:
+                    # Deluge will unset the move completed option if we move the storage, forgo setting proper
+                    # path, in favor of leaving proper final location.
+                    logger.debug(
+                        'Not moving storage for {}, as this will prevent move_completed_path.',
+                        entry['title'],
+                    )
+            elif opts.get('path'):
+                move_now_path = opts['path']
+
+            if move_now_path and os.path.normpath(move_now_path) != os.path.normpath(
+                status['save_path']
+            ):
+                logger.debug('Moving storage for {} to {}', entry['title'], move_now_path)
+                moves.append((torrent_id, move_now_path))
+        for ids, path in self._grouped(moves):
+            call([entries[i] for i in ids], 'core.move_storage', ids, path)
+
+        for torrent_id, entry, opts in torrents:
+            if torrent_id in statuses:
+                self._arrange_files(client, call, torrent_id, entry, opts, statuses[torrent_id])
+
+        recheck = [torrent_id for torrent_id, _, opts in torrents if opts.get('force_recheck')]
+        if recheck:
+            call([entries[i] for i in recheck], 'core.force_recheck', recheck)
+            for torrent_id in recheck:
+                logger.debug('Forced a data recheck on {}', entries[torrent_id]['title'])
+        pipeline.flush()
+        self._log_failures(calls)
+
+    def _arrange_files(self, client, call, torrent_id, entry, opts, status):
+        """Rename and skip files of a torrent according to its options."""
         big_file_name = ''
         if opts.get('content_filename') or opts.get('main_file_only'):
             # find a file that makes up more than main_file_ratio (default: 90%) of the total size
@@ -604,7 +856,7 @@ class OutputDeluge(DelugePlugin):
 
             def rename(file, new_name):
                 # Renames a file in torrent
-                client.call('core.rename_files', torrent_id, [(file['index'], new_name)])
+                call([entry], 'core.rename_files', torrent_id, [(file['index'], new_name)])
                 logger.debug('File {} in {} renamed to {}', file['path'], entry['title'], new_name)
 
             if main_file is not None:
@@ -657,7 +909,8 @@ class OutputDeluge(DelugePlugin):
                         1 if f == main_file or (f == sub_file and keep_subs) else 0
                         for f in status['files']
                     ]
-                    client.call(
+                    call(
+                        [entry],
                         'core.set_torrent_options',
                         [torrent_id],
                         {'file_priorities': file_priorities},
@@ -679,7 +932,7 @@ class OutputDeluge(DelugePlugin):
                             )
                             for f in sparse_files
                         ]
-                        client.call('core.rename_files', torrent_id, rename_pairs)
+                        call([entry], 'core.rename_files', torrent_id, rename_pairs)
             else:
                 logger.warning(
                     'No files in "{}" are > {:.0f}% of content size, no files renamed.',
@@ -701,8 +954,12 @@ class OutputDeluge(DelugePlugin):
                 logger.verbose(
                     'Renaming Folder {} to {}', folder_structure[0], container_directory
                 )
-                client.call(
-                    'core.rename_folder', torrent_id, folder_structure[0], container_directory
+                call(
+                    [entry],
+                    'core.rename_folder',
+                    torrent_id,
+                    folder_structure[0],
+                    container_directory,
                 )
             else:
                 logger.debug(
@@ -710,10 +967,6 @@ class OutputDeluge(DelugePlugin):
                     entry['title'],
                 )
 
-        if opts.get('force_recheck'):
-            client.call('core.force_recheck', [torrent_id])
-            logger.debug('Forced a data recheck on {}', entry['title'])
-
 
 @event('plugin.register')
 def register_plugin():
@@ -1,4 +1,8 @@
 import os
+import threading
+import weakref
+from collections import defaultdict
+from time import sleep
 
 import pendulum
 from loguru import logger
@@ -9,74 +13,59 @@ from flexget import plugin
 from flexget.entry import Entry
 from flexget.event import event
 from flexget.utils.template import RenderError
-from flexget.utils.tools import parse_timedelta
+from flexget.utils.tools import chunked, parse_timedelta
 
 logger = logger.bind(name='qbittorrent')
 
-
-class OutputQBitTorrent:
-    """The QBitTorrent plugin.
-
-    Example::
-
-        qbittorrent:
-          username: <USERNAME> (default: (none))
-          password: <PASSWORD> (default: (none))
-          host: <HOSTNAME> (default: localhost)
-          port: <PORT> (default: 8080)
-          use_ssl: <SSL> (default: False)
-          verify_cert: <VERIFY> (default: True)
-          path: <OUTPUT_DIR> (default: (none))
-          label: <LABEL> (default: (none))
-          tags: <TAGS> (default: (none))
-          maxupspeed: <torrent upload speed limit> (default: 0)
-          maxdownspeed: <torrent download speed limit> (default: 0)
-          add_paused: <ADD_PAUSED> (default: False)
-          ratio_limit: <RATIO_LIMIT> (default: -2)
-          seeding_time_limit: <SEEDING_TIME_LIMIT> (default: -1)
+# States of torrents, as reported by the Web API
+CHECKING_STATES = {'checkingUP', 'checkingDL', 'checkingResumeData'}
+COMPLETE_STATES = {
+    'uploading',
+    'stalledUP',
+    'checkingUP',
+    'pausedUP',
+    'stoppedUP',
+    'queuedUP',
+    'forcedUP',
+}
+DOWNLOADING_STATES = {
+    'downloading',
+    'metaDL',
+    'forcedMetaDL',
+    'stalledDL',
+    'checkingDL',
+    'pausedDL',
+    'stoppedDL',
+    'queuedDL',
+    'forcedDL',
+}
+ERRORED_STATES = {'missingFiles', 'error'}
+PAUSED_STATES = {'pausedUP', 'pausedDL', 'stoppedUP', 'stoppedDL'}
+UPLOADING_STATES = {'uploading', 'stalledUP', 'checkingUP', 'queuedUP', 'forcedUP'}
+
+
+class QBitTorrentClient:
+    """Connection to the qBittorrent Web UI, shared by the plugins of one task execution.
+
+    Requests reuse the connections of one session. The list of torrents is fetched once, and fetched again only after
+    torrents were added.
     """
 
-    schema = {
-        'anyOf': [
-            {'type': 'boolean'},
-            {
-                'type': 'object',
-                'properties': {
-                    'username': {'type': 'string'},
-                    'password': {'type': 'string'},
-                    'host': {'type': 'string'},
-                    'port': {'type': 'integer'},
-                    'use_ssl': {'type': 'boolean'},
-                    'verify_cert': {'type': 'boolean'},
-                    'path': {'type': 'string'},
-                    'label': {'type': 'string'},
-                    'tags': {'type': 'array', 'items': {'type': 'string'}},
-                    'maxupspeed': {'type': 'integer'},
-                    'maxdownspeed': {'type': 'integer'},
-                    'fail_html': {'type': 'boolean'},
-                    'add_paused': {'type': 'boolean'},
-                    'skip_check': {'type': 'boolean'},
-                    'ratio_limit': {'type': 'number'},
-                    'seeding_time_limit': {'type': 'string', 'format': 'interval'},
-                },
-                'additionalProperties': False,
-            },
-        ]
-    }
-
-    def __init__(self):
-        super().__init__()
+    def __init__(self, url, verify_cert=True):
+        self.url = url
+        self.verify_cert = verify_cert
         self.session = Session()
         self.api_url_login = None
         self.api_url_upload = None
         self.api_url_download = None
         self.api_url_info = None
-        self.url = None
-        self.connected = False
+        self.api_url_files = None
+        self._torrents = None
+        self._lock = threading.Lock()
 
     def _request(self, method, url, msg_on_fail=None, **kwargs):
         try:
-            response = self.session.request(method, url, **kwargs)
+            response = self.session.request(method, url, verify=self.verify_cert, **kwargs)
             if response.text == 'Ok.':
                 return True
             msg = msg_on_fail if msg_on_fail else f'Failure. URL: {url}, data: {kwargs}'
@@ -85,24 +74,26 @@ class OutputQBitTorrent:
         logger.error('Error when trying to send request to qBittorrent: {}', msg)
         return False
 
-    def check_api_version(self, msg_on_fail, verify=True):
+    def check_api_version(self, msg_on_fail):
         try:
             url = self.url + '/api/v2/app/webapiVersion'
-            response = self.session.request('get', url, verify=verify)
+            response = self.session.request('get', url, verify=self.verify_cert)
             if response.status_code != 404:
                 self.api_url_login = '/api/v2/auth/login'
                 self.api_url_upload = '/api/v2/torrents/add'
                 self.api_url_download = '/api/v2/torrents/add'
                 self.api_url_info = '/api/v2/torrents/info'
+                self.api_url_files = '/api/v2/torrents/files'
                 return response
 
             url = self.url + '/version/api'
-            response = self.session.request('get', url, verify=verify)
+            response = self.session.request('get', url, verify=self.verify_cert)
             if response.status_code != 404:
                 self.api_url_login = '/login'
                 self.api_url_upload = '/command/upload'
                 self.api_url_download = '/command/download'
                 self.api_url_info = '/query/torrents'
+                self.api_url_files = '/query/propertiesFiles/'
                 return response
 
             msg = msg_on_fail if msg_on_fail else f'Failure. URL: {url}'
@@ -110,106 +101,174 @@ class OutputQBitTorrent:
             msg = str(e)
         raise plugin.PluginError(f'Error when trying to send request to qBittorrent: {msg}')
 
-    def connect(self, config):
+    def connect(self, username=None, password=None):
         """Connect to qBittorrent Web UI.
 
         Username and password not necessary if 'Bypass authentication for localhost' is checked and host is 'localhost'.
         """
-        self.url = '{}://{}:{}'.format(
-            'https' if config['use_ssl'] else 'http', config['host'], config['port']
-        )
-        self.check_api_version('Check API version failed.', verify=config['verify_cert'])
-        if config.get('username') and config.get('password'):
-            data = {'username': config['username'], 'password': config['password']}
+        self.check_api_version('Check API version failed.')
+        if username and password:
+            data = {'username': username, 'password': password}
             if not self._request(
                 'post',
                 self.url + self.api_url_login,
                 data=data,
                 msg_on_fail='Authentication failed.',
-                verify=config['verify_cert'],
             ):
                 raise plugin.PluginError('Not connected.')
         logger.debug('Successfully connected to qBittorrent')
-        self.connected = True
 
-    def check_torrent_exists(self, hash_torrent, verify_cert):
-        if not self.connected:
-            raise plugin.PluginError('Not connected.')
+    def torrents(self, refresh=False):
+        """Return info of all torrents in the session, by lowercase info hash.
 
-        if not isinstance(hash_torrent, str):
-            logger.error('Error getting torrent info, invalid hash {}', hash_torrent)
-            return False
+        :param refresh: Fetch the list again, even if there is one from this session already.
+        """
+        with self._lock:
+            if self._torrents is None or refresh:
+                try:
+                    response = self.session.request(
+                        'get', self.url + self.api_url_info, verify=self.verify_cert
+                    )
+                    response.raise_for_status()
+                    torrents = response.json()
+                except (RequestException, ValueError) as e:
+                    raise plugin.PluginError(f'Error getting torrent list from qBittorrent: {e}')
+                self._torrents = {}
+                for torrent in torrents:
+                    # Hybrid torrents are known by both of their hashes
+                    for key in ('hash', 'infohash_v1', 'infohash_v2'):
+                        if torrent.get(key):
+                            self._torrents[torrent[key].lower()] = torrent
+                logger.debug('{} torrents in qBittorrent', len(torrents))
+            return self._torrents
+
+    def torrent_files(self, info_hash):
+        url = self.url + self.api_url_files
+        try:
+            if self.api_url_files.endswith('/'):
+                response = self.session.request('get', url + info_hash, verify=self.verify_cert)
+            else:
+                response = self.session.request(
+                    'get', url, params={'hash': info_hash}, verify=self.verify_cert
+                )
+            response.raise_for_status()
+            return [f['name'] for f in response.json()]
+        except (RequestException, ValueError) as e:
+            logger.error('Error getting files of torrent {}: {}', info_hash, e)
+            return []
+
+    def add_torrents(self, data, files=(), urls=()):
+        """Add torrent files and urls with the same options in one request.
+
+        :param data: Options of the added torrents.
+        :param files: Paths of torrent files.
+        :param urls: Urls or magnet links.
+        :return: True if qBittorrent accepted the request, which it does if any of the torrents was added.
+        """
+        multipart_data = [(k, (None, v)) for k, v in data.items()]
+        with self._lock:
+            # The list of torrents is out of date from now on
+            self._torrents = None
+        if urls:
+            multipart_data.append(('urls', (None, '\n'.join(urls))))
+            return self._request(
+                'post',
+                self.url + self.api_url_download,
+                msg_on_fail=f'Failed to add urls to qBittorrent: {", ".join(urls)}',
+                files=multipart_data,
+            )
+        handles = [open(path, 'rb') for path in files]  # noqa: SIM115 closed below
+        try:
+            multipart_data += [('torrents', (os.path.basename(f.name), f)) for f in handles]
+            return self._request(
+                'post',
+                self.url + self.api_url_upload,
+                msg_on_fail='Failed to add files to qBittorrent',
+                files=multipart_data,
+            )
+        finally:
+            for handle in handles:
+                handle.close()
 
-        hash_torrent = hash_torrent.lower()
 
-        logger.debug('Checking if torrent with hash {!r} already in session.', hash)
+# Clients by the task using them, and their url and user
+_clients = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
 
-        url = f'{self.url}{self.api_url_info}'
-        params = {'hashes': hash_torrent}
 
-        try:
-            respose = self.session.request(
-                'get',
-                url,
-                params=params,
-                verify=verify_cert,
-            )
-        except RequestException:
-            logger.error('Error getting torrent info, request to hash {} failed', hash_torrent)
-            return False
-
-        if respose.status_code != 200:
-            logger.error(
-                'Error getting torrent info, hash {} search returned',
-                hash_torrent,
-                respose.status_code,
-            )
-            return False
+def get_client(task, url, username=None, password=None, verify_cert=True):
+    """Return the client connected to the qBittorrent Web UI at `url` for the current execution of `task`."""
+    with _clients_lock:
+        clients = _clients.setdefault(task, {})
+        key = (url, username, password, verify_cert)
+        if key not in clients:
+            client = QBitTorrentClient(url, verify_cert)
+            client.connect(username, password)
+            clients[key] = client
+        return clients[key]
 
-        check_file = respose.json()
 
-        if isinstance(check_file, list) and check_file:
-            logger.warning('File with hash {} already in qbittorrent', hash_torrent)
-            return True
+@event('task.execute.completed')
+def forget_clients(task):
+    # Clients of aborted tasks are dropped along with the task
+    with _clients_lock:
+        clients = _clients.pop(task, {})
+    for client in clients.values():
+        client.session.close()
 
-        return False
 
-    def add_torrent_file(self, entry, data, verify_cert):
-        file_path = entry['file']
-        if not self.connected:
-            raise plugin.PluginError('Not connected.')
+class OutputQBitTorrent:
+    """The QBitTorrent plugin.
 
-        multipart_data = {k: (None, v) for k, v in data.items()}
-        with open(file_path, 'rb') as f:
-            multipart_data['torrents'] = f
-            if not self._request(
-                'post',
-                self.url + self.api_url_upload,
-                msg_on_fail='Failed to add file to qBittorrent',
-                files=multipart_data,
-                verify=verify_cert,
-            ):
-                entry.fail(f'Error adding file `{file_path}` to qBittorrent')
-                return
-        logger.debug('Added torrent file {} to qBittorrent', file_path)
-
-    def add_torrent_url(self, entry, data, verify_cert):
-        url = entry['url']
-        if not self.connected:
-            raise plugin.PluginError('Not connected.')
-
-        data['urls'] = url
-        multipart_data = {k: (None, v) for k, v in data.items()}
-        if not self._request(
-            'post',
-            self.url + self.api_url_download,
-            msg_on_fail=f'Failed to add url to qBittorrent: {url}',
-            files=multipart_data,
-            verify=verify_cert,
-        ):
-            entry.fail(f'Error adding url `{url}` to qBittorrent')
-            return
-        logger.debug('Added url {} to qBittorrent', url)
+    Example::
+
+        qbittorrent:
+          username: <USERNAME> (default: (none))
+          password: <PASSWORD> (default: (none))
+          host: <HOSTNAME> (default: localhost)
+          port: <PORT> (default: 8080)
+          use_ssl: <SSL> (default: False)
+          verify_cert: <VERIFY> (default: True)
+          path: <OUTPUT_DIR> (default: (none))
+          label: <LABEL> (default: (none))
+          tags: <TAGS> (default: (none))
+          maxupspeed: <torrent upload speed limit> (default: 0)
+          maxdownspeed: <torrent download speed limit> (default: 0)
+          add_paused: <ADD_PAUSED> (default: False)
+          ratio_limit: <RATIO_LIMIT> (default: -2)
+          seeding_time_limit: <SEEDING_TIME_LIMIT> (default: -1)
+    """
+
+    # Most torrents added in one request
+    batch_size = 50
+
+    schema = {
+        'anyOf': [
+            {'type': 'boolean'},
+            {
+                'type': 'object',
+                'properties': {
+                    'username': {'type': 'string'},
+                    'password': {'type': 'string'},
+                    'host': {'type': 'string'},
+                    'port': {'type': 'integer'},
+                    'use_ssl': {'type': 'boolean'},
+                    'verify_cert': {'type': 'boolean'},
+                    'path': {'type': 'string'},
+                    'label': {'type': 'string'},
+                    'tags': {'type': 'array', 'items': {'type': 'string'}},
+                    'maxupspeed': {'type': 'integer'},
+                    'maxdownspeed': {'type': 'integer'},
+                    'fail_html': {'type': 'boolean'},
+                    'add_paused': {'type': 'boolean'},
+                    'skip_check': {'type': 'boolean'},
+                    'ratio_limit': {'type': 'number'},
+                    'seeding_time_limit': {'type': 'string', 'format': 'interval'},
+                },
+                'additionalProperties': False,
+            },
+        ]
+    }
 
     @staticmethod
     def prepare_config(config):
@@ -227,7 +286,11 @@ class OutputQBitTorrent:
         config.setdefault('fail_html', True)
         return config
 
-    def add_entries(self, task, config):
+    def add_entries(self, task, config, client):
+        # Checked against one list of the torrents in qBittorrent, taken at most once per task
+        torrents = {} if task.manager.options.test else client.torrents()
+        adding = set()
+        batches = defaultdict(list)
         for entry in task.accepted:
             form_data = {}
             try:
@@ -301,9 +364,11 @@ class OutputQBitTorrent:
                 )
                 continue
 
-            if self.check_torrent_exists(
-                entry.get('torrent_info_hash'), config.get('verify_cert')
-            ):
+            info_hash = entry.get('torrent_info_hash')
+            if not isinstance(info_hash, str):
+                logger.error('Error getting torrent info, invalid hash {}', info_hash)
+            elif info_hash.lower() in torrents or info_hash.lower() in adding:
+                logger.warning('File with hash {} already in qbittorrent', info_hash.lower())
                 continue
 
             if not is_magnet:
@@ -316,9 +381,66 @@ class OutputQBitTorrent:
                     logger.debug('temp: {}', ', '.join(os.listdir(tmp_path)))
                     entry.fail("Downloaded temp file '{}' doesn't exist!?".format(entry['file']))
                     continue
-                self.add_torrent_file(entry, form_data, config['verify_cert'])
-            else:
-                self.add_torrent_url(entry, form_data, config['verify_cert'])
+            if isinstance(info_hash, str):
+                adding.add(info_hash.lower())
+            # Torrents with the same options are added together
+            batches[is_magnet, tuple(form_data.items())].append(entry)
+
+        # Entries of batches which qBittorrent accepted as a whole
+        unconfirmed = []
+        for (is_magnet, form_data), entries in batches.items():
+            for batch in chunked(entries, self.batch_size):
+                if self.add_torrents(client, batch, dict(form_data), is_magnet):
+                    if len(batch) > 1:
+                        unconfirmed.extend(batch)
+                    continue
+                if len(batch) > 1:
+                    logger.debug('Adding {} torrents failed, adding them one by one', len(batch))
+                for entry in batch:
+                    if len(batch) == 1 or not self.add_torrents(
+                        client, [entry], dict(form_data), is_magnet
+                    ):
+                        self.fail_entry(entry)
+
+        # A batch is accepted if any of its torrents was added, look for the ones which were not
+        if unconfirmed:
+            self.verify_added(client, unconfirmed)
+
+    def verify_added(self, client, entries):
+        """Fail the entries whose torrents do not show up in qBittorrent.
+
+        qBittorrent answers the add request before the torrents are added, so the list is fetched a few times.
+        """
+        missing = [entry for entry in entries if isinstance(entry.get('torrent_info_hash'), str)]
+        for attempt in range(5):
+            if attempt:
+                sleep(0.5)
+            torrents = client.torrents(refresh=True)
+            missing = [
+                entry for entry in missing if entry['torrent_info_hash'].lower() not in torrents
+            ]
+            if not missing:
+                return
+        for entry in missing:
+            self.fail_entry(entry)
+
+    @staticmethod
+    def fail_entry(entry):
+        if entry['url'].startswith('magnet:'):
+            entry.fail(f'Error adding url `{entry["url"]}` to qBittorrent')
+        else:
+            entry.fail(f'Error adding file `{entry["file"]}` to qBittorrent')
+
+    @staticmethod
+    def add_torrents(client, entries, form_data, is_magnet):
+        if is_magnet:
+            added = client.add_torrents(form_data, urls=[entry['url'] for entry in entries])
+        else:
+            added = client.add_torrents(form_data, files=[entry['file'] for entry in entries])
+        if added:
+            for entry in entries:
+                logger.debug('Added {} to qBittorrent', entry['url' if is_magnet else 'file'])
+        return added
 
     @plugin.priority(120)
     def on_task_download(self, task, config):
@@ -335,8 +457,20 @@ class OutputQBitTorrent:
         """Add torrents to qBittorrent at exit."""
         if task.accepted:
             config = self.prepare_config(config)
-            self.connect(config)
-            self.add_entries(task, config)
+            self.add_entries(task, config, self.client(task, config))
+
+    @staticmethod
+    def client(task, config):
+        url = '{}://{}:{}'.format(
+            'https' if config['use_ssl'] else 'http', config['host'], config['port']
+        )
+        return get_client(
+            task,
+            url,
+            config.get('username'),
+            config.get('password'),
+            config['verify_cert'],
+        )
 
 
 class FromQBitTorrent:
@@ -349,63 +483,64 @@ class FromQBitTorrent:
             'password': {'type': 'string'},
             'host': {'type': 'string'},
             'port': {'type': 'integer'},
+            'use_ssl': {'type': 'boolean', 'default': False},
+            'verify_cert': {'type': 'boolean', 'default': True},
         },
         'additionalProperties': False,
         'required': ['username', 'password', 'host', 'port'],
     }
 
-    @staticmethod
-    def client(host: str, port: int, username: str, password: str):
-        """Import client or abort task."""
-        try:
-            import qbittorrentapi
-        except ImportError:
-            raise plugin.DependencyError(issued_by='from_qbittorrent', missing='qbittorrent-api')
-
-        return qbittorrentapi.Client(host=host, port=port, username=username, password=password)
-
     def on_task_input(self, task, config):
-        client = self.client(
-            config['host'], int(config['port']), config['username'], config['password']
+        host = config['host']
+        if '://' not in host:
+            host = '{}://{}'.format('https' if config['use_ssl'] else 'http', host)
+        client = get_client(
+            task,
+            f'{host.rstrip("/")}:{config["port"]}',
+            config['username'],
+            config['password'],
+            config['verify_cert'],
         )
 
-        for torrent in client.torrents_info():
+        # Hybrid torrents are listed under both of their hashes
+        for torrent in {id(t): t for t in client.torrents().values()}.values():
             if 'category' in config:
                 logger.debug('filtered `{}` by wrong category', torrent['name'])
                 if torrent['category'] != config['category']:
                     continue
 
-            if 'completed' in config and not torrent.state_enum.is_complete:
+            state = torrent['state']
+            if 'completed' in config and state not in COMPLETE_STATES:
                 logger.debug('filtered `{}` by not completed', torrent['name'])
                 continue
 
             yield Entry(
                 title=torrent['name'],
                 url=torrent['magnet_uri'],
-                content_files=[f['name'] for f in torrent.files],
+                content_files=client.torrent_files(torrent['hash']),
                 content_size=torrent['size'],
-                torrent_info_hash=torrent['infohash_v1'],
-                torrent_info_hash_v2=torrent['infohash_v2'],
+                torrent_info_hash=torrent.get('infohash_v1', torrent['hash']),
+                torrent_info_hash_v2=torrent.get('infohash_v2', ''),
                 torrent_seeds=torrent['num_seeds'],
                 torrent_peers=torrent['num_leechs'],
                 qbittorrent_ratio=torrent['ratio'],
                 qbittorrent_category=torrent['category'],
-                qbittorrent_state=torrent['state'],
+                qbittorrent_state=state,
                 qbittorrent_eta=torrent['eta'],
                 qbittorrent_added_on=pendulum.from_timestamp(torrent['added_on']),
                 qbittorrent_completion_on=pendulum.from_timestamp(torrent['completion_on']),
-                qbittorrent_completed_path=torrent['content_path'],
-                qbittorrent_download_path=torrent['download_path'],
+                qbittorrent_completed_path=torrent.get('content_path'),
+                qbittorrent_download_path=torrent.get('download_path'),
                 qbittorrent_save_path=torrent['save_path'],
                 qbittorrent_size=torrent['size'],
                 qbittorrent_dl_speed=torrent['dlspeed'],
                 qbittorrent_up_speed=torrent['upspeed'],
-                qbittorrent_is_checking=torrent.state_enum.is_checking,
-                qbittorrent_is_complete=torrent.state_enum.is_complete,
-                qbittorrent_is_downloading=torrent.state_enum.is_downloading,
-                qbittorrent_is_errored=torrent.state_enum.is_errored,
-                qbittorrent_is_paused=torrent.state_enum.is_paused,
-                qbittorrent_is_uploading=torrent.state_enum.is_uploading,
+                qbittorrent_is_checking=state in CHECKING_STATES,
+                qbittorrent_is_complete=state in COMPLETE_STATES,
+                qbittorrent_is_downloading=state in DOWNLOADING_STATES,
+                qbittorrent_is_errored=state in ERRORED_STATES,
+                qbittorrent_is_paused=state in PAUSED_STATES,
+                qbittorrent_is_uploading=state in UPLOADING_STATES,
             )
 
 
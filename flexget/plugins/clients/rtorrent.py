@@ -21,6 +21,9 @@ from flexget.utils.template import RenderError
 
 logger = logger.bind(name='rtorrent')
 
+# by default rtorrent won't allow calls over 512kb in size.
+XMLRPC_SIZE_LIMIT = 524288
+
 
 class _Method:
     # some magic to bind an XML-RPC method to an RPC server.
@@ -127,14 +130,16 @@ class SCGITransport(xmlrpc_client.Transport):
         request = encode_netstring(request)
         request += request_body
 
-        s.send(request)
+        # rtorrent closes the connection once it answered, there is no reusing it
+        with s:
+            s.sendall(request)
 
-        response = b''
-        while True:
-            r = s.recv(1024)
-            if not r:
-                break
-            response += r
+            response = b''
+            while True:
+                r = s.recv(65536)
+                if not r:
+                    break
+                response += r
 
         response_body = BytesIO(b'\r\n\r\n'.join(response.split(b'\r\n\r\n')[1:]))
 
@@ -246,13 +251,8 @@ class RTorrent:
 
         return fields
 
-    def load(self, raw_torrent, fields=None, custom_fields=None, start=False, mkdir=True):
-        if fields is None:
-            fields = {}
-
-        if custom_fields is None:
-            custom_fields = {}
-
+    @staticmethod
+    def _load_params(raw_torrent, fields, custom_fields):
         # First param is empty 'target'
         params = ['', xmlrpc_client.Binary(raw_torrent)]
 
@@ -268,6 +268,16 @@ class RTorrent:
             params.append(
                 'd.custom.set="{}","{}"'.format(key.replace('"', '\\"'), val.replace('"', '\\"'))
             )
+        return params
+
+    def load(self, raw_torrent, fields=None, custom_fields=None, start=False, mkdir=True):
+        if fields is None:
+            fields = {}
+
+        if custom_fields is None:
+            custom_fields = {}
+
+        params = self._load_params(raw_torrent, fields, custom_fields)
 
         if mkdir and 'directory' in fields:
             result = self._server.execute.throw('', 'mkdir', '-p', fields['directory'])
@@ -276,25 +286,92 @@ class RTorrent:
                     'Failed creating directory {}'.format(fields['directory'])
                 )
 
-        # by default rtorrent won't allow calls over 512kb in size.
         xmlrpc_size = (
             len(xmlrpc_client.dumps(tuple(params), 'raw_start')) + 71680
         )  # Add 70kb for buffer
-        if xmlrpc_size > 524288:
+        if xmlrpc_size > XMLRPC_SIZE_LIMIT:
             prev_size = self._server.network.xmlrpc.size_limit()
             self._server.network.xmlrpc.size_limit.set('', xmlrpc_size)
 
         # Call load method and return the response
         result = self._server.load.raw_start(*params) if start else self._server.load.raw(*params)
 
-        if xmlrpc_size > 524288:
+        if xmlrpc_size > XMLRPC_SIZE_LIMIT:
             self._server.network.xmlrpc.size_limit.set('', prev_size)
 
         return result
 
+    def load_many(self, torrents, start=False, mkdir=True):
+        """Load several torrents with a single `system.multicall`.
+
+        :param torrents: `(raw_torrent, fields, custom_fields)` of each torrent.
+        :return: Result of the load of each torrent, or the :class:`xmlrpc.client.Error` it failed with.
+        """
+        method = 'load.raw_start' if start else 'load.raw'
+        directories = [(fields or {}).get('directory') for _, fields, _ in torrents]
+
+        failed = {}
+        to_create = list(dict.fromkeys(filter(None, directories))) if mkdir else []
+        if to_create:
+            multi_call = xmlrpc_client.MultiCall(self._server)
+            for directory in to_create:
+                multi_call.execute.throw('', 'mkdir', '-p', directory)
+            for directory, result in zip(to_create, self._multicall(multi_call), strict=True):
+                if result != 0:
+                    failed[directory] = xmlrpc_client.Error(
+                        f'Failed creating directory {directory}'
+                    )
+
+        results = [failed.get(directory) for directory in directories]
+        loading = [i for i, result in enumerate(results) if result is None]
+        if not loading:
+            return results
+        calls = []
+        for i in loading:
+            raw_torrent, fields, custom_fields = torrents[i]
+            params = self._load_params(raw_torrent, fields or {}, custom_fields or {})
+            calls.append({'methodName': method, 'params': tuple(params)})
+        multi_call = xmlrpc_client.MultiCall(self._server)
+        for call in calls:
+            getattr(multi_call, call['methodName'])(*call['params'])
+
+        # The size limit is raised once for the whole request
+        xmlrpc_size = (
+            len(xmlrpc_client.dumps((calls,), 'system.multicall')) + 71680
+        )  # Add 70kb for buffer
+        if xmlrpc_size > XMLRPC_SIZE_LIMIT:
+            limit = xmlrpc_client.MultiCall(self._server)
+            limit.network.xmlrpc.size_limit()
+            limit.network.xmlrpc.size_limit.set('', xmlrpc_size)
+            prev_size = limit()[0]
+        try:
+            for i, result in zip(loading, self._multicall(multi_call), strict=True):
+                results[i] = result
+        finally:
+            if xmlrpc_size > XMLRPC_SIZE_LIMIT:
+                self._server.network.xmlrpc.size_limit.set('', prev_size)
+
+        return results
+
+    @staticmethod
+    def _multicall(multi_call):
+        """Run a `MultiCall`, the faults of calls that failed are returned instead of raised."""
+        resp = multi_call()
+        results = []
+        for i in range(len(resp.results)):
+            try:
+                results.append(resp[i])
+            except xmlrpc_client.Fault as e:
+                results.append(e)
+        return results
+
     def get_directory(self):
         return self._server.get_directory()
 
+    def hashes(self, view='main'):
+        """Get the info hashes of all the torrents in a view with a single call."""
+        return {info_hash for (info_hash,) in self._server.d.multicall2('', view, 'd.hash=')}
+
     def torrent(self, info_hash, fields=None, custom_fields=None):
         """Get the details of a torrent."""
         if not fields:
@@ -497,6 +574,7 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
             'custom5': {'type': 'string'},
             'fast_resume': {'type': 'boolean', 'default': False},
             'custom_fields': {'type': 'object', 'additionalProperties': {'type': 'string'}},
+            'batch': {'type': 'boolean', 'default': False},
         },
         'required': ['uri'],
         'additionalProperties': False,
@@ -531,6 +609,9 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
         )
 
         try:
+            if config['action'] == 'add' and config['batch'] and not task.options.test:
+                self.add_entries(client, task.accepted, config)
+                return
             for entry in task.accepted:
                 if config['action'] == 'add':
                     if task.options.test:
@@ -664,6 +745,111 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
             entry.fail('missing torrent_info_hash')
             return
 
+        torrent_raw = self._torrent_raw(client, entry, options, fast_resume)
+        if torrent_raw is None:
+            return
+
+        # First check if it already exists
+        try:
+            if client.torrent(entry['torrent_info_hash']):
+                logger.warning("Torrent {} already exists, won't add", entry['title'])
+                return
+        except xmlrpc_client.Error:
+            # No existing found
+            pass
+
+        # Setup options and custom fields
+        custom_fields = options.pop('custom_fields', {})
+
+        try:
+            resp = client.load(
+                torrent_raw, fields=options, custom_fields=custom_fields, start=start, mkdir=mkdir
+            )
+            if resp != 0:
+                entry.fail(f'Failed to add to rTorrent invalid return value {resp}')
+        except xmlrpc_client.Error as e:
+            logger.exception('Found an error')
+            entry.fail(f'Failed to add to rTorrent {e!s}')
+            return
+
+        # Verify the torrent loaded
+        try:
+            self._verify_load(client, entry['torrent_info_hash'])
+            logger.info('{} added to rtorrent', entry['title'])
+        except xmlrpc_client.Error as e:
+            logger.warning('Failed to verify torrent {} loaded: {}', entry['title'], str(e))
+
+    def add_entries(self, client, entries, config):
+        """Add all the entries with a single request, and verify they loaded with a single request."""
+        try:
+            existing = client.hashes()
+        except xmlrpc_client.Error as e:
+            raise plugin.PluginError(f'Failed to get the torrents in rTorrent: {e!s}')
+
+        adding = []
+        for entry in entries:
+            if 'torrent_info_hash' not in entry:
+                entry.fail('missing torrent_info_hash')
+                continue
+            info_hash = entry['torrent_info_hash'].upper()
+            if info_hash in existing:
+                logger.warning("Torrent {} already exists, won't add", entry['title'])
+                continue
+            try:
+                options = self._build_options(config, entry)
+            except RenderError as e:
+                entry.fail(f'failed to render properties {e!s}')
+                continue
+            # fast_resume is not really an rtorrent option so it's not in _build_options
+            fast_resume = entry.get('fast_resume', config['fast_resume'])
+            torrent_raw = self._torrent_raw(client, entry, options, fast_resume)
+            if torrent_raw is None:
+                continue
+            # Entries of the same torrent are only added once
+            existing.add(info_hash)
+            custom_fields = options.pop('custom_fields', {})
+            adding.append((entry, (torrent_raw, options, custom_fields)))
+        if not adding:
+            return
+
+        try:
+            results = client.load_many(
+                [torrent for _, torrent in adding], start=config['start'], mkdir=config['mkdir']
+            )
+        except xmlrpc_client.Error as e:
+            # The whole request failed, not just some of its calls
+            for entry, _ in adding:
+                entry.fail(f'Failed to add to rTorrent {e!s}')
+            return
+        loaded = []
+        for (entry, _), result in zip(adding, results, strict=True):
+            if isinstance(result, xmlrpc_client.Error):
+                entry.fail(f'Failed to add to rTorrent {result!s}')
+            elif result != 0:
+                entry.fail(f'Failed to add to rTorrent invalid return value {result}')
+            else:
+                loaded.append(entry)
+
+        # Verify the torrents loaded
+        missing = loaded
+        for _ in range(5):
+            try:
+                hashes = client.hashes()
+            except xmlrpc_client.Error as e:
+                logger.warning('Failed to verify torrents loaded: {}', str(e))
+                return
+            missing = [e for e in missing if e['torrent_info_hash'].upper() not in hashes]
+            if not missing:
+                break
+            sleep(0.5)
+        for entry in loaded:
+            if entry in missing:
+                logger.warning('Failed to verify torrent {} loaded', entry['title'])
+            else:
+                logger.info('{} added to rtorrent', entry['title'])
+
+    def _torrent_raw(self, client, entry, options, fast_resume):
+        """Get the torrent to load for an entry, fails the entry if there is no valid one."""
         if entry['url'].startswith('magnet:'):
             torrent_raw = 'd10:magnet-uri{}:{}e'.format(len(entry['url']), entry['url'])
             torrent_raw = torrent_raw.encode('ascii')
@@ -679,7 +865,7 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
             # Verify valid torrent file
             if not is_torrent_file(Path(entry['file'])):
                 entry.fail("Downloaded temp file '{}' is not a torrent file".format(entry['file']))
-                return
+                return None
 
             # Modify the torrent with resume data if needed
             if fast_resume:
@@ -701,7 +887,7 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
                     # TODO: should it simply add the torrent anyway?
                     if not os.path.exists(file_path) and not os.path.isfile(file_path):
                         entry.fail(f'{file_path} does not exist. Cannot add fast resume data.')
-                        return
+                        return None
                     # cannot bencode floats, so we need to coerce to int
                     mtime = int(os.path.getmtime(file_path))
                     # priority 0 should be "don't download"
@@ -716,43 +902,15 @@ class RTorrentOutputPlugin(RTorrentPluginBase):
                     torrent_raw = f.read()
             except OSError as e:
                 entry.fail(f'Failed to add to rTorrent {e!s}')
-                return
+                return None
 
             try:
                 Torrent(torrent_raw)
             except SyntaxError as e:
                 entry.fail(f'Strange, unable to decode torrent, raise a BUG: {e!s}')
-                return
-
-        # First check if it already exists
-        try:
-            if client.torrent(entry['torrent_info_hash']):
-                logger.warning("Torrent {} already exists, won't add", entry['title'])
-                return
-        except xmlrpc_client.Error:
-            # No existing found
-            pass
-
-        # Setup options and custom fields
-        custom_fields = options.pop('custom_fields', {})
-
-        try:
-            resp = client.load(
-                torrent_raw, fields=options, custom_fields=custom_fields, start=start, mkdir=mkdir
-            )
-            if resp != 0:
-                entry.fail(f'Failed to add to rTorrent invalid return value {resp}')
-        except xmlrpc_client.Error as e:
-            logger.exception('Found an error')
-            entry.fail(f'Failed to add to rTorrent {e!s}')
-            return
+                return None
 
-        # Verify the torrent loaded
-        try:
-            self._verify_load(client, entry['torrent_info_hash'])
-            logger.info('{} added to rtorrent', entry['title'])
-        except xmlrpc_client.Error as e:
-            logger.warning('Failed to verify torrent {} loaded: {}', entry['title'], str(e))
+        return torrent_raw
 
     def on_task_learn(self, task, config):
         """Make sure all temp files are cleaned up when entries are learned."""
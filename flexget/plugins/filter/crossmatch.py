@@ -1,3 +1,7 @@
+import heapq
+import itertools
+from collections import defaultdict
+
 from loguru import logger
 
 from flexget import plugin
@@ -6,6 +10,87 @@ from flexget.utils.tools import aggregate_inputs
 
 logger = logger.bind(name='crossmatch')
 
+# Length of the substrings indexed for non exact matching
+NGRAM_SIZE = 3
+
+
+def ngrams(text):
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class FieldIndex:
+    """Index of one field over the entries being matched against.
+
+    :meth:`candidates` returns the positions of all entries which may intersect on the field with a
+    given value, so only those need to be compared with :meth:`CrossMatch.entry_intersects`.
+    """
+
+    def __init__(self, field, entries, exact=True, case_sensitive=True):
+        self.exact = exact
+        self.case_sensitive = case_sensitive
+        # Positions of entries with a value which can't be indexed, they are always candidates
+        self.unindexed = []
+        # Exact matching, value -> positions
+        self.values = defaultdict(list)
+        # Non exact matching, position -> string value
+        self.strings = {}
+        # Positions of strings too short to have an n-gram
+        self.short = []
+        # n-gram -> positions of all strings containing it
+        self.grams = defaultdict(list)
+        # n-gram -> positions of the strings it is the rarest n-gram of
+        self.anchors = defaultdict(list)
+
+        for position, entry in enumerate(entries):
+            if field not in entry:
+                continue
+            value = self.normalize(entry[field])
+            if exact:
+                try:
+                    self.values[value].append(position)
+                except TypeError:
+                    self.unindexed.append(position)
+            elif isinstance(value, str):
+                self.strings[position] = value
+                if len(value) < NGRAM_SIZE:
+                    self.short.append(position)
+                for gram in ngrams(value):
+                    self.grams[gram].append(position)
+            else:
+                self.unindexed.append(position)
+        for position, value in self.strings.items():
+            if len(value) >= NGRAM_SIZE:
+                anchor = min(ngrams(value), key=lambda gram: len(self.grams[gram]))
+                self.anchors[anchor].append(position)
+
+    def normalize(self, value):
+        if not self.case_sensitive and isinstance(value, str):
+            return value.lower()
+        return value
+
+    def candidates(self, value):
+        """Return positions of the entries which may intersect with `value`."""
+        value = self.normalize(value)
+        if self.exact:
+            try:
+                found = self.values.get(value, [])
+            except TypeError:
+                found = itertools.chain.from_iterable(self.values.values())
+            return itertools.chain(found, self.unindexed)
+        if not isinstance(value, str):
+            return itertools.chain(self.strings, self.unindexed)
+        if len(value) < NGRAM_SIZE:
+            return itertools.chain(self.strings, self.unindexed)
+        found = set(self.unindexed)
+        found.update(self.short)
+        grams = ngrams(value)
+        # Strings containing value contain all of its n-grams, so also its rarest one
+        found.update(min((self.grams.get(gram, []) for gram in grams), key=len))
+        # Strings contained in value have their anchor n-gram in it
+        for gram in grams:
+            found.update(self.anchors.get(gram, []))
+        return found
+
 
 class CrossMatch:
     """Perform action based on item on current task and other inputs.
@@ -46,10 +131,25 @@ class CrossMatch:
             return
 
         match_entries = aggregate_inputs(task, config['from'])
+        indexes = {
+            field: FieldIndex(
+                field, match_entries, config.get('exact'), config.get('case_sensitive')
+            )
+            for field in fields
+        }
 
         # perform action on intersecting entries
         for entry in task.entries:
-            for generated_entry in match_entries:
+            # Compare only against entries the indexes found, in the same order as they were generated
+            candidates = set()
+            for field in fields:
+                if field in entry:
+                    candidates.update(indexes[field].candidates(entry[field]))
+            queue = list(candidates)
+            heapq.heapify(queue)
+            while queue:
+                position = heapq.heappop(queue)
+                generated_entry = match_entries[position]
                 logger.trace('checking if {} matches {}', entry['title'], generated_entry['title'])
                 common = self.entry_intersects(
                     entry,
@@ -63,13 +163,23 @@ class CrossMatch:
                         generated_entry['title'],
                         ', '.join(common),
                     )
+                    copied = []
                     for key in generated_entry:
                         if key not in entry:
                             entry[key] = generated_entry[key]
+                            copied.append(key)
                     if action == 'reject':
                         entry.reject(msg)
                     if action == 'accept':
                         entry.accept(msg)
+                    # Fields copied over may make entries after this one intersect as well
+                    for field in fields:
+                        if field not in copied:
+                            continue
+                        for later in indexes[field].candidates(entry[field]):
+                            if later > position and later not in candidates:
+                                candidates.add(later)
+                                heapq.heappush(queue, later)
 
     def entry_intersects(self, e1, e2, fields=None, exact=True, case_sensitive=True):
         """Return list of field names in common.
@@ -93,7 +203,7 @@ class CrossMatch:
                 v1 = e1[field].lower()
             else:
                 v1 = e1[field]
-            if not case_sensitive and isinstance(e1[field], str):
+            if not case_sensitive and isinstance(e2[field], str):
                 v2 = e2[field].lower()
             else:
                 v2 = e2[field]
@@ -1,3 +1,4 @@
+import itertools
 from pathlib import Path
 
 from loguru import logger
@@ -7,6 +8,7 @@ from flexget.config_schema import one_or_more
 from flexget.event import event
 from flexget.utils.log import log_once
 from flexget.utils.template import RenderError
+from flexget.utils.tools import LRUCache
 
 try:
     # NOTE: Importing other plugins is discouraged!
@@ -16,6 +18,10 @@ except ImportError:
 
 logger = logger.bind(name='exists_series')
 
+# Parsed folder listings, keyed by (folder, series parser). Values are (folder mtime, listing index)
+# snapshots, which stay valid until a file is added to, removed from or renamed in the folder.
+listing_cache = LRUCache(max_size=1000)
+
 
 class FilterExistsSeries:
     """Intelligent series aware exists rejecting.
@@ -79,59 +85,89 @@ class FilterExistsSeries:
 
         # scan through
         # For speed, only test accepted entries since our priority should be after everything is accepted.
+        parsing = plugin.get('parsing', self)
+        listings = []
+        for folder in paths:
+            folder = Path(folder).expanduser()
+            if not folder.is_dir():
+                logger.warning('Directory {} does not exist', folder)
+                continue
+            listings.append(self.scan_folder(folder, parsing))
+
         for series, value in accepted_series.items():
-            # make new parser from parser in entry
             series_parser = value[0]['series_parser']
-            for folder in paths:
-                folder = Path(folder).expanduser()
-                if not folder.is_dir():
-                    logger.warning('Directory {} does not exist', folder)
-                    continue
-
-                for filename in folder.iterdir():
-                    # run parser on filename data
-                    try:
-                        disk_parser = plugin.get('parsing', self).parse_series(
-                            data=filename.name, name=series_parser.name
-                        )
-                    except plugin_parsers.ParseWarning as pw:
-                        disk_parser = pw.parsed
-                        log_once(pw.value, logger=logger)
-                    if disk_parser.valid:
-                        logger.debug('name {} is same series as {}', filename.name, series)
-                        logger.debug('disk_parser.identifier = {}', disk_parser.identifier)
-                        logger.debug('disk_parser.quality = {}', disk_parser.quality)
-                        logger.debug('disk_parser.proper_count = {}', disk_parser.proper_count)
-
-                        for entry in value:
-                            logger.debug(
-                                'series_parser.identifier = {}', entry['series_parser'].identifier
-                            )
-                            if disk_parser.identifier != entry['series_parser'].identifier:
-                                logger.trace('wrong identifier')
-                                continue
-                            logger.debug(
-                                'series_parser.quality = {}', entry['series_parser'].quality
-                            )
-                            if config.get('allow_different_qualities') == 'better':
-                                if entry['series_parser'].quality > disk_parser.quality:
-                                    logger.trace('better quality')
-                                    continue
-                            elif (
-                                config.get('allow_different_qualities')
-                                and disk_parser.quality != entry['series_parser'].quality
-                            ):
-                                logger.trace('wrong quality')
-                                continue
-                            logger.debug(
-                                'entry parser.proper_count = {}',
-                                entry['series_parser'].proper_count,
-                            )
-                            if disk_parser.proper_count >= entry['series_parser'].proper_count:
-                                entry.reject('episode already exists')
-                                continue
-                            logger.trace('new one is better proper, allowing')
+            for entry in value:
+                logger.debug('series_parser.identifier = {}', entry['series_parser'].identifier)
+                for disk_parser in self.find_episodes(
+                    listings, series_parser.name, entry['series_parser'].identifier, parsing
+                ):
+                    logger.debug('name {} is same series as {}', disk_parser.data, series)
+                    logger.debug('disk_parser.quality = {}', disk_parser.quality)
+                    logger.debug('disk_parser.proper_count = {}', disk_parser.proper_count)
+                    logger.debug('series_parser.quality = {}', entry['series_parser'].quality)
+                    if config.get('allow_different_qualities') == 'better':
+                        if entry['series_parser'].quality > disk_parser.quality:
+                            logger.trace('better quality')
                             continue
+                    elif (
+                        config.get('allow_different_qualities')
+                        and disk_parser.quality != entry['series_parser'].quality
+                    ):
+                        logger.trace('wrong quality')
+                        continue
+                    logger.debug(
+                        'entry parser.proper_count = {}', entry['series_parser'].proper_count
+                    )
+                    if disk_parser.proper_count >= entry['series_parser'].proper_count:
+                        entry.reject('episode already exists')
+                        continue
+                    logger.trace('new one is better proper, allowing')
+
+    def find_episodes(self, listings, name, identifier, parsing):
+        """Yield parse results of the files in `listings` which are episode `identifier` of `name`.
+
+        The listings only narrow the files down by identifier, each candidate is parsed again for
+        the configured series name so that optional parts of the name (e.g. a year) still match.
+        Files which could not be identified without the series name are always candidates.
+        """
+        for listing in listings:
+            for filename in itertools.chain(listing.get(identifier, []), listing.get(None, [])):
+                try:
+                    disk_parser = parsing.parse_series(data=filename, name=name)
+                except plugin_parsers.ParseWarning as pw:
+                    disk_parser = pw.parsed
+                    log_once(pw.value, logger=logger)
+                if disk_parser.valid and disk_parser.identifier == identifier:
+                    yield disk_parser
+
+    def scan_folder(self, folder, parsing):
+        """Parse all filenames in `folder` once.
+
+        :return: Dict mapping episode identifiers to the names of the files having them. Files which can only be
+            identified with the series name (e.g. ``Show Name - 05.mkv``) are listed under `None`.
+        """
+        key = (folder, parsing.selected.get('series'))
+        mtime = folder.stat().st_mtime_ns
+        cached = listing_cache.get(key)
+        if cached and cached[0] == mtime:
+            logger.debug('using cached listing of {}', folder)
+            return cached[1]
+
+        listing = {}
+        for filename in folder.iterdir():
+            # run parser on filename data
+            try:
+                disk_parser = parsing.parse_series(data=filename.name)
+            except plugin_parsers.ParseWarning as pw:
+                disk_parser = pw.parsed
+                log_once(pw.value, logger=logger)
+            if not disk_parser.valid or not disk_parser.identifier:
+                listing.setdefault(None, []).append(filename.name)
+                continue
+            logger.trace('{} is {} {}', filename.name, disk_parser.name, disk_parser.identifier)
+            listing.setdefault(disk_parser.identifier, []).append(filename.name)
+        listing_cache.put(key, (mtime, listing))
+        return listing
 
 
 @event('plugin.register')
@@ -82,7 +82,7 @@ class AnidbList:
             entry_type = 'Type: OVA'
 
         while True:
-            soup = get_soup(page.text)
+            soup = get_soup(page.text, parser='html5lib', plugin='anidb_list')
             soup_table = soup.find('table', class_='wishlist').find('tbody')
 
             trs = soup_table.find_all('tr')
@@ -1,6 +1,10 @@
+import collections
+import contextvars
 import datetime
 import itertools
 import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 from loguru import logger
 from sqlalchemy import Column, DateTime, Index, Integer, Unicode
@@ -56,6 +60,8 @@ class Discover:
           - piratebay
         interval: [1 hours|days|weeks]
         release_estimations: [strict|loose|ignore]
+        max_workers: 4
+        max_workers_per_plugin: 1 | {piratebay: 2}
     """
 
     schema = {
@@ -95,6 +101,14 @@ class Discover:
                 ]
             },
             'limit': {'type': 'integer', 'minimum': 1},
+            'max_workers': {'type': 'integer', 'minimum': 1, 'default': 4},
+            'max_workers_per_plugin': {
+                'oneOf': [
+                    {'type': 'integer', 'minimum': 1},
+                    {'type': 'object', 'additionalProperties': {'type': 'integer', 'minimum': 1}},
+                ],
+                'default': 1,
+            },
         },
         'required': ['what', 'from'],
         'additionalProperties': False,
@@ -103,40 +117,108 @@ class Discover:
     def execute_searches(self, config, entries, task):
         """Return list of entries found from search engines listed under `from` configuration.
 
+        Searches are run concurrently, up to `max_workers` at a time and `max_workers_per_plugin` for each search
+        plugin. Results are returned in the same order they would have been searched in sequence.
+
         :param config: Discover plugin config
         :param entries: List of pseudo entries to search
         :param task: Task being run
         """
-        result = []
-        for index, entry in enumerate(entries):
-            entry_results = []
-            for item in config['from']:
-                if isinstance(item, dict):
-                    plugin_name, plugin_config = next(iter(item.items()))
-                else:
-                    plugin_name, plugin_config = item, None
-                search = plugin.get(plugin_name, self)
-                if not callable(search.search):
-                    logger.critical(
-                        'Search plugin {} does not implement search method', plugin_name
-                    )
-                    continue
-                logger.verbose(
-                    'Searching for `{}` with plugin `{}` ({} of {})',
-                    entry['title'],
-                    plugin_name,
-                    index + 1,
-                    len(entries),
-                )
-                try:
-                    search_results = search.search(task=task, entry=entry, config=plugin_config)
+        searches = []
+        for item in config['from']:
+            if isinstance(item, dict):
+                plugin_name, plugin_config = next(iter(item.items()))
+            else:
+                plugin_name, plugin_config = item, None
+            search = plugin.get(plugin_name, self)
+            if not callable(search.search):
+                logger.critical('Search plugin {} does not implement search method', plugin_name)
+                continue
+            searches.append((plugin_name, search, plugin_config))
+
+        per_plugin = config.get('max_workers_per_plugin', 1)
+        limits = {
+            plugin_name: per_plugin.get(plugin_name, 1)
+            if isinstance(per_plugin, dict)
+            else per_plugin
+            for plugin_name, _, _ in searches
+        }
+        max_workers = config.get('max_workers', 4)
+        latencies = {plugin_name: [] for plugin_name, _, _ in searches}
+
+        def run_search(index, entry, plugin_name, search, plugin_config):
+            logger.verbose(
+                'Searching for `{}` with plugin `{}` ({} of {})',
+                entry['title'],
+                plugin_name,
+                index + 1,
+                len(entries),
+            )
+            start = time.perf_counter()
+            try:
+                search_results = search.search(task=task, entry=entry, config=plugin_config)
+                if search_results and config.get('limit'):
+                    search_results = itertools.islice(search_results, config['limit'])
+                # 'search_results' can be any iterable, make sure it's a list.
+                return list(search_results or [])
+            finally:
+                latencies[plugin_name].append(time.perf_counter() - start)
+
+        # Searches wait in a queue per plugin and are only handed to the pool when their plugin has a free slot,
+        # so a slow plugin never ties up the workers another plugin could use.
+        queues = {plugin_name: collections.deque() for plugin_name, _, _ in searches}
+        for index in range(len(entries)):
+            for search_index, (plugin_name, _, _) in enumerate(searches):
+                queues[plugin_name].append((index, search_index))
+        running = dict.fromkeys(queues, 0)
+        in_flight = {}
+        futures = {}
+
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='discover')
+        try:
+            while True:
+                dispatched = True
+                while dispatched and len(in_flight) < max_workers:
+                    dispatched = False
+                    for plugin_name, queue in queues.items():
+                        if not queue or running[plugin_name] >= limits[plugin_name]:
+                            continue
+                        if len(in_flight) >= max_workers:
+                            break
+                        index, search_index = queue.popleft()
+                        # Searches run with a copy of the current context, so their logs are still attributed to
+                        # this task
+                        future = executor.submit(
+                            contextvars.copy_context().run,
+                            run_search,
+                            index,
+                            entries[index],
+                            *searches[search_index],
+                        )
+                        futures[index, search_index] = future
+                        in_flight[future] = plugin_name
+                        running[plugin_name] += 1
+                        dispatched = True
+                if not any(queues.values()):
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running[in_flight.pop(future)] -= 1
+            result = []
+            for index, entry in enumerate(entries):
+                entry_results = []
+                for search_index, (plugin_name, _, _) in enumerate(searches):
+                    try:
+                        search_results = futures[index, search_index].result()
+                    except plugin.PluginWarning as e:
+                        logger.verbose('No results from {}: {}', plugin_name, e)
+                        continue
+                    except plugin.PluginError as e:
+                        logger.error('Error searching with {}: {}', plugin_name, e)
+                        continue
                     if not search_results:
                         logger.debug('No results from {}', plugin_name)
                         continue
-                    if config.get('limit'):
-                        search_results = itertools.islice(search_results, config['limit'])
-                    # 'search_results' can be any iterable, make sure it's a list.
-                    search_results = list(search_results)
                     logger.debug('Discovered {} entries from {}', len(search_results), plugin_name)
                     for e in search_results:
                         e['discovered_from'] = entry['title']
@@ -146,17 +228,24 @@ class Discover:
                         )
 
                     entry_results.extend(search_results)
+                if not entry_results:
+                    logger.verbose('No search results for `{}`', entry['title'])
+                    entry.complete()
+                    continue
+                result.extend(entry_results)
+        finally:
+            executor.shutdown(cancel_futures=True)
 
-                except plugin.PluginWarning as e:
-                    logger.verbose('No results from {}: {}', plugin_name, e)
-                except plugin.PluginError as e:
-                    logger.error('Error searching with {}: {}', plugin_name, e)
-            if not entry_results:
-                logger.verbose('No search results for `{}`', entry['title'])
-                entry.complete()
+        for plugin_name, times in latencies.items():
+            if not times:
                 continue
-            result.extend(entry_results)
-
+            logger.verbose(
+                '{} searches with `{}` took {:.2f}s on average, {:.2f}s at most',
+                len(times),
+                plugin_name,
+                sum(times) / len(times),
+                max(times),
+            )
         return result
 
     def entry_complete(self, entry, query=None, search_results=None, **kwargs):
@@ -148,7 +148,7 @@ class InputHtml:
         logger.verbose('Requesting: {}', url)
         page = task.requests.get(url, auth=auth)
         logger.verbose('Response: {} ({})', page.status_code, page.reason)
-        soup = get_soup(page.content)
+        soup = get_soup(page.content, plugin='html')
 
         # dump received content into a file
         if dump_name:
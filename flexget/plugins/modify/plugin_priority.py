@@ -26,8 +26,13 @@ class PluginPriority:
         names = []
         for name, priority in config.items():
             names.append(name)
+            try:
+                # Loads the plugin if it is not imported yet
+                plugin_info = plugin.get_plugin_by_name(name)
+            except plugin.DependencyError:
+                raise plugin.PluginError(f'Unknown plugin `{name}`')
             originals = self.priorities.setdefault(name, {})
-            for phase, phase_event in plugin.plugins[name].phase_handlers.items():
+            for phase, phase_event in plugin_info.phase_handlers.items():
                 originals[phase] = phase_event.priority
                 logger.debug('stored {} original value {}', phase, phase_event.priority)
                 phase_event.priority = priority
@@ -39,9 +44,8 @@ class PluginPriority:
             logger.debug('nothing changed, aborting restore')
             return
         names = []
-        for name in list(config.keys()):
+        for name, originals in self.priorities.items():
             names.append(name)
-            originals = self.priorities[name]
             for phase, priority in originals.items():
                 plugin.plugins[name].phase_handlers[phase].priority = priority
         logger.debug('Restored priority for: {}', ', '.join(names))
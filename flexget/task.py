@@ -14,14 +14,16 @@ from loguru import logger
 from sqlalchemy import Column, Integer, String, Unicode
 
 from flexget import config_schema, db_schema
+from flexget.db_session import Session
 from flexget.entry import EntryState, EntryUnicodeError
 from flexget.event import event, fire_event
-from flexget.manager import Session
 from flexget.plugin import (
     DependencyError,
     PluginError,
     PluginWarning,
+    get_plugin_by_name,
     get_plugins,
+    load_lazy_plugins,
     phase_methods,
     plugin_schemas,
     task_phases,
@@ -401,8 +403,10 @@ class Task:
         :param string plugin: Name of ``plugin``
         :raises ValueError: *plugin* could not be found.
         """
-        if plugin not in all_plugins:
-            raise ValueError(f'`{plugin}` is not a valid plugin.')
+        try:
+            get_plugin_by_name(plugin)
+        except DependencyError:
+            raise ValueError(f'`{plugin}` is not a valid plugin.') from None
         self.disabled_plugins.append(plugin)
 
     def abort(self, reason='Unknown', silent=False, traceback: str | None = None):
@@ -443,9 +447,13 @@ class Task:
         :return:
           An iterator over configured :class:`flexget.plugin.PluginInfo` instances enabled on this task.
         """
+        # Plugins may be imported on first use, make sure the ones configured for this task are
+        load_lazy_plugins(self.config)
         if phase:
             plugins = sorted(
-                get_plugins(phase=phase), key=lambda p: p.phase_handlers[phase], reverse=True
+                get_plugins(phase=phase, loaded_only=True),
+                key=lambda p: p.phase_handlers[phase],
+                reverse=True,
             )
         else:
             plugins = iter(all_plugins.values())
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import heapq
 import queue
 import threading
 import time
@@ -8,58 +9,169 @@ from typing import TYPE_CHECKING
 from loguru import logger
 from sqlalchemy.exc import OperationalError, ProgrammingError
 
+from flexget import config_schema
+from flexget.event import event
 from flexget.task import TaskAbort
 
 if TYPE_CHECKING:
+    from flexget.manager import Manager
     from flexget.task import Task
 
 logger = logger.bind(name='task_queue')
 
+task_queue_config_schema = {
+    'type': 'object',
+    'properties': {
+        'max_concurrent_tasks': {
+            'type': 'integer',
+            'minimum': 1,
+            'description': 'Maximum number of tasks the daemon will run at the same time.',
+        },
+        'exclusive_plugins': {
+            'type': 'array',
+            'items': {'type': 'string'},
+            'uniqueItems': True,
+            'description': 'Tasks using any of the same plugins from this list never run at the same time.',
+        },
+    },
+    'additionalProperties': False,
+}
+
+
+def task_plugin_names(task: Task) -> set[str]:
+    """Return the plugin keywords a task will use, including the ones merged in from its templates."""
+    names = set(task.config)
+    templates = task.config.get('template', [])
+    if templates is False:
+        return names
+    if isinstance(templates, str):
+        templates = [templates]
+    templates = list(templates or [])
+    if 'no_global' in templates:
+        templates = [t for t in templates if t not in ('no_global', 'global')]
+    elif 'global' not in templates:
+        templates.append('global')
+    toplevel_templates = task.manager.config.get('templates') or {}
+    for template in templates:
+        template_config = toplevel_templates.get(template) or {}
+        names.update(template_config)
+        nested = template_config.get('template', [])
+        if isinstance(nested, str):
+            nested = [nested]
+        templates.extend(t for t in nested or [] if t not in templates)
+    return names
+
 
 class TaskQueue:
-    """Task processing thread.
+    """Task processing threads.
 
-    Only executes one task at a time, if more are requested they are queued up and run in turn.
+    Executes up to :attr:`max_workers` tasks at a time, if more are requested they are queued up and
+    run in turn. Queued tasks are started in priority order, skipping over (but not dropping) tasks
+    which need an exclusive resource another running task is holding.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, max_workers: int = 1) -> None:
         self.run_queue: queue.PriorityQueue[Task] = queue.PriorityQueue()
         self._shutdown_now = False
         self._shutdown_when_finished = False
 
-        self.current_task: Task | None = None
-        self._thread = None
+        self.max_workers = max_workers
+        self.exclusive_plugins: set[str] = set()
+        # Task currently run by each worker, indexed by worker number
+        self.workers: list[Task | None] = []
+        # Exclusive resources held by each busy worker
+        self._resources: dict[int, set[str]] = {}
+        self._condition = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._started = False
+
+    @property
+    def current_task(self) -> Task | None:
+        """First task currently being executed, if any."""
+        return next((task for task in self.workers if task), None)
+
+    @property
+    def running_tasks(self) -> list[Task]:
+        return [task for task in self.workers if task]
+
+    def configure(self, config: dict | None) -> None:
+        """Apply `task_queue` config, growing the worker pool if needed."""
+        config = config or {}
+        with self._condition:
+            self.max_workers = config.get('max_concurrent_tasks', 1)
+            self.exclusive_plugins = set(config.get('exclusive_plugins', []))
+            self._condition.notify_all()
+        if self._started:
+            self._spawn_workers()
 
     def start(self) -> None:
         # We don't override `threading.Thread` because debugging this seems unsafe with pydevd.
         # Overriding __len__(self) seems to cause a debugger deadlock.
         # Don't instantiate the Thread() until `start()`, to make sure we have daemonized (forked) first.
-        if not self._thread:
-            self._thread = threading.Thread(target=self.run, name='task_queue', daemon=True)
-        self._thread.start()
-
-    def run(self) -> None:
+        self._started = True
+        self._spawn_workers()
+
+    def _spawn_workers(self) -> None:
+        with self._condition:
+            while len(self.workers) < self.max_workers:
+                self.workers.append(None)
+            for index in range(self.max_workers):
+                if index < len(self._threads) and self._threads[index].is_alive():
+                    continue
+                thread = threading.Thread(
+                    target=self.run, args=(index,), name=f'task_queue_{index}', daemon=True
+                )
+                if index < len(self._threads):
+                    self._threads[index] = thread
+                else:
+                    self._threads.append(thread)
+                thread.start()
+
+    def _claim(self, worker: int) -> Task | None:
+        """Take the first queued task whose exclusive resources are free. Must hold `_condition`."""
+        busy = set().union(*self._resources.values())
+        with self.run_queue.mutex:
+            for task in sorted(self.run_queue.queue):
+                resources = task_plugin_names(task) & self.exclusive_plugins
+                if resources & busy:
+                    logger.trace('task {} waits for {}', task.name, ', '.join(resources & busy))
+                    continue
+                self.run_queue.queue.remove(task)
+                heapq.heapify(self.run_queue.queue)
+                self._resources[worker] = resources
+                self.workers[worker] = task
+                return task
+        return None
+
+    def run(self, worker: int = 0) -> None:
         while not self._shutdown_now:
-            # Grab the first job from the run queue and do it
-            try:
-                self.current_task = self.run_queue.get(timeout=0.5)
-            except queue.Empty:
-                if self._shutdown_when_finished:
-                    self._shutdown_now = True
-                continue
+            # Grab the first runnable job from the run queue and do it
+            with self._condition:
+                if worker >= self.max_workers:
+                    logger.debug('worker {} no longer needed, stopping', worker)
+                    return
+                task = self._claim(worker)
+                if task is None:
+                    if self._shutdown_when_finished and not self.run_queue.qsize():
+                        break
+                    self._condition.wait(timeout=0.5)
+                    continue
             try:
-                self.current_task.execute()
+                task.execute()
             except TaskAbort as e:
-                logger.debug('task {} aborted: {!r}', self.current_task.name, e)
+                logger.debug('task {} aborted: {!r}', task.name, e)
             except (ProgrammingError, OperationalError):
                 logger.critical('Database error while running a task. Attempting to recover.')
-                self.current_task.manager.crash_report()
+                task.manager.crash_report()
             except Exception:
                 logger.critical('BUG: Unhandled exception during task queue run loop.')
-                self.current_task.manager.crash_report()
+                task.manager.crash_report()
             finally:
-                self.run_queue.task_done()
-                self.current_task = None
+                with self._condition:
+                    self.run_queue.task_done()
+                    self._resources.pop(worker, None)
+                    self.workers[worker] = None
+                    self._condition.notify_all()
 
         remaining_jobs = self.run_queue.qsize()
         if remaining_jobs:
@@ -70,11 +182,13 @@ class TaskQueue:
             logger.debug('task queue shut down')
 
     def is_alive(self) -> bool:
-        return self._thread and self._thread.is_alive()
+        return any(thread.is_alive() for thread in self._threads)
 
     def put(self, task: Task):
         """Add a task to be executed to the queue."""
         self.run_queue.put(task)
+        with self._condition:
+            self._condition.notify()
 
     def __len__(self) -> int:
         return self.run_queue.qsize()
@@ -94,18 +208,30 @@ class TaskQueue:
                 )
         else:
             self._shutdown_now = True
+        with self._condition:
+            self._condition.notify_all()
 
     def wait(self) -> None:
-        """Wait for the thread to exit.
+        """Wait for the threads to exit.
 
         Allow abortion of task queue with ctrl-c
         """
         try:
-            while self._thread.is_alive():
+            while self.is_alive():
                 time.sleep(0.5)
         except KeyboardInterrupt:
-            logger.error('Got ctrl-c, shutting down after running task (if any) completes')
+            logger.error('Got ctrl-c, shutting down after running tasks (if any) complete')
             self.shutdown(finish_queue=False)
             # We still wait to finish cleanly, pressing ctrl-c again will abort
-            while self._thread.is_alive():
+            while self.is_alive():
                 time.sleep(0.5)
+
+
+@event('manager.config_updated')
+def configure_task_queue(manager: Manager) -> None:
+    manager.task_queue.configure(manager.config.get('task_queue'))
+
+
+@event('config.register')
+def register_config_key() -> None:
+    config_schema.register_config_key('task_queue', task_queue_config_schema)
@@ -0,0 +1,76 @@
+"""Timing, saving and comparing of the results of the benchmark suite run by `flexget perf-test suite`."""
+
+from __future__ import annotations
+
+import math
+import platform
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from flexget._version import __version__
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+# Bumped when the layout of the results document changes
+RESULTS_FORMAT = 1
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Return the nearest rank percentile of `sorted_values`."""
+    index = max(0, math.ceil(len(sorted_values) * percent / 100) - 1)
+    return sorted_values[index]
+
+
+def measure(op: Callable[[Any], Any], args: Iterable, items_per_op: int = 1) -> dict[str, float]:
+    """Time `op` separately for each of `args`.
+
+    :param items_per_op: Number of items processed by each call, e.g. entries in a task run. Operations per second
+        count items, percentiles are still per call.
+    :return: Number of calls, operations per second and percentiles of the duration of a call in milliseconds.
+    """
+    timings = []
+    for arg in args:
+        start = time.perf_counter()
+        op(arg)
+        timings.append(time.perf_counter() - start)
+    if not timings:
+        raise ValueError('Nothing to measure')
+    timings.sort()
+    return {
+        'ops': len(timings),
+        'ops_per_sec': len(timings) * items_per_op / (sum(timings) or 1e-9),
+        'p50_ms': percentile(timings, 50) * 1000,
+        'p90_ms': percentile(timings, 90) * 1000,
+        'p99_ms': percentile(timings, 99) * 1000,
+        'max_ms': timings[-1] * 1000,
+    }
+
+
+def results_document(results: dict[str, dict]) -> dict:
+    """Wrap benchmark results with the details of the environment they were measured in."""
+    return {
+        'format': RESULTS_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'flexget_version': __version__,
+        'python_version': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': results,
+    }
+
+
+def compare(results: dict[str, dict], baseline: dict) -> dict[str, float]:
+    """Return the change of operations per second of each benchmark compared to `baseline`, in percent.
+
+    :param results: Results of the benchmarks, by name.
+    :param baseline: A results document saved earlier. Benchmarks missing from it are left out.
+    """
+    if baseline.get('format') != RESULTS_FORMAT:
+        raise ValueError(f'Unsupported baseline format {baseline.get("format")}')
+    changes = {}
+    for name, result in results.items():
+        base = baseline['benchmarks'].get(name)
+        if base and base['ops_per_sec']:
+            changes[name] = (result['ops_per_sec'] / base['ops_per_sec'] - 1) * 100
+    return changes
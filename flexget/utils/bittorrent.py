@@ -1,7 +1,5 @@
 """Torrenting utils, mostly for handling bencoding and torrent files."""
 
-# Torrent decoding is a short fragment from effbot.org. Site copyright says:
-# Test scripts and other short code fragments can be considered as being in the public domain.
 from __future__ import annotations
 
 import binascii
@@ -12,7 +10,7 @@ from typing import TYPE_CHECKING, Any
 from loguru import logger
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Generator, Iterator
+    from collections.abc import Callable
     from pathlib import Path
 
 logger = logger.bind(name='torrent')
@@ -105,58 +103,90 @@ def is_torrent_file(metafilepath: Path) -> bool:
     return bool(magic_marker)
 
 
-def tokenize(
-    text: bytes,
-    match=re.compile(rb'([idel])|(\d+):|(-?\d+)').match,  # type: Callable[[bytes, int], Match[bytes]]
-) -> Generator[bytes, None, None]:
-    i = 0
-    while i < len(text):
-        m = match(text, i)
-        s = m.group(m.lastindex)
-        i = m.end()
-        if m.lastindex == 2:
-            yield b's'
-            yield text[i : i + int(s)]
-            i += int(s)
+INTEGER_RE = re.compile(rb'-?\d+')
+
+# Spans of the top level `info` dict and its `pieces` string in the decoded data
+Span = tuple[int, int]
+
+
+def _bdecode(text: bytes, skip_pieces: bool = False) -> tuple[Any, Span | None, Span | None]:
+    """Decode `text` iteratively, slicing strings out of a memoryview so each is copied only once.
+
+    :param skip_pieces: Leave `info.pieces` out of the decoded data, its span is returned instead.
+    :returns: Tuple of decoded data, span of the `info` dict and span of `info.pieces`
+    """
+    view = memoryview(text)
+    length = len(text)
+    # Each stack item is [container, pending dict key, start position]
+    stack: list[list] = []
+    info_start = None
+    info_span = pieces_span = None
+    pos = 0
+    while True:
+        token = text[pos]
+        value_start = pos
+        if token in {0x64, 0x6C}:  # d or l
+            if info_start is None and len(stack) == 1 and stack[0][1] == 'info' and token == 0x64:
+                info_start = pos
+            stack.append([{} if token == 0x64 else [], None, pos])
+            pos += 1
+            continue
+        if token == 0x65:  # e
+            value, key, value_start = stack.pop()
+            if key is not None:
+                raise ValueError(f'missing value for key {key!r}')
+            pos += 1
+        elif token == 0x69:  # i
+            end = text.index(b'e', pos)
+            if not INTEGER_RE.fullmatch(text, pos + 1, end):
+                raise ValueError(f'invalid integer at {pos}')
+            value = int(text[pos + 1 : end])
+            pos = end + 1
+        elif 0x30 <= token <= 0x39:  # 0-9
+            colon = text.index(b':', pos)
+            pos = colon + 1 + int(text[value_start:colon])
+            if pos > length:
+                raise ValueError(f'string at {value_start} exceeds data')
+            if (
+                len(stack) == 2
+                and stack[1][1] == 'pieces'
+                and stack[0][1] == 'info'
+                and info_start is not None
+            ):
+                pieces_span = (colon + 1, pos)
+                if skip_pieces:
+                    stack[1][1] = None
+                    continue
+            raw = view[colon + 1 : pos]
+            # Strings in torrent file are defined as utf-8 encoded
+            try:
+                value = str(raw, 'utf-8')
+            except UnicodeDecodeError:
+                # The pieces field is a byte string, and should be left as such.
+                value = bytes(raw)
         else:
-            yield s
-
-
-def decode_item(src_iter: Iterator[bytes], token: bytes) -> bytes | str | int | list | dict:
-    data: bytes | str | int | list | dict
-    if token == b'i':
-        # integer: "i" value "e"
-        data = int(next(src_iter))
-        if next(src_iter) != b'e':
-            raise ValueError
-    elif token == b's':
-        # string: "s" value (virtual tokens)
-        data = next(src_iter)
-        # Strings in torrent file are defined as utf-8 encoded
-        with suppress(UnicodeDecodeError):
-            # The pieces field is a byte string, and should be left as such.
-            data = data.decode('utf-8')
-    elif token in (b'l', b'd'):
-        # container: "l"(list) or "d"(dict), values "e"
-        data = []
-        tok = next(src_iter)
-        while tok != b'e':
-            data.append(decode_item(src_iter, tok))
-            tok = next(src_iter)
-        if token == b'd':
-            data = dict(list(zip(data[0::2], data[1::2], strict=False)))
-    else:
-        raise ValueError
-    return data
+            raise ValueError(f'unexpected token {bytes([token])!r} at {pos}')
+
+        if not stack:
+            if pos != length:
+                raise SyntaxError('trailing junk')
+            return value, info_span, pieces_span
+        top = stack[-1]
+        if isinstance(top[0], list):
+            top[0].append(value)
+        elif top[1] is None:
+            top[1] = value
+        else:
+            if len(stack) == 1 and top[1] == 'info' and info_start == value_start:
+                info_span = (info_start, pos)
+            top[0][top[1]] = value
+            top[1] = None
 
 
 def bdecode(text: bytes) -> dict[str, Any]:
     try:
-        src_iter = tokenize(text)
-        data = decode_item(src_iter, next(src_iter))
-        for _ in src_iter:  # look for more tokens
-            raise SyntaxError('trailing junk')
-    except (AttributeError, ValueError, StopIteration, TypeError) as e:
+        data, _, _ = _bdecode(text)
+    except (ValueError, IndexError, TypeError) as e:
         raise SyntaxError(f'syntax error: {e}') from e
     return data
 
@@ -175,22 +205,12 @@ def encode_integer(data: int) -> bytes:
 
 
 def encode_list(data: list) -> bytes:
-    encoded = b'l'
-    for item in data:
-        encoded += bencode(item)
-    encoded += b'e'
-    return encoded
+    return b'l' + b''.join(bencode(item) for item in data) + b'e'
 
 
 def encode_dictionary(data: dict) -> bytes:
-    encoded = b'd'
-    items = list(data.items())
-    items.sort()
-    for key, value in items:
-        encoded += bencode(key)
-        encoded += bencode(value)
-    encoded += b'e'
-    return encoded
+    items = sorted(data.items())
+    return b'd' + b''.join(bencode(key) + bencode(value) for key, value in items) + b'e'
 
 
 def bencode(data: bytes | str | int | list | dict) -> bytes:
@@ -216,17 +236,27 @@ class Torrent:
     KEY_TYPE = str
 
     @classmethod
-    def from_file(cls, file: Path) -> Torrent:
+    def from_file(cls, file: Path, load_pieces: bool = True) -> Torrent:
         """Create torrent from file on disk."""
         with file.open('rb') as handle:
-            return cls(handle.read())
+            return cls(handle.read(), load_pieces=load_pieces)
+
+    def __init__(self, content: bytes, load_pieces: bool = True) -> None:
+        """Accept torrent file as string.
 
-    def __init__(self, content: bytes) -> None:
-        """Accept torrent file as string."""
+        :param load_pieces: If False, `info.pieces` is left out of :attr:`content` until the torrent
+            is encoded again. It is by far the largest field and rarely needed.
+        """
         # Make sure there is no trailing whitespace. see #1592
         content = content.strip()
         # decoded torrent structure
-        self.content = bdecode(content)
+        try:
+            self.content, self._info_span, self._pieces_span = _bdecode(
+                content, skip_pieces=not load_pieces
+            )
+        except (ValueError, IndexError, TypeError) as e:
+            raise SyntaxError(f'syntax error: {e}') from e
+        self._raw = content
         self.modified = False
 
     def __repr__(self) -> str:
@@ -318,14 +348,34 @@ class Torrent:
             trackers.append(self.content.get('announce'))
         return trackers
 
+    @property
+    def pieces(self) -> bytes:
+        """Return the concatenated piece hashes, loading them from the original data if needed."""
+        if 'pieces' in self.content['info'] or not self._pieces_span:
+            return self.content['info'].get('pieces', b'')
+        start, end = self._pieces_span
+        return self._raw[start:end]
+
+    def _load_pieces(self) -> None:
+        if self._pieces_span and 'pieces' not in self.content['info']:
+            self.content['info']['pieces'] = self.pieces
+            self._pieces_span = None
+
     @property
     def info_hash(self) -> str:
-        """Return Torrent info hash."""
+        """Return Torrent info hash.
+
+        Hashes the info dict exactly as it was in the original data, unless the torrent was modified.
+        """
         import hashlib
 
         sha1_hash = hashlib.sha1()
-        info_data = encode_dictionary(self.content['info'])
-        sha1_hash.update(info_data)
+        if self._info_span and not self.modified:
+            start, end = self._info_span
+            sha1_hash.update(memoryview(self._raw)[start:end])
+        else:
+            self._load_pieces()
+            sha1_hash.update(encode_dictionary(self.content['info']))
         return str(sha1_hash.hexdigest().upper())
 
     @property
@@ -371,4 +421,5 @@ class Torrent:
         return f'<Torrent instance. Files: {self.get_filelist()}>'
 
     def encode(self) -> bytes:
+        self._load_pieces()
         return bencode(self.content)
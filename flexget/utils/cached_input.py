@@ -1,13 +1,27 @@
 from __future__ import annotations
 
 import copy
+import hashlib
 import pickle
+from collections import defaultdict
 from datetime import datetime, timedelta
 from functools import partial
 from typing import TYPE_CHECKING
 
 from loguru import logger
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Unicode, select
+from sqlalchemy import (
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Unicode,
+    bindparam,
+    delete,
+    func,
+    select,
+)
 from sqlalchemy.orm import relationship
 
 from flexget import db_schema
@@ -17,8 +31,8 @@ from flexget.manager import Session
 from flexget.plugin import PluginError
 from flexget.utils import json, serialization
 from flexget.utils.database import entry_synonym
-from flexget.utils.sqlalchemy_utils import table_add_column, table_schema
-from flexget.utils.tools import TimedDict, get_config_hash, parse_timedelta
+from flexget.utils.sqlalchemy_utils import create_index, table_add_column, table_schema
+from flexget.utils.tools import TimedDict, chunked, get_config_hash, parse_timedelta
 
 logger = logger.bind(name='input_cache')
 
@@ -31,7 +45,7 @@ if TYPE_CHECKING:
         def __init__(self, *args, **kwargs) -> None: ...
 
 else:
-    Base = db_schema.versioned_base('input_cache', 2)
+    Base = db_schema.versioned_base('input_cache', 4)
 
 
 @db_schema.upgrade('input_cache')
@@ -69,6 +83,20 @@ def upgrade(ver: int, session: DBSession) -> int:
             )
 
         ver = 2
+    if ver == 2:
+        # Existing rows have no hash, and will be replaced the next time the cache is stored
+        table = table_schema('input_cache_entry', session)
+        table_add_column(table, 'hash', String, session)
+        create_index('input_cache_entry', session, 'cache_id', 'hash')
+        ver = 3
+    if ver == 3:
+        # Rows used to be restored in the order they were inserted
+        table = table_schema('input_cache_entry', session)
+        table_add_column(table, 'position', Integer, session)
+        table = table_schema('input_cache_entry', session)
+        session.execute(table.update().values(position=table.c.id))
+        create_index('input_cache_entry', session, 'cache_id', 'position')
+        ver = 4
     return ver
 
 
@@ -91,10 +119,23 @@ class InputCacheEntry(Base):
     id = Column(Integer, primary_key=True)
     _json = Column('json', Unicode)
     entry = entry_synonym('_json')
+    # Hash of the serialized entry, to find out which entries changed when storing the cache
+    hash = Column(String)
+    # Index of the entry in the output of the input
+    position = Column(Integer)
 
     cache_id = Column(Integer, ForeignKey('input_cache.id'), nullable=False)
 
 
+Index('ix_input_cache_entry_cache_id_hash', InputCacheEntry.cache_id, InputCacheEntry.hash)
+Index('ix_input_cache_entry_cache_id_position', InputCacheEntry.cache_id, InputCacheEntry.position)
+
+
+def entry_hash(serialized: str) -> str:
+    """Return the hash used to identify a serialized entry in the cache."""
+    return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+
 @event('manager.db_cleanup')
 def db_cleanup(manager, session: DBSession) -> None:
     """Remove old input caches from plugins that are no longer configured."""
@@ -183,9 +224,10 @@ class cached:  # noqa: N801 It acts like a function in usage
 
         return wrapped_func
 
-    def store_to_db(self, entries: list[str]):
-        # Store to database
+    def store_to_db(self, entries: list[Entry]) -> None:
+        # Store to database, only the entries which changed since the last time are written
         logger.debug('Storing cache {} to database.', self.cache_name)
+        serialized = [serialization.dumps(entry) for entry in entries]
         with Session() as session:
             db_cache = (
                 session.query(InputCache)
@@ -195,11 +237,53 @@ class cached:  # noqa: N801 It acts like a function in usage
             )
             if not db_cache:
                 db_cache = InputCache(name=self.name, hash=self.config_hash)
-            db_cache.entries = [InputCacheEntry(entry=ent) for ent in entries]
+                session.add(db_cache)
+                session.flush()
             db_cache.added = datetime.now()
-            session.merge(db_cache)
-
-    def load_from_db(self, load_expired: bool = False) -> list[InputCacheEntry] | None:
+            stored = defaultdict(list)
+            for row_id, row_hash, row_position in session.execute(
+                select(InputCacheEntry.id, InputCacheEntry.hash, InputCacheEntry.position).where(
+                    InputCacheEntry.cache_id == db_cache.id
+                )
+            ):
+                stored[row_hash].append((row_id, row_position))
+            rows = []
+            moved = []
+            for position, text in enumerate(serialized):
+                text_hash = entry_hash(text)
+                if stored[text_hash]:
+                    # Already stored, keep the row and only update its position if the order changed
+                    row_id, row_position = stored[text_hash].pop()
+                    if row_position != position:
+                        moved.append({'row_id': row_id, 'new_position': position})
+                else:
+                    rows.append({
+                        'cache_id': db_cache.id,
+                        'hash': text_hash,
+                        'json': text,
+                        'position': position,
+                    })
+            removed = [row_id for row_list in stored.values() for row_id, _ in row_list]
+            for chunk in chunked(removed):
+                session.execute(delete(InputCacheEntry).where(InputCacheEntry.id.in_(chunk)))
+            if moved:
+                table = InputCacheEntry.__table__
+                session.execute(
+                    table.update()
+                    .where(table.c.id == bindparam('row_id'))
+                    .values(position=bindparam('new_position')),
+                    moved,
+                )
+            if rows:
+                session.execute(InputCacheEntry.__table__.insert(), rows)
+        logger.debug(
+            'Stored cache {}, {} entries added and {} removed.',
+            self.cache_name,
+            len(rows),
+            len(removed),
+        )
+
+    def load_from_db(self, load_expired: bool = False) -> DBCacheEntries | None:
         with Session() as session:
             db_cache = (
                 session.query(InputCache)
@@ -210,14 +294,56 @@ class cached:  # noqa: N801 It acts like a function in usage
                 db_cache = db_cache.filter(InputCache.added > datetime.now() - self.persist)
             db_cache = db_cache.first()
             if db_cache:
-                entries = [ent.entry for ent in db_cache.entries]
-                logger.verbose(f'Restored {len(entries)} entries from db cache for {self.name}')
+                count = session.scalar(
+                    select(func.count(InputCacheEntry.id)).where(
+                        InputCacheEntry.cache_id == db_cache.id
+                    )
+                )
+                entries = DBCacheEntries(db_cache.id, count)
+                logger.verbose(f'Restored {count} entries from db cache for {self.name}')
                 # Store to in memory cache
-                self.cache[self.cache_name] = copy.deepcopy(entries)
+                self.cache[self.cache_name] = entries
                 return entries
             return None
 
 
+class DBCacheEntries:
+    """Entries of a persisted input cache, which are restored from the database in batches while iterating.
+
+    Entries are restored in the order the input produced them. Only one batch of serialized entries is held in
+    memory at a time. Every iteration restores new `Entry` instances, so they do not need to be copied like in
+    `IterableCache`.
+    """
+
+    batch_size = 1000
+
+    def __init__(self, cache_id: int, count: int):
+        self.cache_id = cache_id
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        last_position = -1
+        while True:
+            with Session() as session:
+                rows = session.execute(
+                    select(InputCacheEntry.position, InputCacheEntry._json)
+                    .where(InputCacheEntry.cache_id == self.cache_id)
+                    .where(InputCacheEntry.position > last_position)
+                    .order_by(InputCacheEntry.position)
+                    .limit(self.batch_size)
+                ).all()
+            for _, text in rows:
+                # Seems there could be invalid data somehow. See #2590
+                if text:
+                    yield serialization.loads(text)
+            if len(rows) < self.batch_size:
+                return
+            last_position = rows[-1].position
+
+
 class IterableCache:
     """Can cache any iterable (including generators) without immediately evaluating all entries.
 
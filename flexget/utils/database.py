@@ -4,16 +4,17 @@ import functools
 from datetime import datetime
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import extract, func
+from sqlalchemy import event, extract, func
 from sqlalchemy.ext.hybrid import Comparator, hybrid_property
 from sqlalchemy.orm import synonym
 
+from flexget.db_session import Session
 from flexget.entry import Entry
-from flexget.manager import Session
 from flexget.utils import json, qualities, serialization
 
 if TYPE_CHECKING:
     from sqlalchemy.orm import SynonymProperty
+    from typing_extensions import Self
 
 
 def with_session(*args, **kwargs):
@@ -115,6 +116,29 @@ def json_synonym(name: str) -> SynonymProperty:
     return synonym(name, descriptor=property(getter, setter))
 
 
+class QueryCounter:
+    """Context manager counting the SQL statements executed on the database of `session`.
+
+    Used for reporting how many queries a phase of a plugin performs. Statements on every connection to the
+    database are counted, as a session gets a new connection after each commit.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.count = 0
+
+    def _count(self, *args, **kwargs) -> None:
+        self.count += 1
+
+    def __enter__(self) -> Self:
+        self.engine = self.session.get_bind()
+        event.listen(self.engine, 'before_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *args) -> None:
+        event.remove(self.engine, 'before_cursor_execute', self._count)
+
+
 class CaseInsensitiveWord(Comparator):
     """Hybrid value representing a string that compares case insensitively."""
 
@@ -10,8 +10,6 @@ from collections.abc import Iterable, Mapping
 from contextlib import suppress
 from typing import Any
 
-from flexget.plugin import DependencyError
-
 try:
     import simplejson as json
 except ImportError:
@@ -22,6 +20,8 @@ except ImportError:
             # Google Appengine offers simplejson via django
             from django.utils import simplejson as json
         except ImportError:
+            from flexget.plugin import DependencyError
+
             raise DependencyError(missing='simplejson')
 
 DATE_FMT = '%Y-%m-%d'
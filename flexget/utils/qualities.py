@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING
 from loguru import logger
 
 from flexget.utils.serialization import Serializer
+from flexget.utils.tools import LRUCache
 
 if TYPE_CHECKING:
     from collections.abc import Iterator
@@ -48,6 +49,8 @@ class QualityComponent:
             regexp = re.escape(name)
         self.regexp = re.compile(r'(?<![^\W_])(' + regexp + r')(?![^\W_])', re.IGNORECASE)
 
+        self.pattern = regexp
+
     def matches(self, text: str) -> tuple[bool, str]:
         """Test if quality matches to text.
 
@@ -196,6 +199,25 @@ for items in (_resolutions, _sources, _codecs, _color_ranges, _audios):
         _registry[item.name] = item
 
 
+def _compile_detector(qlist: list[QualityComponent]) -> re.Pattern:
+    """Combine all component regexps of a list in one alternation.
+
+    It matches a text exactly when at least one of the components would, which lets `Quality.parse`
+    skip a whole component list with a single scan.
+    """
+    alternation = '|'.join(f'(?:{item.pattern})' for item in qlist)
+    return re.compile(r'(?<![^\W_])(?:' + alternation + r')(?![^\W_])', re.IGNORECASE)
+
+
+_detectors = {
+    id(qlist): _compile_detector(qlist)
+    for qlist in (_resolutions, _sources, _codecs, _color_ranges, _audios)
+}
+
+# Parsed components and remaining text of recently seen quality strings
+_parse_cache = LRUCache(max_size=10000)
+
+
 def all_components() -> Iterator[QualityComponent]:
     return iter(_registry.values())
 
@@ -223,6 +245,17 @@ class Quality(Serializer):
         :param text: The string to parse
         """
         self.text = text
+        cached = _parse_cache.get(text)
+        if cached is not None:
+            (
+                self.resolution,
+                self.source,
+                self.codec,
+                self.color_range,
+                self.audio,
+                self.clean_text,
+            ) = cached
+            return
         self.clean_text = text
         self.resolution = self._find_best(_resolutions, _UNKNOWNS['resolution'], False)
         self.source = self._find_best(_sources, _UNKNOWNS['source'])
@@ -235,6 +268,7 @@ class Quality(Serializer):
                 default = _registry[default]
                 if not getattr(self, default.type):
                     setattr(self, default.type, default)
+        _parse_cache.put(text, (*self.components, self.clean_text))
 
     def _find_best(
         self,
@@ -245,6 +279,8 @@ class Quality(Serializer):
         """Find the highest matching quality component from `qlist`."""
         result = None
         search_in = self.clean_text
+        if not _detectors[id(qlist)].search(search_in):
+            return default
         for item in qlist:
             match = item.matches(search_in)
             if match[0]:
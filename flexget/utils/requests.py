@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 import abc
+import contextlib
+import json
 import logging
+import os
+import threading
 import time
 import types
 
 # Allow some request objects to be imported from here instead of requests
 import warnings
-from datetime import datetime, timedelta
+from datetime import timedelta
 from email.message import EmailMessage
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
@@ -18,7 +22,14 @@ from loguru import logger
 from requests import RequestException
 
 from flexget import __version__ as version
-from flexget.utils.tools import TimedDict, parse_timedelta
+from flexget.event import event
+from flexget.utils.tools import parse_timedelta
+
+try:
+    import fcntl
+except ImportError:
+    # Windows, the state file is only locked between threads of one process
+    fcntl = None
 
 # If we use just 'requests' here, we'll get the logger created by requests, rather than our own
 logger = logger.bind(name='utils.requests')
@@ -30,16 +41,206 @@ logging.getLogger('urllib3').setLevel(logging.WARNING)
 
 # Time to wait before trying an unresponsive site again
 WAIT_TIME = timedelta(seconds=60)
-# Remembers sites that have timed out
-unresponsive_hosts = TimedDict(WAIT_TIME)
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
-    from typing import TypedDict
+    from collections.abc import Callable, Iterator, Mapping
+    from pathlib import Path
+    from typing import IO, TypedDict
+
+    class BucketDict(TypedDict):
+        tokens: float
+        last_update: float
+        full_at: float
+
+    class LimiterStateDict(TypedDict):
+        buckets: dict[str, BucketDict]
+        unresponsive: dict[str, float]
 
-    class StateCacheDict(TypedDict):
-        tokens: float | int
-        last_update: datetime
+
+class LimiterState:
+    """Holds the token buckets of domain limiters and the hosts which have timed out recently.
+
+    The state is kept in memory unless a `path` is given, in which case it is stored in that file, so that it is
+    shared with other processes, and remembered between executions. Writes to the file are serialized with an
+    exclusive lock where the platform supports it. Reads use the last state read or written, as long as the file
+    has not changed since, going by its inode, modification time and size. If the file cannot be used, the state is
+    kept in memory instead.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Init the limiter state.
+
+        :param path: File to store the state in.
+        :param clock: Function returning the current (wall clock) time as a timestamp.
+        :param sleep: Function used to wait for a token.
+        """
+        self.path = path
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.RLock()
+        self._state: LimiterStateDict = {'buckets': {}, 'unresponsive': {}}
+        # Identity of the file contents self._state was last read from or written to
+        self._file_version: tuple[int, int, int] | None = None
+
+    @staticmethod
+    def _version(f: IO[str]) -> tuple[int, int, int]:
+        stat = os.fstat(f.fileno())
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _parse(self, content: str) -> LimiterStateDict:
+        try:
+            state = json.loads(content) if content else {}
+        except ValueError:
+            logger.warning('Request limiter state in {} is corrupt, resetting it', self.path)
+            state = {}
+        state.setdefault('buckets', {})
+        state.setdefault('unresponsive', {})
+        return state
+
+    def _use_memory(self, error: OSError) -> None:
+        """Keep the state in memory from now on, starting with the last state read from the file."""
+        logger.warning(
+            'Cannot store request limiter state in {}, keeping it in memory: {}', self.path, error
+        )
+        self.path = None
+        self._file_version = None
+
+    def _open(self, mode: str, lock: int) -> IO[str] | None:
+        try:
+            f = open(self.path, mode, encoding='utf-8')  # noqa: SIM115 closed by the caller
+        except OSError as e:
+            self._use_memory(e)
+            return None
+        try:
+            if fcntl:
+                fcntl.flock(f, lock)
+        except OSError as e:
+            f.close()
+            self._use_memory(e)
+            return None
+        return f
+
+    def read(self) -> LimiterStateDict:
+        """Return the current state, which must not be modified."""
+        with self._lock:
+            if not self.path:
+                return self._state
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._state = {'buckets': {}, 'unresponsive': {}}
+                self._file_version = None
+                return self._state
+            except OSError as e:
+                self._use_memory(e)
+                return self._state
+            if self._file_version == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+                return self._state
+            f = self._open('r', fcntl.LOCK_SH if fcntl else 0)
+            if f is None:
+                return self._state
+            with f:
+                self._state = self._parse(f.read())
+                self._file_version = self._version(f)
+            return self._state
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[LimiterStateDict]:
+        """Lock the state and yield it for modification. Changes are saved when the block exits."""
+        with self._lock:
+            f = self._open('a+', fcntl.LOCK_EX if fcntl else 0) if self.path else None
+            if f is None:
+                yield self._state
+                self._prune(self._state)
+                return
+            with f:
+                f.seek(0)
+                content = f.read()
+                state = self._parse(content)
+                yield state
+                self._prune(state)
+                self._state = state
+                new_content = json.dumps(state)
+                try:
+                    if new_content != content:
+                        f.seek(0)
+                        f.truncate()
+                        f.write(new_content)
+                        f.flush()
+                    self._file_version = self._version(f)
+                except OSError as e:
+                    self._use_memory(e)
+
+    def _prune(self, state: LimiterStateDict) -> None:
+        """Drop full buckets and expired unresponsive hosts, they are the same as having no state."""
+        now = self.clock()
+        for domain, bucket in list(state['buckets'].items()):
+            if bucket['full_at'] <= now:
+                del state['buckets'][domain]
+        for host, until in list(state['unresponsive'].items()):
+            if until <= now:
+                del state['unresponsive'][host]
+
+    def take_token(self, domain: str, max_tokens: float, rate: float, wait: bool = True) -> float:
+        """Take a token from the bucket of `domain`.
+
+        :param max_tokens: Size of the bucket.
+        :param rate: Seconds it takes to accrue one token.
+        :param wait: If False, raise `RequestException` instead of waiting when the bucket is empty.
+        :return: Seconds to wait before the token may be used.
+        """
+        with self.transaction() as state:
+            now = self.clock()
+            bucket = state['buckets'].get(domain)
+            tokens = float(max_tokens)
+            if bucket:
+                tokens = min(tokens, bucket['tokens'] + (now - bucket['last_update']) / rate)
+            if tokens < 1 and not wait:
+                raise RequestException(f'Requests to {domain} have exceeded their limit.')
+            # Tokens may go negative, which reserves the next ones for requests already waiting
+            tokens -= 1
+            state['buckets'][domain] = {
+                'tokens': tokens,
+                'last_update': now,
+                'full_at': now + (max_tokens - tokens) * rate,
+            }
+        return max(0.0, -tokens * rate)
+
+    def is_unresponsive(self, host: str) -> bool:
+        return self.read()['unresponsive'].get(host, 0) > self.clock()
+
+    def set_unresponsive(self, host: str, wait_time: timedelta = WAIT_TIME) -> None:
+        if self.is_unresponsive(host):
+            return
+        with self.transaction() as state:
+            # If somehow this is called again before previous timer clears, don't refresh
+            if state['unresponsive'].get(host, 0) <= self.clock():
+                state['unresponsive'][host] = self.clock() + wait_time.total_seconds()
+
+    def clear(self) -> None:
+        with self.transaction() as state:
+            state['buckets'].clear()
+            state['unresponsive'].clear()
+
+
+# Shared by all sessions, replaced with a persistent one by the manager
+limiter_state = LimiterState()
+
+
+def set_limiter_state(state: LimiterState) -> None:
+    global limiter_state
+    limiter_state = state
+
+
+@event('manager.initialize')
+def persist_limiter_state(manager) -> None:
+    """Share limiter state with other FlexGet processes, and future executions, using the same config directory."""
+    set_limiter_state(LimiterState(manager.config_base / '.request-limits.json'))
 
 
 def is_unresponsive(url: str) -> bool:
@@ -49,8 +250,7 @@ def is_unresponsive(url: str) -> bool:
     :return: True if the host has timed out within WAIT_TIME
     :rtype: bool
     """
-    host = urlparse(url).hostname
-    return host in unresponsive_hosts
+    return limiter_state.is_unresponsive(urlparse(url).hostname)
 
 
 def set_unresponsive(url: str) -> None:
@@ -58,11 +258,7 @@ def set_unresponsive(url: str) -> None:
 
     :param url: The url that timed out
     """
-    host = urlparse(url).hostname
-    if host in unresponsive_hosts:
-        # If somehow this is called again before previous timer clears, don't refresh
-        return
-    unresponsive_hosts[host] = True
+    limiter_state.set_unresponsive(urlparse(url).hostname)
 
 
 class DomainLimiter(abc.ABC):
@@ -77,13 +273,9 @@ class DomainLimiter(abc.ABC):
 class TokenBucketLimiter(DomainLimiter):
     """A token bucket rate limiter for domains.
 
-    New instances for the same domain will restore previous values.
+    All instances for the same domain share their bucket, which is kept in `limiter_state`.
     """
 
-    # This is just an in memory cache right now, it works for the daemon, and across tasks in a single execution
-    # but not for multiple executions via cron. Do we need to store this to db?
-    state_cache: dict[str, StateCacheDict] = {}
-
     def __init__(
         self,
         domain: str,
@@ -101,42 +293,18 @@ class TokenBucketLimiter(DomainLimiter):
         self.max_tokens = tokens
         self.rate = parse_timedelta(rate)
         self.wait = wait
-        # Restore previous state for this domain, or establish new state cache
-        self.state = self.state_cache.setdefault(
-            domain, {'tokens': self.max_tokens, 'last_update': datetime.now()}
-        )
-
-    @property
-    def tokens(self) -> float | int:
-        return min(self.max_tokens, self.state['tokens'])
-
-    @tokens.setter
-    def tokens(self, value: float) -> None:
-        self.state['tokens'] = value
-
-    @property
-    def last_update(self) -> datetime:
-        return self.state['last_update']
-
-    @last_update.setter
-    def last_update(self, value: datetime) -> None:
-        self.state['last_update'] = value
 
     def __call__(self) -> None:
-        if self.tokens < self.max_tokens:
-            regen = (datetime.now() - self.last_update).total_seconds() / self.rate.total_seconds()
-            self.tokens += regen
-        self.last_update = datetime.now()
-        if self.tokens < 1:
-            if not self.wait:
-                raise RequestException(f'Requests to {self.domain} have exceeded their limit.')
-            wait = self.rate.total_seconds() * (1 - self.tokens)
+        state = limiter_state
+        wait = state.take_token(
+            self.domain, self.max_tokens, self.rate.total_seconds(), wait=self.wait
+        )
+        if wait:
             # Don't spam console if wait is low
             level = 'DEBUG' if wait < 4 else 'VERBOSE'
             logger.log(level, 'Waiting {:.2f} seconds until next request to {}', wait, self.domain)
             # Sleep until it is time for the next request
-            time.sleep(wait)
-        self.tokens -= 1
+            state.sleep(wait)
 
 
 class TimedLimiter(TokenBucketLimiter):
@@ -1,18 +1,28 @@
+from __future__ import annotations
+
 import datetime
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import yaml
 from loguru import logger
 
 from flexget.utils import json
 
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
 DATE_FMT = '%Y-%m-%d'
 DATETIME_FMT = '%Y-%m-%dT%H:%M:%SZ'
 
 
 logger = logger.bind(name='utils.serialization')
 
+# Lookups of the serializer for a type or name, and of the compact encoder for a type
+_serializers_by_type: dict[type, type[Serializer] | None] = {}
+_serializers_by_name: dict[str, type[Serializer]] = {}
+_compact_encoders: dict[type, Callable[[Any], Any]] = {}
+
 
 def serialize(value: Any) -> Any:
     """Convert an object to JSON serializable format.
@@ -36,6 +46,46 @@ def serialize(value: Any) -> Any:
     raise TypeError(f'`{value!r}` of type {type(value)!r} is not serializable')
 
 
+def compact_serialize(value: Any) -> Any:
+    """Convert an object to the compact JSON serializable format.
+
+    Unlike `serialize`, values handled by a serializer are stored as a single key dict tagged with their type,
+    rather than a nested dict naming the serializer and its version. The version of the compact format is the
+    version of the serializer which uses it for its value, e.g. `Entry`.
+
+    :param value: Object to serialize.
+    :return: JSON serializable representation of this object.
+    """
+    encoder = _compact_encoders.get(type(value))
+    if encoder is None:
+        encoder = _compact_encoder_for(value)
+    return encoder(value)
+
+
+def compact_deserialize(value: Any) -> Any:
+    """Restore an object stored with `compact_serialize` to its original format.
+
+    :param value: Compact serialized representation of the object.
+    :return: Deserialized object.
+    """
+    if type(value) is list:
+        return [compact_deserialize(v) for v in value]
+    if type(value) is dict:
+        if len(value) == 1:
+            ((tag, data),) = value.items()
+            decoder = _compact_decoders.get(tag)
+            if decoder is not None:
+                return decoder(data)
+        return {k: compact_deserialize(v) for k, v in value.items()}
+    return value
+
+
+def _clear_caches() -> None:
+    _serializers_by_type.clear()
+    _serializers_by_name.clear()
+    _compact_encoders.clear()
+
+
 def deserialize(value: Any) -> Any:
     """Restore an object stored with this serialization system to its original format.
 
@@ -85,6 +135,11 @@ class Serializer(ABC):
     This is important for data that is stored in `Entry` fields so that it can be stored to the database.
     """
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Serializers can be defined by plugins loaded at any time, look them up again
+        _clear_caches()
+
     @classmethod
     def serializer_name(cls) -> str:
         """Return name of the serializer defaults to class name.
@@ -104,7 +159,10 @@ class Serializer(ABC):
 
     @classmethod
     def serializer_handles(cls, value: Any) -> bool:
-        """Return True if this serializer can handle `value`."""
+        """Return True if this serializer can handle `value`.
+
+        The answer is cached for the type of `value`, so it should not depend on anything else.
+        """
         return isinstance(value, cls)
 
     @classmethod
@@ -200,17 +258,98 @@ class TupleSerializer(Serializer):
 
 
 def _serializer_for(value) -> type[Serializer] | None:
+    try:
+        return _serializers_by_type[type(value)]
+    except KeyError:
+        pass
     for s in Serializer.__subclasses__():
         if s.serializer_handles(value):
-            return s
-    return None
+            break
+    else:
+        s = None
+    _serializers_by_type[type(value)] = s
+    return s
 
 
 def _deserializer_for(serializer_name: str) -> type[Serializer]:
-    for s in Serializer.__subclasses__():
-        if serializer_name == s.serializer_name():
-            return s
-    raise ValueError(f'No deserializer for {serializer_name}')
+    if not _serializers_by_name:
+        _serializers_by_name.update(
+            (s.serializer_name(), s) for s in reversed(Serializer.__subclasses__())
+        )
+    try:
+        return _serializers_by_name[serializer_name]
+    except KeyError:
+        raise ValueError(f'No deserializer for {serializer_name}') from None
+
+
+def _compact_list(value: list) -> list:
+    return [compact_serialize(v) for v in value]
+
+
+def _compact_dict(value: dict) -> dict:
+    result = {k: compact_serialize(v) for k, v in value.items()}
+    if len(result) == 1 and next(iter(result)) in _compact_decoders:
+        # Escape plain dicts which would be mistaken for a tagged value
+        return {'$map': result}
+    return result
+
+
+def _compact_plain(value: Any) -> Any:
+    return value
+
+
+def _compact_serializer(s: type[Serializer]) -> Callable[[Any], dict]:
+    name, version = s.serializer_name(), s.serializer_version()
+    return lambda value: {'$s': [name, version, s.serialize(value)]}
+
+
+_compact_tagged = {
+    DateTimeSerializer: lambda value: {'$dt': DateTimeSerializer.serialize(value)},
+    DateSerializer: lambda value: {'$d': DateSerializer.serialize(value)},
+    SetSerializer: lambda value: {'$set': _compact_list(value)},
+    TupleSerializer: lambda value: {'$tuple': _compact_list(value)},
+}
+
+
+def _compact_encoder_for(value: Any) -> Callable[[Any], Any]:
+    s = _serializer_for(value)
+    if s:
+        encoder = _compact_tagged.get(s) or _compact_serializer(s)
+    elif isinstance(value, list):
+        encoder = _compact_list
+    elif isinstance(value, dict):
+        encoder = _compact_dict
+    elif isinstance(value, (str, int, float, type(None))):
+        encoder = _compact_plain
+    else:
+        raise TypeError(f'`{value!r}` of type {type(value)!r} is not serializable')
+    _compact_encoders[type(value)] = encoder
+    return encoder
+
+
+def _compact_datetime(data: str) -> datetime.datetime:
+    # Much faster than strptime, which is only needed to log invalid values
+    try:
+        return datetime.datetime.fromisoformat(data.removesuffix('Z'))
+    except ValueError:
+        return DateTimeSerializer.deserialize(data, 1)
+
+
+def _compact_date(data: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(data)
+    except ValueError:
+        return DateSerializer.deserialize(data, 1)
+
+
+_compact_decoders: dict[str, Callable[[Any], Any]] = {
+    '$dt': _compact_datetime,
+    '$d': _compact_date,
+    '$set': lambda data: {compact_deserialize(v) for v in data},
+    '$tuple': lambda data: tuple(compact_deserialize(v) for v in data),
+    '$s': lambda data: _deserializer_for(data[0]).deserialize(data[2], data[1]),
+    '$map': lambda data: {k: compact_deserialize(v) for k, v in data.items()},
+}
 
 
 def _yaml_representer(dumper, data):
@@ -13,11 +13,12 @@ from loguru import logger
 from sqlalchemy import Column, DateTime, Index, Integer, String, Unicode, select
 
 from flexget import db_schema
+from flexget.db_session import Session
 from flexget.event import event
-from flexget.manager import Session
 from flexget.utils import json
 from flexget.utils.database import json_synonym
 from flexget.utils.sqlalchemy_utils import create_index, table_add_column, table_schema
+from flexget.utils.tools import chunked
 
 logger = logger.bind(name='util.simple_persistence')
 Base = db_schema.versioned_base('simple_persistence', 4)
@@ -128,6 +129,8 @@ class SimplePersistence(MutableMapping):
 
     # Stores values in store[taskname][pluginname][key] format
     class_store = defaultdict(lambda: defaultdict(dict))
+    # Serialized values as they are in the database, in the same format. Used to flush only changed values.
+    class_saved = defaultdict(lambda: defaultdict(dict))
 
     def __init__(self, plugin=None):
         self.taskname = None
@@ -161,36 +164,84 @@ class SimplePersistence(MutableMapping):
         with Session() as session:
             for skv in session.query(SimpleKeyValue).filter(SimpleKeyValue.task == task).all():
                 try:
-                    cls.class_store[task][skv.plugin][skv.key] = skv.value
+                    value = skv.value
                 except TypeError as e:
                     logger.warning(
                         'Value stored in simple_persistence cannot be decoded. It will be removed. Error: {}',
                         str(e),
                     )
                     cls.class_store[task][skv.plugin][skv.key] = DELETE
+                    cls.class_saved[task][skv.plugin][skv.key] = skv._json
+                    continue
+                cls.class_store[task][skv.plugin][skv.key] = value
+                cls.class_saved[task][skv.plugin][skv.key] = json.dumps(
+                    value, encode_datetime=True
+                )
 
     @classmethod
     def flush(cls, task=None):
-        """Flush all in memory key/values to database."""
+        """Flush changed and deleted in memory key/values to database."""
         logger.debug('Flushing simple persistence for task {} to db.', task)
+        rows = []
+        # Mapping of plugin name to keys which need to be removed from the database
+        removed = defaultdict(list)
+        # Mapping of plugin name to serialized values, or DELETE, which the database will have after this flush
+        flushed = defaultdict(dict)
+        for pluginname, store in cls.class_store[task].items():
+            saved = cls.class_saved[task][pluginname]
+            for key, value in store.items():
+                if value is DELETE:
+                    removed[pluginname].append(key)
+                    flushed[pluginname][key] = DELETE
+                    continue
+                # Values can be modified in place, so compare serialized versions to find changed ones
+                serialized = json.dumps(value, encode_datetime=True)
+                if saved.get(key) != serialized:
+                    removed[pluginname].append(key)
+                    flushed[pluginname][key] = serialized
+                    rows.append({
+                        'feed': task,
+                        'plugin': pluginname,
+                        'key': key,
+                        'json': serialized,
+                    })
+        if not removed:
+            logger.debug('Nothing changed in simple persistence for task {}.', task)
+            return
+        deleted = 0
         with Session() as session:
-            for pluginname in cls.class_store[task]:
-                for key, value in cls.class_store[task][pluginname].items():
-                    query = (
+            # There is no unique constraint to upsert against (and taskless keys have a NULL task), so replace changed
+            # keys by deleting their old rows and inserting all new values at once
+            for pluginname, keys in removed.items():
+                for chunk in chunked(keys):
+                    deleted += (
                         session.query(SimpleKeyValue)
                         .filter(SimpleKeyValue.task == task)
                         .filter(SimpleKeyValue.plugin == pluginname)
-                        .filter(SimpleKeyValue.key == key)
+                        .filter(SimpleKeyValue.key.in_(chunk))
+                        .delete(synchronize_session=False)
                     )
-                    if value == DELETE:
-                        query.delete()
-                    else:
-                        updated = query.update(
-                            {'value': json.dumps(value, encode_datetime=True)},
-                            synchronize_session=False,
-                        )
-                        if not updated:
-                            session.add(SimpleKeyValue(task, pluginname, key, value))
+            if rows:
+                added = datetime.now()
+                session.execute(
+                    SimpleKeyValue.__table__.insert(), [{**row, 'added': added} for row in rows]
+                )
+        for pluginname, values in flushed.items():
+            store = cls.class_store[task][pluginname]
+            saved = cls.class_saved[task][pluginname]
+            for key, serialized in values.items():
+                if serialized is DELETE:
+                    if store.get(key) is DELETE:
+                        del store[key]
+                    saved.pop(key, None)
+                else:
+                    saved[key] = serialized
+        logger.debug(
+            'Flushed simple persistence for task {}, {} rows deleted and {} rows inserted.',
+            task,
+            deleted,
+            len(rows),
+        )
 
 
 class SimpleTaskPersistence(SimplePersistence):
@@ -206,6 +257,8 @@ class SimpleTaskPersistence(SimplePersistence):
 @event('manager.startup')
 def load_taskless(manager):
     """Load all key/value pairs into memory which aren't associated with a specific task."""
+    # Anything already in memory has not been saved to this manager's database
+    SimplePersistence.class_saved.clear()
     SimplePersistence.load()
 
 
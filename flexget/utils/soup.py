@@ -1,14 +1,106 @@
-# Hack, hide DataLossWarnings
-# Based on html5lib code namespaceHTMLElements=False should do it, but nope ...
-# Also it doesn't seem to be available in older version from html5lib, removing it
+from __future__ import annotations
+
 import warnings
-from typing import IO
+from typing import IO, TYPE_CHECKING
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
 from html5lib.constants import DataLossWarning
+from loguru import logger
+
+from flexget import config_schema
+from flexget.event import event
+
+if TYPE_CHECKING:
+    from flexget.manager import Manager
 
+logger = logger.bind(name='soup')
+
+# Hack, hide DataLossWarnings
+# Based on html5lib code namespaceHTMLElements=False should do it, but nope ...
+# Also it doesn't seem to be available in older version from html5lib, removing it
 warnings.simplefilter('ignore', DataLossWarning)
 
+HTML_PARSERS = ('lxml', 'html5lib', 'html.parser')
+
+html_parser_config_schema = {
+    'oneOf': [
+        {'type': 'string', 'enum': ['auto', *HTML_PARSERS]},
+        {
+            'type': 'object',
+            'properties': {
+                'default': {'type': 'string', 'enum': ['auto', *HTML_PARSERS]},
+                'plugins': {
+                    'type': 'object',
+                    'additionalProperties': {'type': 'string', 'enum': list(HTML_PARSERS)},
+                },
+            },
+            'additionalProperties': False,
+        },
+    ]
+}
+
+# Parser used when neither the plugin nor the config asks for one, and parsers configured for plugins
+default_parser = 'auto'
+plugin_parsers: dict[str, str] = {}
+
+
+def lxml_available() -> bool:
+    return builder_registry.lookup('lxml') is not None
+
+
+def resolve_parser(parser: str | None = None, plugin: str | None = None) -> str:
+    """Return the parser to use, in order of preference the one configured for `plugin`, `parser`, or the default.
+
+    `auto` picks lxml if it is installed, html5lib otherwise.
+    """
+    parser = plugin_parsers.get(plugin) or parser or default_parser
+    if parser == 'auto':
+        return 'lxml' if lxml_available() else 'html5lib'
+    return parser
+
+
+def get_soup(
+    obj: str | IO | bytes,
+    parser: str | None = None,
+    plugin: str | None = None,
+    parse_only: SoupStrainer | str | list[str] | None = None,
+) -> BeautifulSoup:
+    """Parse an HTML (or XML) document.
+
+    :param obj: The document.
+    :param parser: Parser needed for this document. By default the fastest installed one, see :func:`resolve_parser`.
+    :param plugin: Name of the plugin parsing the document, the user can configure a parser for each plugin.
+    :param parse_only: Only build the tree for the elements matching this strainer, or with these tag names. The
+        whole document is parsed with html5lib, which does not support this.
+    """
+    chosen = resolve_parser(parser, plugin)
+    if chosen == 'html5lib':
+        parse_only = None
+    elif parse_only is not None and not isinstance(parse_only, SoupStrainer):
+        parse_only = SoupStrainer(parse_only)
+    if chosen != 'lxml' or parser or plugin in plugin_parsers:
+        return BeautifulSoup(obj, chosen, parse_only=parse_only)
+    if hasattr(obj, 'read'):
+        obj = obj.read()
+    soup = BeautifulSoup(obj, chosen, parse_only=parse_only)
+    if parse_only is None and obj and soup.find() is None:
+        # lxml gives up on some badly broken pages, html5lib parses anything like a browser would
+        logger.debug('lxml could not make sense of the page, parsing it with html5lib')
+        soup = BeautifulSoup(obj, 'html5lib')
+    return soup
+
+
+@event('manager.config_updated')
+def configure_html_parser(manager: Manager) -> None:
+    global default_parser, plugin_parsers
+    config = manager.config.get('html_parser') or {}
+    if isinstance(config, str):
+        config = {'default': config}
+    default_parser = config.get('default', 'auto')
+    plugin_parsers = config.get('plugins', {})
+
 
-def get_soup(obj: str | IO | bytes, parser: str = 'html5lib') -> BeautifulSoup:
-    return BeautifulSoup(obj, parser)
+@event('config.register')
+def register_config_key() -> None:
+    config_schema.register_config_key('html_parser', html_parser_config_schema)
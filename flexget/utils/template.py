@@ -29,7 +29,7 @@ from pendulum import Interval as _Interval
 from flexget.event import event
 from flexget.utils.lazy_dict import LazyDict
 from flexget.utils.pathscrub import pathscrub
-from flexget.utils.tools import format_filesize, parse_filesize, split_title_year
+from flexget.utils.tools import LRUCache, format_filesize, parse_filesize, split_title_year
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
@@ -43,6 +43,12 @@ logger = logger.bind(name='utils.template')
 # The environment will be created after the manager has started
 environment: FlexGetEnvironment | None = None
 
+TEMPLATE_CACHE_SIZE = 1000
+# Compiled templates keyed by (source, native), and compiled expressions keyed by source.
+# Both are bound to `environment`, and are cleared whenever it is created.
+template_cache = LRUCache(max_size=TEMPLATE_CACHE_SIZE, name='Template')
+expression_cache = LRUCache(max_size=TEMPLATE_CACHE_SIZE, name='Expression')
+
 
 def extra_vars() -> dict:
     return {
@@ -330,6 +336,8 @@ class FlexGetEnvironment(Environment):
 def make_environment(manager: Manager) -> None:
     """Create our environment and add our custom filters."""
     global environment
+    template_cache.clear()
+    expression_cache.clear()
     environment = FlexGetEnvironment(
         undefined=StrictUndefined,
         loader=ChoiceLoader([
@@ -391,15 +399,18 @@ def render(template: FlexGetTemplate | str, context: Mapping, native: bool = Fal
     :return: The rendered template text.
     """
     if isinstance(template, str) and environment is not None:
-        template_class = None
-        if native:
-            template_class = FlexGetNativeTemplate
-        try:
-            template = cast(
-                'FlexGetTemplate', environment.from_string(template, template_class=template_class)
-            )
-        except TemplateSyntaxError as e:
-            raise RenderError(f'Error in template syntax: {e.message}')
+        key = (template, native)
+        compiled = template_cache.get(key)
+        if compiled is None:
+            template_class = None
+            if native:
+                template_class = FlexGetNativeTemplate
+            try:
+                compiled = environment.from_string(template, template_class=template_class)
+            except TemplateSyntaxError as e:
+                raise RenderError(f'Error in template syntax: {e.message}')
+            template_cache.put(key, compiled)
+        template = cast('FlexGetTemplate', compiled)
     try:
         template = cast('FlexGetTemplate', template)
         result = template.render(context)
@@ -445,7 +456,10 @@ def evaluate_expression(expression: str, context: Mapping) -> Any:
     :param context: dictlike, supporting LazyDicts
     """
     if environment is not None:
-        compiled_expr = environment.compile_expression(expression)
+        compiled_expr = expression_cache.get(expression)
+        if compiled_expr is None:
+            compiled_expr = environment.compile_expression(expression)
+            expression_cache.put(expression, compiled_expr)
         # If we have a LazyDict, grab the underlying store. Our environment supports LazyFields directly
         if isinstance(context, LazyDict):
             context = context.store
@@ -11,8 +11,9 @@ import operator
 import queue
 import re
 import sys
+import threading
 import weakref
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from collections.abc import MutableMapping
 from datetime import datetime, timedelta
 from html.entities import name2codepoint
@@ -280,6 +281,86 @@ class TimedDict(MutableMapping):
             store.clear()
 
 
+class LRUCache:
+    """Thread safe, size bounded mapping which evicts the least recently used keys first.
+
+    Keeps hit/miss/eviction counters so callers can report how effective the cache is. Caches given a `name` are
+    reported by ``--debug-perf``.
+    """
+
+    _instances: dict[int, LRUCache] = weakref.WeakValueDictionary()
+
+    def __init__(self, max_size: int = 1000, name: str | None = None):
+        self.max_size = max_size
+        self.name = name
+        self._store: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._instances[id(self)] = self
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._store[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._store.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value) -> None:
+        with self._lock:
+            self._store[key] = value
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_size:
+                self._store.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            'size': len(self._store),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def __contains__(self, key) -> bool:
+        return key in self._store
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(max_size={self.max_size}, size={len(self)})'
+
+    @classmethod
+    def clear_all(cls):
+        """Clear all instantiated LRUCaches.
+
+        Used by tests to make sure artifacts don't leak between tests.
+        """
+        for cache in cls._instances.values():
+            cache.clear()
+
+    @classmethod
+    def named(cls) -> list[LRUCache]:
+        """Return all instantiated LRUCaches which were given a name, sorted by name."""
+        return sorted((c for c in list(cls._instances.values()) if c.name), key=lambda c: c.name)
+
+
 class BufferQueue(queue.Queue):
     """Used in place of a file-like object to capture text and access it safely from another thread."""
 
@@ -0,0 +1,39 @@
+from flexget.components.performance.api import ObjectsContainer as OC
+from flexget.utils import json
+
+
+class TestPerfAPI:
+    config = """
+        tasks:
+          profiled:
+            debug_perf: yes
+            mock:
+              - title: entry 1
+          other:
+            debug_perf: yes
+            mock:
+              - title: entry 1
+    """
+
+    def test_perf_profiles(self, api_client, schema_match, execute_task):
+        rsp = api_client.get('/server/perf/')
+        assert rsp.status_code == 200
+        assert json.loads(rsp.get_data(as_text=True)) == []
+
+        execute_task('profiled')
+        execute_task('other')
+        execute_task('profiled')
+
+        rsp = api_client.get('/server/perf/')
+        assert rsp.status_code == 200
+        data = json.loads(rsp.get_data(as_text=True))
+        errors = schema_match(OC.perf_profile_list_object, data)
+        assert not errors
+        assert [profile['task'] for profile in data] == ['profiled', 'other', 'profiled']
+
+        rsp = api_client.get('/server/perf/?task=profiled&per_page=1')
+        assert rsp.status_code == 200
+        data = json.loads(rsp.get_data(as_text=True))
+        assert len(data) == 1
+        assert data[0]['task'] == 'profiled'
+        assert rsp.headers['total-count'] == '2'
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import itertools
 import logging
 import os
@@ -14,6 +15,7 @@ from unittest import mock
 import jsonschema
 import pytest
 import requests
+import sqlalchemy
 import yaml
 from _pytest.logging import caplog as _caplog  # noqa: F401 pytest fixtures look unused
 from loguru import logger
@@ -299,9 +301,12 @@ def chdir(pytestconfig, request):
 @pytest.fixture(autouse=True)
 def clear_caches():
     """Make sure cached_input, and other caches are cleared between tests."""
-    from flexget.utils.tools import TimedDict
+    from flexget.utils.requests import LimiterState, set_limiter_state
+    from flexget.utils.tools import LRUCache, TimedDict
 
     TimedDict.clear_all()
+    LRUCache.clear_all()
+    set_limiter_state(LimiterState())
 
 
 class CrashReport(Exception):
@@ -334,6 +339,18 @@ class MockManager(Manager):
         config = yaml.safe_load(self.config_text) or {}
         self.update_config(config)
 
+    def init_sqlalchemy(self) -> None:
+        if self.database_uri != 'sqlite:///:memory:':
+            super().init_sqlalchemy()
+            return
+        # Each connection to an in-memory database gets its own empty database. Discover runs searches on
+        # worker threads, so share a single connection between threads.
+        create_engine = functools.partial(
+            sqlalchemy.create_engine, poolclass=sqlalchemy.pool.StaticPool
+        )
+        with mock.patch('sqlalchemy.create_engine', create_engine):
+            super().init_sqlalchemy()
+
     @property
     def conn(self):
         return self.engine.connect()
@@ -0,0 +1,91 @@
+from unittest import mock
+
+from sqlalchemy import text
+
+from flexget.components.archive import db
+from flexget.db_schema import PluginSchema
+from flexget.event import fire_event
+from flexget.manager import Session
+
+
+class TestArchiveSearch:
+    config = """
+        tasks:
+          learn:
+            mock:
+              - {title: 'Some.Show.S01E01.720p-GRP', url: 'http://localhost/1'}
+              - {title: 'Some.Show.S01E02.1080p-GRP', url: 'http://localhost/2'}
+              - {title: 'Some Other Show S01E01', url: 'http://localhost/3'}
+              - {title: 'Not.Some.Show.S01E01', url: 'http://localhost/4'}
+              - {title: 'Showtime.S01E01', url: 'http://localhost/5'}
+            accept_all: yes
+            archive: [tv]
+          discover:
+            discover:
+              release_estimations: ignore
+              what:
+                - mock:
+                  - title: Some Show S01E01
+              from:
+                - flexget_archive: [tv]
+            disable: seen
+    """
+
+    def search(self, value, **kwargs):
+        with Session() as session:
+            return sorted(a.title for a in db.search(session, value, **kwargs))
+
+    def test_search(self, execute_task):
+        execute_task('learn')
+        with Session() as session:
+            assert db.fts_available(session)
+        assert self.search('some show') == [
+            'Some.Show.S01E01.720p-GRP',
+            'Some.Show.S01E02.1080p-GRP',
+        ]
+        assert self.search('Some Show S01E0') == [
+            'Some.Show.S01E01.720p-GRP',
+            'Some.Show.S01E02.1080p-GRP',
+        ]
+        assert self.search('some.show.s01e02') == ['Some.Show.S01E02.1080p-GRP']
+        assert self.search('show') == ['Showtime.S01E01']
+        assert self.search('some show', tags=['movies']) == []
+
+    def test_like_fallback(self, execute_task):
+        execute_task('learn')
+        with mock.patch.object(db, 'fts_available', return_value=False):
+            assert self.search('some show') == [
+                'Some.Show.S01E01.720p-GRP',
+                'Some.Show.S01E02.1080p-GRP',
+            ]
+            assert self.search('show') == ['Showtime.S01E01']
+
+    def test_index_follows_table(self, execute_task):
+        execute_task('learn')
+        with Session() as session:
+            entry = session.query(db.ArchiveEntry).filter(db.ArchiveEntry.url.endswith('/5')).one()
+            entry.title = 'Some.Show.S02E01'
+            session.query(db.ArchiveEntry).filter(db.ArchiveEntry.url.endswith('/1')).delete()
+        assert self.search('some show') == ['Some.Show.S01E02.1080p-GRP', 'Some.Show.S02E01']
+        assert self.search('showtime') == []
+
+    def test_upgrade_builds_index(self, execute_task, manager):
+        execute_task('learn')
+        with Session() as session:
+            session.execute(text('DROP TABLE archive_entry_fts'))
+            for suffix in ('ai', 'ad', 'au'):
+                session.execute(text(f'DROP TRIGGER archive_entry_fts_{suffix}'))
+            session.query(PluginSchema).filter(PluginSchema.plugin == 'archive').update({
+                'version': 0
+            })
+            assert not db.fts_available(session)
+        fire_event('manager.upgrade', manager)
+        with Session() as session:
+            assert db.fts_available(session)
+        assert self.search('some show s01e01') == ['Some.Show.S01E01.720p-GRP']
+
+    def test_discover(self, execute_task):
+        execute_task('learn')
+        task = execute_task('discover')
+        assert task.find_entry(title='Some.Show.S01E01.720p-GRP')
+        assert not task.find_entry(title='Some.Show.S01E02.1080p-GRP')
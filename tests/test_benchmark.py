@@ -0,0 +1,57 @@
+import pytest
+
+from flexget.manager import Session
+from flexget.plugins.cli.perf_tests import throwaway_database
+from flexget.utils import benchmark
+
+
+class TestBenchmark:
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert benchmark.percentile(values, 50) == 50
+        assert benchmark.percentile(values, 99) == 99
+        assert benchmark.percentile(values, 100) == 100
+        assert benchmark.percentile([7], 90) == 7
+
+    def test_measure(self):
+        calls = []
+        result = benchmark.measure(calls.append, range(10), items_per_op=100)
+        assert calls == list(range(10))
+        assert result['ops'] == 10
+        assert result['p50_ms'] <= result['p90_ms'] <= result['p99_ms'] <= result['max_ms']
+        with pytest.raises(ValueError, match='Nothing to measure'):
+            benchmark.measure(calls.append, [])
+
+    def test_compare(self):
+        baseline = benchmark.results_document({
+            'fast': {'ops_per_sec': 100},
+            'slow': {'ops_per_sec': 100},
+            'removed': {'ops_per_sec': 100},
+        })
+        results = {
+            'fast': {'ops_per_sec': 150},
+            'slow': {'ops_per_sec': 80},
+            'new': {'ops_per_sec': 1},
+        }
+        assert benchmark.compare(results, baseline) == pytest.approx({'fast': 50, 'slow': -20})
+        with pytest.raises(ValueError, match='Unsupported baseline format'):
+            benchmark.compare(results, {'format': 0, 'benchmarks': {}})
+
+
+class TestThrowawayDatabase:
+    config = """
+        tasks:
+          test:
+            mock:
+              - title: entry 1
+            accept_all: yes
+    """
+
+    def test_restores_database(self, manager, execute_task):
+        with throwaway_database(manager):
+            assert Session().get_bind() is not manager.engine
+            execute_task('test')
+        assert Session().get_bind() is manager.engine
+        # The entry was only seen in the throwaway database
+        task = execute_task('test')
+        assert task.find_entry('accepted', title='entry 1')
@@ -4,7 +4,8 @@ import pytest
 
 from flexget import plugin
 from flexget.entry import Entry
-from flexget.utils.cached_input import cached
+from flexget.manager import Session
+from flexget.utils.cached_input import InputCacheEntry, cached
 
 
 class InputPersist:
@@ -23,6 +24,19 @@ class InputPersist:
 plugin.register(InputPersist, 'test_input', api_ver=2)
 
 
+class InputTitles:
+    """Fake input plugin emitting the entries currently listed in `titles`."""
+
+    titles = []
+
+    @cached('test_titles', persist='5 minutes')
+    def on_task_input(self, task, config):
+        return [Entry(title=title, url=f'http://test.com/{title}') for title in self.titles]
+
+
+plugin.register(InputTitles, 'test_titles', api_ver=2)
+
+
 @pytest.mark.filecopy('rss.xml', '__tmp__/cached.xml')
 class TestInputCache:
     config = """
@@ -32,6 +46,8 @@ class TestInputCache:
               url: __tmp__/cached.xml
           test_db:
             test_input: True
+          test_titles:
+            test_titles: True
     """
 
     def test_memory_cache(self, execute_task, tmp_path):
@@ -55,3 +71,35 @@ class TestInputCache:
         cached.cache.clear()
         task = execute_task('test_db')
         assert task.entries, 'should have created entries from the cache'
+
+    def test_db_cache_differential(self, execute_task, monkeypatch):
+        """Test only changed entries are written when storing the db cache."""
+        monkeypatch.setattr(InputTitles, 'titles', ['a', 'b', 'c'])
+        execute_task('test_titles')
+        with Session() as session:
+            before = {row.entry['title']: row.id for row in session.query(InputCacheEntry)}
+        # New entries come first, like in a feed listing the newest items first
+        monkeypatch.setattr(InputTitles, 'titles', ['d', 'b', 'c'])
+        execute_task('test_titles', options={'nocache': True})
+        with Session() as session:
+            after = {row.entry['title']: row.id for row in session.query(InputCacheEntry)}
+        assert set(after) == {'b', 'c', 'd'}
+        assert after['b'] == before['b']
+        assert after['c'] == before['c']
+        # Restored lazily from the db in batches, in the order of the input
+        cached.cache.clear()
+        monkeypatch.setattr('flexget.utils.cached_input.DBCacheEntries.batch_size', 2)
+        monkeypatch.setattr(InputTitles, 'titles', [])
+        task = execute_task('test_titles')
+        assert [e['title'] for e in task.entries] == ['d', 'b', 'c']
+
+    def test_db_cache_reordered(self, execute_task, monkeypatch):
+        """Test the stored order follows the input when only the order of the entries changes."""
+        monkeypatch.setattr(InputTitles, 'titles', ['a', 'b', 'c'])
+        execute_task('test_titles')
+        monkeypatch.setattr(InputTitles, 'titles', ['c', 'a', 'b'])
+        execute_task('test_titles', options={'nocache': True})
+        cached.cache.clear()
+        monkeypatch.setattr(InputTitles, 'titles', [])
+        task = execute_task('test_titles')
+        assert [e['title'] for e in task.entries] == ['c', 'a', 'b']
@@ -1,6 +1,8 @@
+import copy
 from datetime import timedelta
 
 import jsonschema
+import pytest
 from jsonschema.validators import validator_for
 
 from flexget import config_schema
@@ -167,6 +169,86 @@ class TestSchemaValidator:
         assert config['p'] == 'foo'
 
 
+class TestValidatorCache:
+    def test_validator_reused_for_same_schema(self):
+        schema = {'properties': {'p': {'type': 'integer'}}}
+        validator = config_schema.get_validator(schema)
+        assert config_schema.get_validator(schema) is validator
+        assert config_schema.get_validator(schema, set_defaults=False) is not validator
+        assert config_schema.get_validator(dict(schema)) is not validator
+        assert config_schema.process_config({'p': 'a'}, schema)
+        assert not config_schema.process_config({'p': 1}, schema)
+
+    def test_register_schema_clears_cache(self):
+        schema = {'$ref': '/schema/test_cache'}
+        config_schema.register_schema('/schema/test_cache', {'type': 'integer'})
+        try:
+            assert not config_schema.process_config(1, schema)
+            config_schema.register_schema('/schema/test_cache', {'type': 'string'})
+            assert config_schema.process_config(1, schema)
+        finally:
+            del config_schema.schema_paths['/schema/test_cache']
+            config_schema.clear_validator_cache()
+
+
+class TestIncrementalValidation:
+    config = """
+        tasks:
+          a:
+            mock: [{title: a}]
+            exists_series: {path: /tmp}
+          b:
+            mock: [{title: b}]
+    """
+
+    @pytest.fixture
+    def raw_config(self):
+        return {
+            'tasks': {
+                'a': {'mock': [{'title': 'a'}], 'exists_series': {'path': '/tmp'}},
+                'b': {'mock': [{'title': 'b'}]},
+            }
+        }
+
+    def test_only_changed_tasks_are_validated(self, manager, raw_config):
+        config = raw_config
+        manager.validate_config(copy.deepcopy(config))
+        validated = manager.validate_config(copy.deepcopy(config))
+        assert manager.validation_stats['validated_tasks'] == 0
+        assert manager.validation_stats['tasks'] == 2
+        # Tasks which were not validated again are the same as when fully validated
+        manager._validated_tasks.clear()
+        assert validated == manager.validate_config(copy.deepcopy(config))
+        assert validated['tasks'] != config['tasks'], 'defaults should have been filled in'
+        assert list(validated['tasks']) == ['a', 'b']
+
+        config['tasks']['b']['mock'].append({'title': 'c'})
+        manager.validate_config(copy.deepcopy(config))
+        assert manager.validation_stats['validated_tasks'] == 1
+
+    def test_changed_invalid_task_raises(self, manager, raw_config):
+        config = raw_config
+        manager.validate_config(copy.deepcopy(config))
+        config['tasks']['b']['nonexistent_plugin'] = True
+        with pytest.raises(config_schema.ConfigError) as e:
+            manager.validate_config(copy.deepcopy(config))
+        assert e.value.errors[0].json_pointer == '/tasks/b'
+        # The previously valid version is still remembered
+        config['tasks']['b'].pop('nonexistent_plugin')
+        manager.validate_config(copy.deepcopy(config))
+        assert manager.validation_stats['validated_tasks'] == 0
+
+    def test_schema_change_revalidates(self, manager, raw_config):
+        manager.validate_config(copy.deepcopy(raw_config))
+        config_schema.register_schema('/schema/test_revalidate', {'type': 'integer'})
+        try:
+            manager.validate_config(copy.deepcopy(raw_config))
+            assert manager.validation_stats['validated_tasks'] == 2
+        finally:
+            del config_schema.schema_paths['/schema/test_revalidate']
+            config_schema.clear_validator_cache()
+
+
 class TestSchemaFormats:
     def _test_format(self, format, items, invalid=False):
         failures = []
@@ -1,3 +1,11 @@
+import random
+
+import pytest
+
+from flexget.entry import Entry
+from flexget.plugins.filter.crossmatch import CrossMatch, FieldIndex
+
+
 class TestCrossmatch:
     config = """
         tasks:
@@ -17,3 +25,83 @@ class TestCrossmatch:
         task = execute_task('test_title')
         assert task.find_entry('rejected', title='entry 2')
         assert len(task.rejected) == 1
+
+
+class TestCrossmatchIndex:
+    config = """
+        tasks:
+          test_case_insensitive:
+            mock:
+            - title: Entry 1
+            - title: entry 2
+            crossmatch:
+              from:
+              - mock:
+                - title: ENTRY 1
+              action: accept
+              fields: [title]
+              case_sensitive: no
+          test_substring:
+            mock:
+            - title: entry 1
+            - title: some entry 2 long
+            - title: en
+            - title: other
+            crossmatch:
+              from:
+              - mock:
+                - title: entry 1 longer
+                - title: entry 2
+              action: accept
+              exact: no
+              fields: [title]
+          test_copy_fields:
+            mock:
+            - title: entry 1
+            crossmatch:
+              from:
+              - mock:
+                - {title: entry 1, imdb_id: tt01}
+                - {title: entry 2, imdb_id: tt01, extra: value}
+              action: accept
+              fields: [title, imdb_id]
+    """
+
+    def test_case_insensitive(self, execute_task):
+        task = execute_task('test_case_insensitive')
+        assert [e['title'] for e in task.accepted] == ['Entry 1']
+
+    def test_substring(self, execute_task):
+        task = execute_task('test_substring')
+        assert [e['title'] for e in task.accepted] == ['entry 1', 'some entry 2 long', 'en']
+
+    def test_copied_fields_match_later_entries(self, execute_task):
+        task = execute_task('test_copy_fields')
+        entry = task.find_entry('accepted', title='entry 1')
+        assert entry['imdb_id'] == 'tt01'
+        # Only matches the second generated entry through the imdb_id copied from the first one
+        assert entry['extra'] == 'value'
+
+    @pytest.mark.parametrize('case_sensitive', [True, False])
+    @pytest.mark.parametrize('exact', [True, False])
+    def test_candidates_cover_all_matches(self, exact, case_sensitive):
+        rand = random.Random(0)
+        words = ['a', 'Ab', 'abc', 'ABCD', 'b', 'bcd', 'cd', '']
+
+        def value():
+            kind = rand.random()
+            if kind < 0.1:
+                return rand.randint(0, 3)
+            if kind < 0.15:
+                return [rand.choice(words)]
+            return ''.join(rand.choice(words) for _ in range(rand.randint(0, 3)))
+
+        entries = [Entry(title=str(i), field=value()) for i in range(200)]
+        entries += [Entry(title='missing')]
+        index = FieldIndex('field', entries, exact, case_sensitive)
+        crossmatch = CrossMatch()
+        for entry in entries[:100]:
+            candidates = set(index.candidates(entry['field']))
+            for position, other in enumerate(entries):
+                if crossmatch.entry_intersects(entry, other, ['field'], exact, case_sensitive):
+                    assert position in candidates
@@ -0,0 +1,232 @@
+import datetime
+import hashlib
+import socketserver
+import ssl
+import struct
+import threading
+import zlib
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+pytest.importorskip('deluge_client')
+
+from deluge_client.rencode import dumps, loads
+
+from flexget.plugins.clients import deluge
+
+# deluge-client opens a socket for every client it creates, also those the plugin never connects
+pytestmark = pytest.mark.filterwarnings('ignore::pytest.PytestUnraisableExceptionWarning')
+
+
+class FakeDaemon(socketserver.BaseRequestHandler):
+    """Answers deluge 2 RPC requests, keeping the torrents and labels in `server`."""
+
+    def handle(self):
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(self.server.cert_path)
+        self.sock = context.wrap_socket(self.request, server_side=True)
+        buffer = b''
+        while chunk := self.sock.recv(65536):
+            buffer += chunk
+            while buffer:
+                if buffer[:1] in (b'\x01', b'D'):
+                    if len(buffer) < 5:
+                        break
+                    end = 5 + struct.unpack('!I', buffer[1:5])[0]
+                    if len(buffer) < end:
+                        break
+                    message, header, buffer = buffer[5:end], buffer[:1], buffer[end:]
+                    # Only answer the current protocol, the client tries all of them to detect the version
+                    if header == b'\x01':
+                        self.server.messages += 1
+                        for request in loads(zlib.decompress(message), decode_utf8=True):
+                            self.answer(*request)
+                else:
+                    # Deluge 1 messages have no header
+                    decompressor = zlib.decompressobj()
+                    decompressor.decompress(buffer)
+                    if not decompressor.eof:
+                        break
+                    buffer = decompressor.unused_data
+
+    def finish(self):
+        self.sock.close()
+
+    def answer(self, request_id, method, args, kwargs):
+        self.server.calls.append((method, *args))
+        try:
+            response = (deluge.RPC_RESPONSE, request_id, self.call(method, *args))
+        except KeyError as exc:
+            response = (deluge.RPC_ERROR, request_id, 'KeyError', (str(exc),), {}, '')
+        message = zlib.compress(dumps(response))
+        self.sock.sendall(struct.pack('!BI', 1, len(message)) + message)
+
+    def call(self, method, *args):
+        torrents, labels = self.server.torrents, self.server.labels
+        if method == 'daemon.info':
+            return '2.1.1'
+        if method == 'daemon.login':
+            return 10
+        if method == 'core.get_session_state':
+            return list(torrents)
+        if method in ('core.get_enabled_plugins', 'core.get_available_plugins'):
+            return ['Label']
+        if method == 'label.get_labels':
+            return sorted(labels)
+        if method == 'label.add':
+            labels.add(args[0])
+            return None
+        if method == 'label.set_torrent':
+            if args[1] not in labels:
+                raise KeyError(f'Unknown Label {args[1]}')
+            torrents[args[0]]['label'] = args[1]
+            return None
+        if method in ('core.add_torrent_magnet', 'core.add_torrent_file'):
+            if 'fail' in args[0]:
+                raise KeyError('Torrent is invalid')
+            torrent_id = hashlib.sha1(args[0].encode()).hexdigest()
+            torrents[torrent_id] = {
+                'name': args[0],
+                'files': [{'index': 0, 'path': 'file.mkv', 'size': 100}],
+                'total_size': 100,
+                'save_path': '/downloads',
+                'move_on_completed_path': '',
+                'move_on_completed': False,
+                'progress': 0,
+                **args[-1],
+            }
+            return torrent_id
+        if method == 'core.get_torrents_status':
+            return {i: torrents[i] for i in args[0]['id'] if i in torrents}
+        if method == 'core.set_torrent_options':
+            for torrent_id in args[0]:
+                torrents[torrent_id].update(args[1])
+            return None
+        if method in ('core.queue_top', 'core.pause_torrent'):
+            return None
+        raise KeyError(f'Unknown method {method}')
+
+
+@pytest.fixture(scope='session')
+def daemon_cert(tmp_path_factory):
+    """Write a throwaway self-signed certificate and its key for the fake daemon, like deluge generates on start."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'Deluge Daemon')])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    path = tmp_path_factory.mktemp('deluge') / 'daemon.pem'
+    path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+        + cert.public_bytes(serialization.Encoding.PEM)
+    )
+    return path
+
+
+@pytest.fixture
+def daemon(manager, monkeypatch, daemon_cert):
+    monkeypatch.setattr(deluge, '_daemon_states', {})
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), FakeDaemon)
+    server.daemon_threads = True
+    server.cert_path = daemon_cert
+    server.torrents, server.labels, server.calls, server.messages = {}, set(), [], 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    for task_config in manager.config['tasks'].values():
+        task_config['deluge']['port'] = server.server_address[1]
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestDelugePipeline:
+    config = """
+        templates:
+          global:
+            disable: [seen, seen_info_hash, retry_failed]
+            accept_all: yes
+        tasks:
+          add:
+            mock:
+              - {title: 'torrent 1', url: 'magnet:?xt=urn:btih:1'}
+              - {title: 'torrent 2', url: 'magnet:?xt=urn:btih:2'}
+              - {title: 'torrent 3', url: 'magnet:?xt=urn:btih:3'}
+              - {title: 'broken', url: 'magnet:?xt=urn:btih:4&dn=fail'}
+            deluge:
+              host: 127.0.0.1
+              username: user
+              password: pass
+              label: tv
+              queue_to_top: yes
+              move_completed_path: /completed
+              max_connections: 50
+          pause:
+            mock:
+              - {title: 'torrent 1', torrent_info_hash: 'ID1'}
+              - {title: 'torrent 2', torrent_info_hash: 'ID2'}
+              - {title: 'missing', torrent_info_hash: 'ID3'}
+            deluge:
+              host: 127.0.0.1
+              username: user
+              password: pass
+              action: pause
+    """
+
+    def test_add(self, execute_task, daemon):
+        task = execute_task('add')
+        assert len(task.accepted) == 3
+        assert task.find_entry('failed', title='broken')
+        assert len(daemon.torrents) == 3
+        for torrent in daemon.torrents.values():
+            assert torrent['label'] == 'tv'
+            assert torrent['max_connections'] == 50
+            assert torrent['move_completed_path'] == '/completed'
+        ids = tuple(entry['deluge_id'] for entry in task.accepted)
+        # Options shared by the torrents are set for all of them at once
+        assert ('core.queue_top', ids) in daemon.calls
+        assert (
+            'core.set_torrent_options',
+            ids,
+            {'move_completed': True, 'move_completed_path': '/completed'},
+        ) in daemon.calls
+        # Version detection, login, the label plugin state, the new label, the torrents and then their options,
+        # however many torrents there are
+        assert daemon.messages == 6
+
+    def test_labels_cached(self, execute_task, daemon):
+        execute_task('add')
+        daemon.calls.clear()
+        execute_task('add')
+        methods = [call[0] for call in daemon.calls]
+        assert 'core.get_enabled_plugins' not in methods
+        assert 'label.get_labels' not in methods
+        assert 'label.add' not in methods
+        # A label removed in deluge is added again on the next run
+        daemon.labels.clear()
+        execute_task('add')
+        daemon.calls.clear()
+        execute_task('add')
+        assert ('label.add', 'tv') in daemon.calls
+
+    def test_pause(self, execute_task, daemon):
+        daemon.torrents.update({
+            'id1': {'save_path': '/downloads', 'files': [], 'progress': 100},
+            'id2': {'save_path': '/downloads', 'files': [], 'progress': 100},
+        })
+        execute_task('pause')
+        assert ('core.pause_torrent', ('id1', 'id2')) in daemon.calls
@@ -1,3 +1,5 @@
+import threading
+import time
 from datetime import datetime, timedelta
 
 from flexget import plugin
@@ -30,6 +32,59 @@ class SearchPlugin:
 plugin.register(SearchPlugin, 'test_search', interfaces=['search'], api_ver=2)
 
 
+class SlowSearchPlugin:
+    """Fake search plugin which takes a while to answer and records how many searches ran at once."""
+
+    schema = {}
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def search(self, task, entry, config=None):
+        cls = type(self)
+        with cls.lock:
+            cls.running += 1
+            cls.max_running = max(cls.max_running, cls.running)
+        # Later searches finish first, results must still come out in order
+        time.sleep(0.1 / (len(entry['title']) + ord(entry['title'][0]) % 4))
+        with cls.lock:
+            cls.running -= 1
+        return [Entry({**entry, 'title': entry['title'] + ' slow'})]
+
+
+plugin.register(SlowSearchPlugin, 'test_slow_search', interfaces=['search'], api_ver=2)
+
+
+class GatedSearchPlugin:
+    """Fake search plugin which holds each search until `test_gate_search` has searched for every entry."""
+
+    schema = {}
+    gate = threading.Event()
+    lock = threading.Lock()
+    searched = 0
+
+    def search(self, task, entry, config=None):
+        opened = self.gate.wait(5)
+        return [Entry({**entry, 'title': entry['title'] + (' gated' if opened else ' timeout')})]
+
+
+class GateSearchPlugin:
+    """Fake search plugin which opens the `test_gated_search` gate after `config` searches."""
+
+    schema = {}
+
+    def search(self, task, entry, config=None):
+        with GatedSearchPlugin.lock:
+            GatedSearchPlugin.searched += 1
+            if GatedSearchPlugin.searched == config:
+                GatedSearchPlugin.gate.set()
+        return [Entry({**entry, 'title': entry['title'] + ' gate'})]
+
+
+plugin.register(GatedSearchPlugin, 'test_gated_search', interfaces=['search'], api_ver=2)
+plugin.register(GateSearchPlugin, 'test_gate_search', interfaces=['search'], api_ver=2)
+
+
 class EstRelease:
     """Fake release estimate plugin. Just returns 'est_release' entry field."""
 
@@ -154,6 +209,79 @@ class TestDiscover:
         assert task.find_entry(title='My Show S01E04 a')
 
 
+class TestDiscoverConcurrency:
+    config = """
+        tasks:
+          test_concurrent:
+            discover:
+              release_estimations: ignore
+              what:
+              - mock:
+                - title: A
+                - title: B
+                - title: C
+                - title: D
+              from:
+              - test_slow_search: yes
+              - test_search: [' x']
+              max_workers: 4
+          test_gated:
+            discover:
+              release_estimations: ignore
+              what:
+              - mock:
+                - title: A
+                - title: B
+                - title: C
+              from:
+              - test_gated_search: yes
+              - test_gate_search: 3
+              max_workers: 2
+    """
+
+    expected = ['A slow', 'A x', 'B slow', 'B x', 'C slow', 'C x', 'D slow', 'D x']
+
+    def setup_method(self):
+        SlowSearchPlugin.max_running = 0
+        GatedSearchPlugin.gate.clear()
+        GatedSearchPlugin.searched = 0
+
+    def test_concurrent(self, execute_task):
+        task = execute_task('test_concurrent')
+        assert [e['title'] for e in task.entries] == self.expected
+        assert task.find_entry(title='B x')['discovered_with'] == 'test_search'
+        # Only one search at a time per plugin by default
+        assert SlowSearchPlugin.max_running == 1
+
+    def test_plugin_limit(self, execute_task, manager):
+        discover_config = manager.config['tasks']['test_concurrent']['discover']
+        discover_config['max_workers_per_plugin'] = {'test_slow_search': 3}
+        task = execute_task('test_concurrent')
+        assert [e['title'] for e in task.entries] == self.expected
+        assert SlowSearchPlugin.max_running == 3
+
+    def test_sequential(self, execute_task, manager):
+        discover_config = manager.config['tasks']['test_concurrent']['discover']
+        discover_config['max_workers'] = 1
+        discover_config['max_workers_per_plugin'] = 4
+        task = execute_task('test_concurrent')
+        assert [e['title'] for e in task.entries] == self.expected
+        assert SlowSearchPlugin.max_running == 1
+
+    def test_waiting_plugin_does_not_hold_workers(self, execute_task):
+        # The gated plugin is limited to one search at a time, its queued searches must leave the second worker free
+        # for the plugin which opens the gate
+        task = execute_task('test_gated')
+        assert [e['title'] for e in task.entries] == [
+            'A gated',
+            'A gate',
+            'B gated',
+            'B gate',
+            'C gated',
+            'C gate',
+        ]
+
+
 class TestEmitSeriesInDiscover:
     config = """
         tasks:
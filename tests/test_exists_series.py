@@ -1,5 +1,7 @@
 import pytest
 
+from flexget.plugins.filter import exists_series
+
 
 class TestExistsSeries:
     _config = """
@@ -74,6 +76,13 @@ class TestExistsSeries:
               - {title: 'Foo.Bar.S01E03.XViD'}
             accept_all: yes
             exists_series: __tmp__
+          test_listing_cache:
+            metainfo_series: yes
+            disable: seen
+            mock:
+              - {title: 'Foo.Bar.S01E03.XViD'}
+            accept_all: yes
+            exists_series: __tmp__
           test_jinja_path:
             series:
             - jinja
@@ -84,6 +93,27 @@ class TestExistsSeries:
             - title: jinja2 s01e01
             accept_all: yes
             exists_series: __tmp__
+          test_parenthetical:
+            mock:
+              - {title: 'Doctor.Who.2005.S01E01.720p.HDTV'}
+              - {title: 'Doctor.Who.2005.S01E02.720p.HDTV'}
+              - {title: 'The.Office.US.S02E03.HDTV'}
+            series:
+              - Doctor Who (2005)
+              - The Office (US)
+            exists_series: __tmp__
+
+          test_sequence:
+            mock:
+              - {title: 'Show Name - 05 [1080p]'}
+              - {title: 'Show Name - 06 [1080p]'}
+              - {title: '[Grp] Anime Name - 105 [1080p]'}
+              - {title: 'Seq.Show.101.1080p'}
+            series:
+              - Show Name
+              - Anime Name
+              - Seq Show
+            exists_series: __tmp__
     """
 
     test_dirs = [
@@ -95,6 +125,11 @@ class TestExistsSeries:
         'jinja.s01e02',
         'jinja2/jinja2.s01e01',
         'invalid',
+        'Doctor.Who.S01E01.720p.HDTV.mkv',
+        'The.Office.S02E03.HDTV.avi',
+        'Show Name - 05 [720p].mkv',
+        '[Grp] Anime Name - 105 [720p].mkv',
+        'Seq.Show.101.720p.mkv',
     ]
 
     @pytest.fixture(params=['internal', 'guessit'], ids=['internal', 'guessit'])
@@ -177,3 +212,45 @@ class TestExistsSeries:
         assert task.find_entry('accepted', title='jinja s01e02'), (
             'jinja s01e02 should have been accepted'
         )
+
+    def test_listing_cache(self, execute_task, tmp_path):
+        """Folder listings are reused until the folder changes."""
+        exists_series.listing_cache.reset_stats()
+        task = execute_task('test_listing_cache')
+        assert task.find_entry('accepted', title='Foo.Bar.S01E03.XViD')
+        task = execute_task('test_listing_cache')
+        assert task.find_entry('accepted', title='Foo.Bar.S01E03.XViD')
+        assert exists_series.listing_cache.stats['hits'] == 1
+        (tmp_path / 'Foo.Bar.S01E03.720p').mkdir()
+        task = execute_task('test_listing_cache')
+        assert task.find_entry('rejected', title='Foo.Bar.S01E03.XViD'), (
+            'Foo.Bar.S01E03.XViD should have been rejected (exists)'
+        )
+
+    def test_parenthetical(self, execute_task):
+        """Files without the optional parenthetical part of the series name still exist."""
+        task = execute_task('test_parenthetical')
+        assert task.find_entry('rejected', title='Doctor.Who.2005.S01E01.720p.HDTV'), (
+            'Doctor.Who.2005.S01E01.720p.HDTV should have been rejected (exists)'
+        )
+        assert task.find_entry('rejected', title='The.Office.US.S02E03.HDTV'), (
+            'The.Office.US.S02E03.HDTV should have been rejected (exists)'
+        )
+        assert task.find_entry('accepted', title='Doctor.Who.2005.S01E02.720p.HDTV'), (
+            'Doctor.Who.2005.S01E02.720p.HDTV should have been accepted'
+        )
+
+    def test_sequence(self, execute_task):
+        """Files which are only identified with the series name still exist."""
+        task = execute_task('test_sequence')
+        for title in (
+            'Show Name - 05 [1080p]',
+            '[Grp] Anime Name - 105 [1080p]',
+            'Seq.Show.101.1080p',
+        ):
+            assert task.find_entry('rejected', title=title), (
+                f'{title} should have been rejected (exists)'
+            )
+        assert task.find_entry('accepted', title='Show Name - 06 [1080p]'), (
+            'Show Name - 06 [1080p] should have been accepted'
+        )
@@ -1,3 +1,6 @@
+from bs4 import SoupStrainer
+
+from flexget.utils import soup
 from flexget.utils.soup import get_soup
 
 
@@ -22,3 +25,37 @@ class TestHtml5Lib:
         assert em.parent.name == 'p'
 
         assert soup.find('p', attrs={'class': 'foo'})
+
+
+class TestParserSelection:
+    config = """
+        html_parser:
+          default: html.parser
+          plugins:
+            some_plugin: html5lib
+        tasks: {}
+    """
+
+    def test_configured_parser(self, manager):
+        assert soup.resolve_parser() == 'html.parser'
+        assert soup.resolve_parser('xml') == 'xml'
+        # Parsers configured for a plugin take precedence over those it asks for
+        assert soup.resolve_parser('html.parser', plugin='some_plugin') == 'html5lib'
+        assert soup.resolve_parser(plugin='other_plugin') == 'html.parser'
+
+    def test_auto(self, monkeypatch):
+        monkeypatch.setattr(soup, 'default_parser', 'auto')
+        monkeypatch.setattr(soup, 'lxml_available', lambda: False)
+        assert soup.resolve_parser() == 'html5lib'
+        monkeypatch.setattr(soup, 'lxml_available', lambda: True)
+        assert soup.resolve_parser() == 'lxml'
+
+    def test_parse_only(self):
+        page = '<html><body><p>Intro</p><table id="results"><tr><td>Row</td></tr></table></body></html>'
+        result = get_soup(
+            page, parser='html.parser', parse_only=SoupStrainer('table', id='results')
+        )
+        assert result.find('p') is None
+        assert result.find('td').text == 'Row'
+        # html5lib cannot parse only part of the page
+        assert get_soup(page, parser='html5lib', parse_only='table').find('p')
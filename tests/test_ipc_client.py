@@ -0,0 +1,115 @@
+import os
+import time
+from argparse import Namespace
+
+import pytest
+
+from flexget import ipc_client
+from flexget.ipc import IPCServer
+from flexget.terminal import console
+
+
+class StubManager:
+    options = Namespace(loglevel='WARNING')
+
+    def __init__(self, lockfile):
+        self.lockfile = lockfile
+        self.commands = []
+
+    def write_lock(self, ipc_info):
+        with self.lockfile.open('w', encoding='utf-8') as f:
+            f.write(f'PID: {os.getpid()}\n')
+            f.writelines(f'{key}: {ipc_info[key]}\n' for key in sorted(ipc_info))
+
+    def handle_cli(self, options):
+        self.commands.append(options.cli_command)
+        console('command handled by daemon')
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    config = tmp_path / 'config.yml'
+    config.write_text('tasks: {}\n')
+    return config
+
+
+class TestManagerOptions:
+    @pytest.mark.parametrize(
+        ('args', 'expected'),
+        [
+            (['execute'], {'config': 'config.yml', 'loglevel': 'VERBOSE', 'test': False}),
+            (['-c', 'a.yml', '--test', 'execute'], {'config': 'a.yml', 'test': True}),
+            (['--cron', 'execute'], {'loglevel': 'INFO', 'cron': True}),
+            (['--cron', '-L', 'debug', 'execute'], {'loglevel': 'DEBUG'}),
+            (['--debug', 'daemon', 'status'], {'loglevel': 'DEBUG'}),
+            # Manager options are only taken from before core commands
+            (['execute', '--tasks', 'a', '-c', 'b.yml'], {'config': 'config.yml'}),
+            # but from anywhere for plugin commands
+            (['series', 'list', '-c', 'b.yml'], {'config': 'b.yml'}),
+        ],
+    )
+    def test_parse(self, args, expected):
+        options = ipc_client.parse_manager_options(args)
+        assert {key: getattr(options, key) for key in expected} == expected
+
+    @pytest.mark.parametrize('args', [['--profile', 'execute'], ['-L', 'loud', 'execute']])
+    def test_needs_manager(self, args):
+        assert ipc_client.parse_manager_options(args) is None
+
+
+class TestLockFile:
+    def test_find_config(self, config_file, monkeypatch):
+        assert ipc_client.find_config(str(config_file))[0] == config_file
+        monkeypatch.chdir(config_file.parent)
+        config, possible = ipc_client.find_config('config.yml')
+        assert config == config_file.parent / 'config.yml'
+        assert possible[0] == config_file.parent
+        assert ipc_client.find_config('missing.yml')[0] is None
+
+    def test_lockfile_path(self, config_file):
+        assert ipc_client.lockfile_path(config_file).name == '.config-lock'
+        assert ipc_client.lockfile_path(config_file, test=True).name == '.test-config-lock'
+
+    def test_read_lock(self, tmp_path):
+        lockfile = tmp_path / '.config-lock'
+        assert ipc_client.read_lock(lockfile) is None
+        lockfile.write_text(f'PID: {os.getpid()}\nport: 1234\npassword: secret\n')
+        assert ipc_client.read_lock(lockfile) == {
+            'pid': os.getpid(),
+            'port': 1234,
+            'password': 'secret',
+        }
+        # Stale lock from a process which no longer exists
+        lockfile.write_text('PID: 99999999\nport: 1234\n')
+        assert ipc_client.read_lock(lockfile) is None
+
+
+class TestForwardToDaemon:
+    def test_no_daemon(self, config_file):
+        assert not ipc_client.forward_to_daemon(['-c', str(config_file), 'execute'])
+
+    # rpyc does not close the socket when the connection is refused
+    @pytest.mark.filterwarnings('ignore::pytest.PytestUnraisableExceptionWarning')
+    def test_stale_port(self, config_file):
+        lockfile = ipc_client.lockfile_path(config_file)
+        # Nothing listens on the port, leave it to the manager to clean up
+        lockfile.write_text(f'PID: {os.getpid()}\nport: 1\npassword: secret\n')
+        assert not ipc_client.forward_to_daemon(['-c', str(config_file), 'execute'])
+
+    def test_forward(self, config_file, capsys):
+        lockfile = ipc_client.lockfile_path(config_file)
+        manager = StubManager(lockfile)
+        server = IPCServer(manager)
+        server.start()
+        try:
+            for _ in range(50):
+                if lockfile.exists():
+                    break
+                time.sleep(0.1)
+            assert ipc_client.forward_to_daemon(['-c', str(config_file), 'execute'])
+        finally:
+            server.shutdown()
+        assert manager.commands == ['execute']
+        out = capsys.readouterr().out
+        assert 'already running' in out
+        assert 'command handled by daemon' in out
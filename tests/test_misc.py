@@ -8,7 +8,9 @@ import pendulum
 import pytest
 
 from flexget.entry import Entry, EntryUnicodeError
-from flexget.utils.template import CoercingDateTime
+from flexget.utils import template
+from flexget.utils.template import CoercingDateTime, RenderError
+from flexget.utils.tools import LRUCache
 
 
 class TestDisableBuiltins:
@@ -363,3 +365,41 @@ class TestCoercingDateTime:
         diff = now - pendulum.Duration(hours=1)
         assert diff == now.subtract(hours=1)
         assert isinstance(diff, CoercingDateTime)
+
+
+class TestTemplateCache:
+    config = 'tasks: {}'
+
+    def test_render_reuses_compiled_template(self, manager):
+        template.template_cache.reset_stats()
+        assert template.render('{{ a + 1 }}', {'a': 1}) == '2'
+        assert template.render('{{ a + 1 }}', {'a': 2}) == '3'
+        assert template.template_cache.stats['misses'] == 1
+        assert template.template_cache.stats['hits'] == 1
+        # Native mode compiles to a different template class
+        assert template.render('{{ a + 1 }}', {'a': 1}, native=True) == 2
+        assert template.template_cache.stats['misses'] == 2
+
+    def test_render_syntax_error_not_cached(self, manager):
+        with pytest.raises(RenderError):
+            template.render('{{ a', {})
+        assert not len(template.template_cache)
+
+    def test_render_eviction(self, manager, monkeypatch):
+        monkeypatch.setattr(template, 'template_cache', LRUCache(max_size=2))
+        for value in range(3):
+            assert template.render(f'{{{{ a }}}}{value}', {'a': 'x'}) == f'x{value}'
+        assert template.template_cache.stats['evictions'] == 1
+        assert ('{{ a }}0', False) not in template.template_cache
+
+    def test_evaluate_expression_cached(self, manager):
+        template.expression_cache.reset_stats()
+        assert template.evaluate_expression('a > 1', {'a': 2}) is True
+        assert template.evaluate_expression('a > 1', Entry(a=0)) is False
+        assert template.expression_cache.stats == {
+            'size': 1,
+            'max_size': template.TEMPLATE_CACHE_SIZE,
+            'hits': 1,
+            'misses': 1,
+            'evictions': 0,
+        }
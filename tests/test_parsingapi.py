@@ -33,3 +33,42 @@ class TestTaskParsing:
         # make sure when a non-default parser is installed on a task, it doesn't affect other tasks
         execute_task('explicit_parser')
         assert not plugin_parsing.selected_parsers
+
+
+class TestParseCache:
+    config = """
+        tasks:
+          explicit_parser:
+            parsing:
+              series: guessit
+    """
+
+    def test_results_are_cached(self, manager):
+        parser = plugin.get('parsing', 'tests')
+        plugin_parsing.parse_cache.reset_stats()
+        first = parser.parse_series('Some.Show.S01E02.720p.HDTV-FlexGet', name='Some Show')
+        second = parser.parse_series('Some.Show.S01E02.720p.HDTV-FlexGet', name='Some Show')
+        assert plugin_parsing.parse_cache.hits == 1
+        assert plugin_parsing.parse_cache.misses == 1
+        assert first is not second
+        assert first.identifier == second.identifier == 'S01E02'
+        # Different kwargs must not share a result
+        parser.parse_series('Some.Show.S01E02.720p.HDTV-FlexGet', name='Other Show')
+        assert plugin_parsing.parse_cache.misses == 2
+
+    def test_cached_result_not_modified_by_callers(self, manager):
+        parser = plugin.get('parsing', 'tests')
+        parsed = parser.parse_movie('Some.Movie.2010.1080p.BluRay')
+        parsed.name = 'Changed'
+        parsed.quality.resolution = None
+        parsed = parser.parse_movie('Some.Movie.2010.1080p.BluRay')
+        assert parsed.name == 'Some Movie'
+        assert str(parsed.quality) == '1080p bluray'
+
+    def test_selection_change_keeps_cache(self, manager, execute_task):
+        parser = plugin.get('parsing', 'tests')
+        parser.parse_series('Some.Show.S01E02.720p.HDTV-FlexGet', name='Some Show')
+        assert len(plugin_parsing.parse_cache)
+        # Results are keyed on the parser name, so another parser selection does not need a fresh cache
+        execute_task('explicit_parser')
+        assert len(plugin_parsing.parse_cache)
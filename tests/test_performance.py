@@ -0,0 +1,133 @@
+import copy
+import json
+import time
+
+from requests.adapters import BaseAdapter
+from requests.models import Response
+from requests.sessions import Session as RequestsSession
+
+from flexget import plugin
+from flexget.components.performance.db import PerfProfile
+from flexget.entry import Entry
+from flexget.event import fire_event
+from flexget.manager import Session
+
+
+class SlowInput:
+    """Fake input plugin which takes long enough for its stack to be sampled."""
+
+    def on_task_input(self, task, config):
+        time.sleep(0.1)
+        return [Entry(title='a', url='http://localhost/a')]
+
+
+plugin.register(SlowInput, 'test_slow_input', api_ver=2)
+
+
+# Blocked for all tests, the stub adapter does not connect anywhere though
+requests_session_request = RequestsSession.request
+
+
+class StubAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = Response()
+        response.status_code = 200
+        response._content = b'x' * 1000
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+
+class HTTPInput:
+    """Fake input plugin which makes HTTP requests."""
+
+    def on_task_input(self, task, config):
+        task.requests.mount('http://perf.test/', StubAdapter())
+        task.requests.get('http://perf.test/a')
+        task.requests.get('http://perf.test/b')
+        return []
+
+
+plugin.register(HTTPInput, 'test_http_input', api_ver=2)
+
+
+class TestDebugPerf:
+    config = """
+        tasks:
+          profiled:
+            debug_perf: yes
+            mock:
+              - {title: 'a', url: 'http://localhost/a'}
+            accept_all: yes
+            seen: local
+          abort:
+            debug_perf: yes
+            mock:
+              - {title: 'a', url: 'http://localhost/a'}
+            abort: yes
+          plain:
+            test_slow_input: yes
+          http:
+            debug_perf: yes
+            test_http_input: yes
+    """
+
+    def profiles(self):
+        with Session() as session:
+            return [profile.to_dict() for profile in session.query(PerfProfile).all()]
+
+    def test_task_option(self, execute_task):
+        execute_task('plain')
+        assert self.profiles() == []
+        execute_task('profiled')
+        (profile,) = self.profiles()
+        assert profile['task'] == 'profiled'
+        plugins = {(p['phase'], p['plugin']): p for p in profile['plugins']}
+        assert ('input', 'mock') in plugins
+        assert plugins['filter', 'seen']['queries'] > 0
+        assert profile['phases']['input']['took'] >= plugins['input', 'mock']['took']
+
+    def test_requests(self, execute_task, monkeypatch):
+        monkeypatch.setattr(RequestsSession, 'request', requests_session_request)
+        execute_task('http')
+        (profile,) = self.profiles()
+        (stats,) = [p for p in profile['plugins'] if p['plugin'] == 'test_http_input']
+        assert stats['requests'] == 2
+        assert stats['request_bytes'] == 2000
+
+    def test_aborted_task(self, execute_task):
+        execute_task('abort', abort=True)
+        (profile,) = self.profiles()
+        assert profile['task'] == 'abort'
+
+    def test_export(self, manager, execute_task, tmp_path):
+        options = copy.copy(manager.options.execute)
+        options.debug_perf = True
+        options.debug_perf_json = str(tmp_path / 'perf.json')
+        options.debug_perf_flamegraph = str(tmp_path / 'perf.folded')
+        fire_event('manager.execute.started', manager, options)
+        execute_task('plain', options=options)
+        fire_event('manager.execute.completed', manager, options)
+        (profile,) = json.loads((tmp_path / 'perf.json').read_text())
+        assert profile['task'] == 'plain'
+        stacks = dict(
+            line.rsplit(' ', 1) for line in (tmp_path / 'perf.folded').read_text().splitlines()
+        )
+        assert stacks
+        assert all(stack.startswith('plain;') for stack in stacks)
+        assert any(
+            stack.startswith('plain;input;test_slow_input;on_task_input (test_performance.py:')
+            for stack in stacks
+        )
+
+    def test_cache_stats(self, manager, execute_task, caplog):
+        options = copy.copy(manager.options.execute)
+        options.debug_perf = True
+        fire_event('manager.execute.started', manager, options)
+        execute_task('profiled', options=options)
+        fire_event('manager.execute.completed', manager, options)
+        assert 'Parse cache: ' in caplog.text
+        assert 'Template cache: ' in caplog.text
@@ -1,9 +1,11 @@
+import json
 import os
+import sys
 from pathlib import Path
 
 import pytest
 
-from flexget import plugin, plugins
+from flexget import config_schema, plugin, plugins
 from flexget.event import event, fire_event
 
 
@@ -81,3 +83,129 @@ class TestExternalPluginLoading:
         # TODO: This isn't working because calling load_plugins again doesn't cause the schema for tasks to regenerate
         task = execute_task('ext_plugin')
         assert task.find_entry(title='test entry'), 'External plugin did not create entry'
+
+
+LAZY_MODULE = """
+from flexget import plugin
+from flexget.event import event
+
+
+class LazyTestPlugin:
+    schema = {'type': 'boolean'}
+
+    def on_task_filter(self, task, config):
+        pass
+
+
+@event('plugin.register')
+def register_plugin():
+    plugin.register(LazyTestPlugin, 'lazy_test_plugin', interfaces=['task', 'lazy_test'], api_ver=2)
+"""
+
+EAGER_MODULE = """
+from flexget import plugin
+from flexget.event import event
+
+
+class EagerTestPlugin:
+    pass
+
+
+@event('plugin.register')
+def register_plugin():
+    plugin.register(EagerTestPlugin, 'eager_test_plugin', builtin=True, api_ver=2)
+"""
+
+
+class TestPluginManifest:
+    config = 'tasks: {}'
+
+    @pytest.fixture
+    def plugin_dir(self, tmp_path, monkeypatch):
+        plugin_dir = tmp_path / 'plugins'
+        plugin_dir.mkdir()
+        (plugin_dir / 'lazy_test_module.py').write_text(LAZY_MODULE)
+        (plugin_dir / 'eager_test_module.py').write_text(EAGER_MODULE)
+        # Only load our test plugins, into a registry we can throw away
+        monkeypatch.setattr(plugin, '_get_standard_plugins_path', list)
+        monkeypatch.setattr(plugin, '_get_standard_components_path', list)
+        monkeypatch.setattr(plugin, 'plugins', dict(plugin.plugins))
+        monkeypatch.setattr(plugin, '_lazy_plugins', {})
+        monkeypatch.setattr(plugins, '__path__', plugins.__path__)
+        monkeypatch.setattr(config_schema, 'schema_paths', dict(config_schema.schema_paths))
+        yield plugin_dir
+        self.unload()
+
+    def unload(self):
+        for name in ('lazy_test_module', 'eager_test_module'):
+            sys.modules.pop(f'flexget.plugins.{name}', None)
+        for name in ('lazy_test_plugin', 'eager_test_plugin'):
+            plugin.plugins.pop(name, None)
+
+    def load(self, plugin_dir, lazy):
+        plugin.load_plugins(
+            extra_plugins=[plugin_dir],
+            extra_components=[],
+            manifest=plugin_dir.parent / 'manifest.json',
+            lazy=lazy,
+        )
+
+    def test_manifest(self, plugin_dir):
+        self.load(plugin_dir, lazy=True)
+        manifest = json.loads((plugin_dir.parent / 'manifest.json').read_text())
+        assert manifest['eager'] == ['flexget.plugins.eager_test_module']
+        assert manifest['plugins']['lazy_test_plugin']['module'] == (
+            'flexget.plugins.lazy_test_module'
+        )
+        assert manifest['plugins']['lazy_test_plugin']['phases'] == ['filter']
+        assert 'lazy_test_plugin' in plugin.plugins
+
+    def test_lazy_load(self, plugin_dir):
+        self.load(plugin_dir, lazy=False)
+        self.unload()
+        self.load(plugin_dir, lazy=True)
+        assert 'flexget.plugins.lazy_test_module' not in sys.modules
+        assert 'eager_test_plugin' in plugin.plugins
+        assert 'lazy_test_plugin' not in plugin.plugins
+        # Building the schema does not import it
+        schema = plugin.plugin_schemas(interface='lazy_test')
+        assert schema['properties'] == {
+            'lazy_test_plugin': {'$ref': '/schema/plugin/lazy_test_plugin'}
+        }
+        filters = plugin.get_plugins(phase='filter', loaded_only=True)
+        assert 'lazy_test_plugin' not in {p.name for p in filters}
+        assert 'lazy_test_plugin' not in plugin.plugins
+        # Using it does
+        assert plugin.get_plugin_by_name('lazy_test_plugin').name == 'lazy_test_plugin'
+        assert 'flexget.plugins.lazy_test_module' in sys.modules
+
+    def test_lazy_load_plugin_priority(self, plugin_dir):
+        self.load(plugin_dir, lazy=False)
+        self.unload()
+        self.load(plugin_dir, lazy=True)
+        assert 'lazy_test_plugin' not in plugin.plugins
+        priority = plugin.get_plugin_by_name('plugin_priority').instance
+        priority.on_task_start(None, {'lazy_test_plugin': 50})
+        handler = plugin.plugins['lazy_test_plugin'].phase_handlers['filter']
+        assert handler.priority == 50
+        priority.on_task_exit(None, {'lazy_test_plugin': 50})
+        assert handler.priority == plugin.PRIORITY_DEFAULT
+
+    def test_lazy_load_from_schema(self, plugin_dir):
+        self.load(plugin_dir, lazy=False)
+        self.unload()
+        self.load(plugin_dir, lazy=True)
+        schema = plugin.plugin_schemas(interface='lazy_test')
+        assert config_schema.process_config({'lazy_test_plugin': 'yes'}, schema)
+        assert not config_schema.process_config({'lazy_test_plugin': True}, schema)
+        assert 'lazy_test_plugin' in plugin.plugins
+
+    def test_outdated_manifest(self, plugin_dir):
+        self.load(plugin_dir, lazy=False)
+        self.unload()
+        module_path = plugin_dir / 'lazy_test_module.py'
+        module_path.write_text(LAZY_MODULE.replace("'boolean'", "'string'"))
+        os.utime(module_path, ns=(0, 0))
+        self.load(plugin_dir, lazy=True)
+        assert 'lazy_test_plugin' in plugin.plugins
+        assert plugin.plugins['lazy_test_plugin'].schema == {'type': 'string'}
@@ -1,4 +1,204 @@
+import json
+from urllib.parse import urlsplit
+
 import pytest
+from requests import Response
+from requests import Session as RequestsSession
+from requests.adapters import BaseAdapter
+
+from flexget.plugins.clients import qbittorrent
+
+# Blocked for all tests, the fake Web UI does not connect anywhere though
+requests_session_request = RequestsSession.request
+
+
+class FakeWebUI(BaseAdapter):
+    """Answers the qBittorrent Web API v2 requests used by the plugins."""
+
+    def __init__(self, torrents):
+        super().__init__()
+        self.torrents = torrents
+        self.requests = []
+        self.added = []
+        # Urls which qBittorrent fails to add
+        self.broken = set()
+        # Number of `torrents/info` requests added torrents stay unlisted for, like qBittorrent answering the add
+        # request before the torrents are added
+        self.listing_delay = 0
+        self.pending = []
+
+    def send(self, request, **kwargs):
+        path = urlsplit(request.url).path
+        self.requests.append(path)
+        body = 'Ok.'
+        if path == '/api/v2/app/webapiVersion':
+            body = '2.11.2'
+        elif path == '/api/v2/torrents/info':
+            self.pending = [(delay - 1, t) for delay, t in self.pending]
+            self.torrents.extend(t for delay, t in self.pending if delay < 0)
+            self.pending = [(delay, t) for delay, t in self.pending if delay >= 0]
+            body = json.dumps(self.torrents)
+        elif path == '/api/v2/torrents/files':
+            body = json.dumps([{'name': 'file.mkv'}])
+        elif path == '/api/v2/torrents/add':
+            urls = request.body.split(b'name="urls"\r\n\r\n')[1].split(b'\r\n--')[0]
+            urls = urls.decode().split('\n')
+            self.added.append(urls)
+            added = [url for url in urls if url not in self.broken]
+            for url in added:
+                self.pending.append((
+                    self.listing_delay,
+                    torrent(url.split('btih:')[1].lower(), url),
+                ))
+            # Like qBittorrent, a request succeeds if any of its torrents was added
+            body = 'Ok.' if added else 'Fails.'
+        response = Response()
+        response.status_code = 200
+        response._content = body.encode()
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def torrent(info_hash, name):
+    return {
+        'hash': info_hash,
+        'infohash_v1': info_hash,
+        'infohash_v2': '',
+        'name': name,
+        'magnet_uri': f'magnet:?xt=urn:btih:{info_hash}&dn={name}',
+        'size': 1000,
+        'num_seeds': 1,
+        'num_leechs': 2,
+        'ratio': 0.5,
+        'category': 'tv',
+        'state': 'stalledUP',
+        'eta': 0,
+        'added_on': 1700000000,
+        'completion_on': 1700000100,
+        'content_path': f'/downloads/{name}',
+        'download_path': '',
+        'save_path': '/downloads',
+        'dlspeed': 0,
+        'upspeed': 10,
+    }
+
+
+@pytest.fixture
+def web_ui(monkeypatch, no_requests):
+    web_ui = FakeWebUI([torrent('a' * 40, 'existing')])
+
+    def session():
+        session = RequestsSession()
+        session.mount('http://', web_ui)
+        return session
+
+    monkeypatch.setattr(RequestsSession, 'request', requests_session_request)
+    monkeypatch.setattr(qbittorrent, 'Session', session)
+    monkeypatch.setattr(qbittorrent, 'sleep', lambda seconds: None)
+    return web_ui
+
+
+class TestQbittorrentSnapshot:
+    config = """
+        tasks:
+          add:
+            mock:
+              - {title: existing, url: 'magnet:?xt=urn:btih:AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA'}
+              - {title: new 1, url: 'magnet:?xt=urn:btih:BBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB'}
+              - {title: new 2, url: 'magnet:?xt=urn:btih:CCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCC'}
+              - {title: new 3, url: 'magnet:?xt=urn:btih:DDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDD'}
+            accept_all: yes
+            disable: [seen, retry_failed]
+            set:
+              path: "{{ 'movies' if title == 'new 3' else 'tv' }}"
+            qbittorrent:
+              host: fake
+              username: user
+              password: pass
+          input:
+            from_qbittorrent:
+              host: fake
+              port: 8080
+              username: user
+              password: pass
+              completed: yes
+            accept_all: yes
+            qbittorrent:
+              host: fake
+              username: user
+              password: pass
+    """
+
+    def test_add(self, execute_task, web_ui):
+        task = execute_task('add')
+        assert len(task.accepted) == 4
+        assert not task.failed
+        # One snapshot, then torrents with the same options are added together
+        # The list of torrents is fetched again to confirm the batch was added
+        assert web_ui.requests.count('/api/v2/torrents/info') == 2
+        assert sorted(web_ui.added) == [
+            [
+                'magnet:?xt=urn:btih:BBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB',
+                'magnet:?xt=urn:btih:CCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCC',
+            ],
+            ['magnet:?xt=urn:btih:DDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDD'],
+        ]
+
+    def test_add_partial_failure(self, execute_task, web_ui):
+        web_ui.broken.add('magnet:?xt=urn:btih:CCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCC')
+        task = execute_task('add')
+        assert task.find_entry('accepted', title='new 1')
+        assert task.find_entry('failed', title='new 2')
+        assert task.find_entry('accepted', title='new 3')
+        # The batch was not retried, as it was partially added
+        assert len(web_ui.added) == 2
+
+    def test_add_failure(self, execute_task, web_ui):
+        web_ui.broken.update([
+            'magnet:?xt=urn:btih:BBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB',
+            'magnet:?xt=urn:btih:CCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCC',
+        ])
+        task = execute_task('add')
+        assert task.find_entry('failed', title='new 1')
+        assert task.find_entry('failed', title='new 2')
+        assert task.find_entry('accepted', title='new 3')
+        # The failed batch was retried one by one
+        assert sorted(web_ui.added) == [
+            ['magnet:?xt=urn:btih:BBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB'],
+            [
+                'magnet:?xt=urn:btih:BBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB',
+                'magnet:?xt=urn:btih:CCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCC',
+            ],
+            ['magnet:?xt=urn:btih:CCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCCC'],
+            ['magnet:?xt=urn:btih:DDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDDD'],
+        ]
+
+    def test_add_listed_late(self, execute_task, web_ui):
+        web_ui.listing_delay = 2
+        task = execute_task('add')
+        assert len(task.accepted) == 4
+        assert not task.failed
+        # The list of torrents was fetched until the batch showed up
+        assert web_ui.requests.count('/api/v2/torrents/info') == 4
+
+    def test_clients_released(self, execute_task, web_ui):
+        execute_task('input')
+        assert not qbittorrent._clients
+
+    def test_input_snapshot_reused(self, execute_task, web_ui):
+        task = execute_task('input')
+        entry = task.find_entry(title='existing')
+        assert entry['torrent_info_hash'] == 'A' * 40
+        assert entry['content_files'] == ['file.mkv']
+        assert entry['qbittorrent_is_complete']
+        assert not entry['qbittorrent_is_downloading']
+        # The input and output share the connection and the list of torrents
+        assert web_ui.requests.count('/api/v2/auth/login') == 1
+        assert web_ui.requests.count('/api/v2/torrents/info') == 1
+        assert web_ui.added == []
 
 
 @pytest.mark.online
@@ -1,9 +1,14 @@
+import random
+import re
+
 import pytest
 from jinja2 import Template
 
 from flexget.components.parsing.parsers.parser_guessit import ParserGuessit
 from flexget.components.parsing.parsers.parser_internal import ParserInternal
+from flexget.utils import qualities
 from flexget.utils.qualities import Quality
+from flexget.utils.tools import LRUCache
 
 
 class TestQualityModule:
@@ -137,6 +142,48 @@ class TestQualityInternalParser:
         )
 
 
+class TestQualityDetector:
+    @pytest.fixture
+    def reference_parse(self, monkeypatch):
+        """Parse with the plain sequential component scan, without prefilter or cache."""
+        always = re.compile('')
+        monkeypatch.setattr(qualities, '_detectors', dict.fromkeys(qualities._detectors, always))
+        monkeypatch.setattr(qualities, '_parse_cache', LRUCache(max_size=0))
+
+        def parse(text):
+            quality = Quality(text)
+            return quality.components, quality.clean_text
+
+        return parse
+
+    @staticmethod
+    def titles():
+        names = [c.name for c in qualities.all_components()]
+        rand = random.Random(42)
+        for name in names:
+            yield f'Some.Title.{name}'
+            yield f'Some Title {name.upper()} extra'
+        for _ in range(2000):
+            parts = rand.sample(names, rand.randint(1, 5))
+            yield 'Some.Title.S01E02.' + rand.choice('.-_ ').join(parts) + '-GRP'
+
+    def test_identical_to_sequential_scan(self, reference_parse):
+        titles = list(self.titles())
+        expected = [reference_parse(title) for title in titles]
+        qualities._parse_cache.clear()
+        for title, (components, clean_text) in zip(titles, expected, strict=True):
+            quality = Quality(title)
+            assert quality.components == components, title
+            assert quality.clean_text == clean_text, title
+
+    def test_cached_parse_is_independent(self):
+        first = Quality('Some.Title.720p.HDTV')
+        first.resolution = qualities.get('1080p').resolution
+        second = Quality('Some.Title.720p.HDTV')
+        assert str(second) == '720p hdtv'
+        assert second.clean_text == first.clean_text
+
+
 class TestFilterQuality:
     _config = """
         templates:
@@ -0,0 +1,147 @@
+import json
+import threading
+
+import pytest
+
+from flexget.utils import requests
+from flexget.utils.requests import LimiterState, TimedLimiter, TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def state(clock):
+    state = LimiterState(clock=clock, sleep=clock.sleep)
+    requests.set_limiter_state(state)
+    return state
+
+
+class TestTokenBucketLimiter:
+    def test_bucket(self, state, clock):
+        limiter = TokenBucketLimiter('example.com', 2, '10 seconds')
+        limiter()
+        limiter()
+        assert clock.sleeps == []
+        limiter()
+        assert clock.sleeps == [10]
+        # Tokens regenerate over time, up to the size of the bucket
+        clock.now += 60
+        limiter()
+        limiter()
+        assert clock.sleeps == [10]
+
+    def test_no_wait(self, state, clock):
+        limiter = TokenBucketLimiter('example.com', 1, '10 seconds', wait=False)
+        limiter()
+        with pytest.raises(requests.RequestException):
+            limiter()
+        clock.now += 10
+        limiter()
+        assert clock.sleeps == []
+
+    def test_shared_between_instances(self, state, clock):
+        TimedLimiter('example.com', '5 seconds')()
+        TimedLimiter('example.com', '5 seconds')()
+        TimedLimiter('example.org', '5 seconds')()
+        assert clock.sleeps == [5]
+
+    def test_threads(self, clock):
+        sleeps = []
+        # The clock does not move, every thread must reserve a later token than the previous one
+        requests.set_limiter_state(LimiterState(clock=clock, sleep=sleeps.append))
+        limiter = TimedLimiter('example.com', '10 seconds')
+        threads = [threading.Thread(target=limiter) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(sleeps) == [10 * i for i in range(1, 10)]
+
+
+class TestPersistentState:
+    config = 'tasks: {}'
+
+    def test_shared_between_processes(self, tmp_path, clock):
+        path = tmp_path / 'limits.json'
+        # Separate states with the same file stand in for separate processes
+        requests.set_limiter_state(LimiterState(path, clock=clock, sleep=clock.sleep))
+        TimedLimiter('example.com', '10 seconds')()
+        requests.set_limiter_state(LimiterState(path, clock=clock, sleep=clock.sleep))
+        TimedLimiter('example.com', '10 seconds')()
+        assert clock.sleeps == [10]
+
+    def test_unresponsive(self, tmp_path, clock):
+        path = tmp_path / 'limits.json'
+        LimiterState(path, clock=clock).set_unresponsive('example.com')
+        state = LimiterState(path, clock=clock)
+        assert state.is_unresponsive('example.com')
+        assert not state.is_unresponsive('example.org')
+        clock.now += requests.WAIT_TIME.total_seconds()
+        assert not state.is_unresponsive('example.com')
+
+    def test_prune(self, tmp_path, clock):
+        path = tmp_path / 'limits.json'
+        state = LimiterState(path, clock=clock, sleep=clock.sleep)
+        state.take_token('example.com', 2, 10)
+        state.set_unresponsive('example.org')
+        assert set(json.loads(path.read_text())['buckets']) == {'example.com'}
+        # Full buckets and expired hosts are dropped
+        clock.now += 60
+        state.take_token('example.net', 2, 10)
+        assert json.loads(path.read_text()) == {
+            'buckets': {
+                'example.net': {'tokens': 1.0, 'last_update': clock.now, 'full_at': clock.now + 10}
+            },
+            'unresponsive': {},
+        }
+
+    def test_corrupt_file(self, tmp_path, clock):
+        path = tmp_path / 'limits.json'
+        path.write_text('{"buckets": ')
+        state = LimiterState(path, clock=clock, sleep=clock.sleep)
+        assert state.take_token('example.com', 1, 10) == 0
+        assert state.take_token('example.com', 1, 10) == 10
+
+    def test_unwritable_file(self, tmp_path, clock):
+        # A directory can not be opened as a file, like a file in a read-only directory
+        state = LimiterState(tmp_path, clock=clock, sleep=clock.sleep)
+        assert state.take_token('example.com', 1, 10) == 0
+        assert state.path is None
+        assert state.take_token('example.com', 1, 10) == 10
+        state.set_unresponsive('example.com')
+        assert state.is_unresponsive('example.com')
+
+    def test_reads_cached(self, tmp_path, clock, monkeypatch):
+        path = tmp_path / 'limits.json'
+        state = LimiterState(path, clock=clock)
+        state.set_unresponsive('example.com')
+        opened = []
+        monkeypatch.setattr(
+            requests, 'open', lambda *args, **kwargs: opened.append(args), raising=False
+        )
+        assert state.is_unresponsive('example.com')
+        assert not state.is_unresponsive('example.org')
+        assert opened == []
+        # Changes by other processes are read
+        monkeypatch.delattr(requests, 'open')
+        LimiterState(path, clock=clock).set_unresponsive('example.org')
+        assert state.is_unresponsive('example.org')
+
+    def test_manager_state(self, manager):
+        assert requests.limiter_state.path == manager.config_base / '.request-limits.json'
@@ -1,9 +1,16 @@
 import re
+import socketserver
+import threading
 from pathlib import Path
 from unittest import mock
 from xmlrpc import client as xmlrpc_client
+from xmlrpc.server import SimpleXMLRPCDispatcher
 
+import pytest
+
+from flexget.plugins.clients import rtorrent
 from flexget.plugins.clients.rtorrent import RTorrent
+from flexget.utils.bittorrent import Torrent, bencode
 
 torrent_file = Path(__file__).resolve().parent / 'private.torrent'
 torrent_url = f'file:///{torrent_file}'
@@ -476,3 +483,130 @@ class TestRTorrentInputPlugin:
             assert entry['path'] == '/data/downloads/private'
             assert entry['custom1'] == 'test_custom1'
             assert entry['custom3'] == 'test_custom3'
+
+
+class FakeSCGI(socketserver.StreamRequestHandler):
+    """Answers an XML-RPC request sent over SCGI, like rtorrent does."""
+
+    def handle(self):
+        # The headers are a netstring, `<length>:<headers>,`
+        length = b''
+        while (char := self.rfile.read(1)) != b':':
+            length += char
+        headers = self.rfile.read(int(length) + 1)[:-1].split(b'\x00')
+        body = self.rfile.read(int(headers[headers.index(b'CONTENT_LENGTH') + 1]))
+        self.server.requests += 1
+        response = self.server._marshaled_dispatch(body)
+        self.wfile.write(b'Status: 200 OK\r\nContent-Type: text/xml\r\n\r\n' + response)
+
+
+class FakeRTorrent(socketserver.ThreadingTCPServer, SimpleXMLRPCDispatcher):
+    """Keeps the loaded torrents by info hash and counts the requests it got."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        socketserver.ThreadingTCPServer.__init__(self, ('127.0.0.1', 0), FakeSCGI)
+        SimpleXMLRPCDispatcher.__init__(self, allow_none=True)
+        self.register_multicall_functions()
+        self.requests = 0
+        self.torrents = {}
+        self.directories = []
+        self.size_limits = [524288]
+        self.register_function(self.multicall2, 'd.multicall2')
+        self.register_function(self.load, 'load.raw_start')
+        self.register_function(self.mkdir, 'execute.throw')
+        self.register_function(lambda: self.size_limits[-1], 'network.xmlrpc.size_limit')
+        self.register_function(
+            lambda _, size: self.size_limits.append(size), 'network.xmlrpc.size_limit.set'
+        )
+
+    def multicall2(self, target, view, *commands):
+        return [[info_hash] for info_hash in self.torrents]
+
+    def load(self, target, raw_torrent, *commands):
+        self.torrents[Torrent(raw_torrent.data).info_hash] = commands
+        return 0
+
+    def mkdir(self, target, *command):
+        self.directories.append(command[-1])
+        return 0
+
+
+@pytest.fixture
+def fake_rtorrent():
+    server = FakeRTorrent()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestRTorrentBatch:
+    config = """
+        tasks:
+          test:
+            accept_all: yes
+            disable: [seen, seen_info_hash, retry_failed]
+            mock:
+              - {title: 'torrent 1', url: 'file:///__tmp__/1.torrent'}
+              - {title: 'torrent 2', url: 'file:///__tmp__/2.torrent'}
+              - {title: 'torrent 3', url: 'file:///__tmp__/3.torrent'}
+            rtorrent:
+              uri: scgi://127.0.0.1:5000
+              batch: yes
+              path: /downloads/{{title}}
+              custom1: tv
+    """
+
+    @pytest.fixture(autouse=True)
+    def torrents(self, tmp_path, manager, fake_rtorrent):
+        manager.config['tasks']['test']['rtorrent']['uri'] = (
+            f'scgi://127.0.0.1:{fake_rtorrent.server_address[1]}'
+        )
+        info_hashes = []
+        for i in (1, 2, 3):
+            content = {
+                'info': {'name': f'torrent {i}', 'piece length': 1, 'pieces': b'', 'length': i}
+            }
+            (tmp_path / f'{i}.torrent').write_bytes(bencode(content))
+            info_hashes.append(Torrent(bencode(content)).info_hash)
+        return info_hashes
+
+    def test_batch(self, execute_task, fake_rtorrent, torrents):
+        task = execute_task('test')
+        assert len(task.accepted) == 3
+        assert not task.failed
+        assert list(fake_rtorrent.torrents) == torrents
+        assert 'd.custom1.set=tv' in fake_rtorrent.torrents[torrents[0]]
+        assert fake_rtorrent.directories == [f'/downloads/torrent {i}' for i in (1, 2, 3)]
+        # Existing torrents, directories, loading, verifying, however many torrents there are
+        assert fake_rtorrent.requests == 4
+        assert fake_rtorrent.size_limits == [524288]
+
+        # Torrents that are loaded already are left alone
+        fake_rtorrent.requests = 0
+        execute_task('test')
+        assert fake_rtorrent.requests == 1
+
+    def test_size_limit(self, execute_task, fake_rtorrent, torrents, monkeypatch):
+        monkeypatch.setattr(rtorrent, 'XMLRPC_SIZE_LIMIT', 1000)
+        execute_task('test')
+        assert len(fake_rtorrent.torrents) == 3
+        # Raised once for all the torrents, then restored
+        assert len(fake_rtorrent.size_limits) == 3
+        assert fake_rtorrent.size_limits[-1] == 524288
+
+    def test_request_failure(self, execute_task, fake_rtorrent):
+        system_multicall = fake_rtorrent.funcs['system.multicall']
+
+        def multicall(calls):
+            if any(call['methodName'].startswith('load.') for call in calls):
+                raise xmlrpc_client.Fault(-501, 'request too big')
+            return system_multicall(calls)
+
+        fake_rtorrent.funcs['system.multicall'] = multicall
+        task = execute_task('test')
+        assert len(task.failed) == 3
+        assert all('request too big' in entry['reason'] for entry in task.failed)
+        assert not fake_rtorrent.torrents
@@ -1,3 +1,8 @@
+import sqlalchemy
+
+from flexget.event import add_event_handler, remove_event_handler
+
+
 class TestFilterSeen:
     config = """
         templates:
@@ -64,6 +69,51 @@ class TestFilterSeen:
         assert len(task.rejected) == 1, 'Seen plugin should have rejected on second run'
 
 
+class TestSeenQueryCount:
+    config = """
+        tasks:
+          small:
+            generate: 10
+            accept_all: yes
+          large:
+            generate: 400
+            accept_all: yes
+    """
+
+    @staticmethod
+    def count_seen_queries(manager, execute_task, task_name):
+        """Execute the task twice and count queries run by the seen filter on the second run."""
+        counter = {'active': False, 'queries': 0}
+
+        def before_plugin(task, keyword):
+            counter['active'] = keyword == 'seen' and task.current_phase == 'filter'
+
+        def after_plugin(task, keyword):
+            counter['active'] = False
+
+        def count_query(*args, **kwargs):
+            if counter['active']:
+                counter['queries'] += 1
+
+        execute_task(task_name)
+        add_event_handler('task.execute.before_plugin', before_plugin)
+        add_event_handler('task.execute.after_plugin', after_plugin)
+        sqlalchemy.event.listen(manager.engine, 'before_cursor_execute', count_query)
+        try:
+            execute_task(task_name)
+        finally:
+            sqlalchemy.event.remove(manager.engine, 'before_cursor_execute', count_query)
+            remove_event_handler('task.execute.before_plugin', before_plugin)
+            remove_event_handler('task.execute.after_plugin', after_plugin)
+        return counter['queries']
+
+    def test_query_count_constant(self, manager, execute_task):
+        small = self.count_seen_queries(manager, execute_task, 'small')
+        large = self.count_seen_queries(manager, execute_task, 'large')
+        assert small > 0
+        assert small == large, 'seen filter query count should not grow with entry count'
+
+
 class TestSeenLocal:
     config = """
       templates:
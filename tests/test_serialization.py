@@ -55,3 +55,76 @@ class TestSerialization:
             serialization.serialize(value)
         with pytest.raises(TypeError):
             serialization.dumps(value)
+
+    def test_entry_compact_format(self):
+        entry1 = entry.Entry({
+            'title': 'blah',
+            'datetimefield': datetime.datetime(1999, 9, 9, 9, 9),
+            'qualityfield': qualities.Quality('720p hdtv'),
+            'tuplefield': (1, datetime.date(1999, 9, 9)),
+            'tagdict': {'$dt': 'not a date'},
+        })
+        serialized = serialization.serialize(entry1)
+        assert serialized['version'] == 2
+        fields = serialized['value']['fields']
+        assert fields['datetimefield'] == {'$dt': '1999-09-09T09:09:00Z'}
+        assert fields['qualityfield'] == {'$s': ['Quality', 1, '720p hdtv']}
+        assert fields['tuplefield'] == {'$tuple': [1, {'$d': '1999-09-09'}]}
+        entry2 = serialization.loads(serialization.dumps(entry1))
+        assert dict(entry1) == dict(entry2)
+
+    def test_entry_legacy_format(self):
+        # Entries stored before the compact format was introduced
+        serialized = {
+            'serializer': 'Entry',
+            'version': 1,
+            'value': {
+                'fields': {
+                    'title': 'blah',
+                    'datefield': {
+                        'serializer': 'DateSerializer',
+                        'version': 1,
+                        'value': '1999-09-09',
+                    },
+                    'qualityfield': {'serializer': 'Quality', 'version': 1, 'value': '720p hdtv'},
+                    'setfield': {'serializer': 'SetSerializer', 'version': 1, 'value': ['a']},
+                },
+                'lazy_lookups': [
+                    {
+                        'serializer': 'TupleSerializer',
+                        'version': 1,
+                        'value': ['lazy function', ['lazyfield'], None, None],
+                    }
+                ],
+            },
+        }
+        entry1 = serialization.deserialize(serialized)
+        assert entry1['datefield'] == datetime.date(1999, 9, 9)
+        assert entry1['qualityfield'] == qualities.Quality('720p hdtv')
+        assert entry1['setfield'] == {'a'}
+        assert entry1['lazyfield'] == 'value a'
+
+    def test_serializer_defined_later(self):
+        serialization.dumps(['warm', 'up', 'caches'])
+
+        class Point(serialization.Serializer):
+            def __init__(self, x):
+                self.x = x
+
+            def __eq__(self, other):
+                return self.x == other.x
+
+            def __hash__(self):
+                return hash(self.x)
+
+            @classmethod
+            def serialize(cls, value):
+                return value.x
+
+            @classmethod
+            def deserialize(cls, data, version):
+                return cls(data)
+
+        value = {'a': Point(1)}
+        assert serialization.loads(serialization.dumps(value)) == value
+        assert serialization.compact_deserialize(serialization.compact_serialize(value)) == value
@@ -3,11 +3,13 @@ from io import StringIO
 import pytest
 from jinja2 import Template
 
+from flexget import plugin
 from flexget.components.series import db
 from flexget.entry import Entry
 from flexget.manager import Session, get_parser
 from flexget.task import TaskAbort
 from flexget.terminal import capture_console
+from flexget.utils.database import QueryCounter
 
 
 def age_series(**kwargs):
@@ -236,6 +238,49 @@ class TestDatabase:
         task = execute_task('progress_2')
         assert not task.accepted, 'doppelgangers accepted'
 
+    def test_release_index(self, execute_task):
+        """Series plugin: releases are resolved from a prefetched index without querying."""
+        task = execute_task('progress_1')
+        entry = task.find_entry(title='Progress.S01E20.720p-FlexGet')
+        existing = entry['series_parser']
+        new = plugin.get('parsing', 'tests').parse_series(
+            'Progress.S01E21.720p-FlexGet', name='Progress'
+        )
+        with Session() as session:
+            series = session.query(db.Series).filter(db.Series.name == 'Progress').one()
+            index = db.ReleaseIndex()
+            index.prefetch(session, [(series, [existing, new])])
+            with QueryCounter(session) as queries:
+                existing_releases = db.store_parser(session, existing, series=series, index=index)
+                new_releases = db.store_parser(session, new, series=series, index=index)
+                assert db.store_parser(session, new, series=series, index=index) == new_releases
+            assert queries.count == 0, 'releases should be resolved from the index'
+            assert [r.id for r in existing_releases] == entry['series_releases']
+            session.flush()
+            assert new_releases[0].id is not None
+            assert new_releases[0].episode.series is series
+
+    def test_release_index_prefetch_queries(self, execute_task):
+        """Series plugin: the prefetch query count does not grow with the number of series."""
+        task = execute_task('progress_1')
+        existing = task.find_entry(title='Progress.S01E20.720p-FlexGet')['series_parser']
+        parsing = plugin.get('parsing', 'tests')
+        with Session() as session:
+            series = session.query(db.Series).filter(db.Series.name == 'Progress').one()
+            parsers = [(series, [existing])]
+            for name in ('Other 1', 'Other 2', 'Other 3'):
+                other = db.Series()
+                other.name = name
+                session.add(other)
+                parsers.append((other, [parsing.parse_series(f'{name}.S01E01', name=name)]))
+            session.flush()
+            index = db.ReleaseIndex()
+            with QueryCounter(session) as queries:
+                index.prefetch(session, parsers)
+            # One query for the episodes, one for their releases
+            assert queries.count == 2
+            assert list(index.episodes) == [(series.id, existing.identifier)]
+
 
 class TestFilterSeries:
     config = """
@@ -1,4 +1,7 @@
-from flexget.utils.simple_persistence import SimplePersistence
+import sqlalchemy
+
+from flexget.manager import Session
+from flexget.utils.simple_persistence import SimpleKeyValue, SimplePersistence
 
 
 class TestSimplePersistence:
@@ -24,3 +27,39 @@ class TestSimplePersistence:
         # Make sure it commits and actually persists
         persist = SimplePersistence('testplugin')
         assert persist['aoeu'] == 'test'
+
+    def test_flush_only_changes(self, manager):
+        queries = []
+
+        def count_query(conn, cursor, statement, *args):
+            queries.append(statement)
+
+        persist = SimplePersistence('testplugin')
+        persist['value'] = {'a': 1}
+        persist['other'] = 'unchanged'
+        SimplePersistence.flush()
+
+        sqlalchemy.event.listen(manager.engine, 'before_cursor_execute', count_query)
+        try:
+            SimplePersistence.flush()
+            assert not queries, 'nothing should be written when nothing changed'
+            # Changes made in place are detected as well
+            persist['value']['a'] = 2
+            del persist['other']
+            SimplePersistence.flush()
+            assert queries
+        finally:
+            sqlalchemy.event.remove(manager.engine, 'before_cursor_execute', count_query)
+
+        SimplePersistence.class_store.clear()
+        SimplePersistence.load()
+        persist = SimplePersistence('testplugin')
+        assert persist['value'] == {'a': 2}
+        assert 'other' not in persist.store
+        with Session() as session:
+            keys = (
+                session.query(SimpleKeyValue.key)
+                .filter(SimpleKeyValue.plugin == 'testplugin')
+                .filter(SimpleKeyValue.key.in_(['value', 'other']))
+            )
+            assert [key for (key,) in keys] == ['value']
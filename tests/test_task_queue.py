@@ -0,0 +1,117 @@
+import itertools
+import threading
+import time
+
+from flexget.task_queue import TaskQueue, task_plugin_names
+
+
+class FakeManager:
+    def __init__(self, config=None):
+        self.config = config or {}
+
+
+class FakeTask:
+    _counter = itertools.count()
+
+    def __init__(self, name, config=None, manager=None, priority=0, duration=0.2, log=None):
+        self.name = name
+        self.config = config or {}
+        self.manager = manager or FakeManager()
+        self.priority = priority
+        self._count = next(self._counter)
+        self.duration = duration
+        self.log = log if log is not None else []
+        self.finished = threading.Event()
+
+    def __lt__(self, other):
+        return (self.priority, self._count) < (other.priority, other._count)
+
+    def execute(self):
+        self.log.append(('start', self.name, time.monotonic()))
+        time.sleep(self.duration)
+        self.log.append(('end', self.name, time.monotonic()))
+        self.finished.set()
+
+
+def run_queue(task_queue, tasks):
+    for task in tasks:
+        task_queue.put(task)
+    task_queue.start()
+    task_queue.shutdown(finish_queue=True)
+    task_queue.wait()
+
+
+def overlapping(log, first, second):
+    times = {(kind, name): at for kind, name, at in log}
+    return (
+        times['start', first] < times['end', second]
+        and times['start', second] < times['end', first]
+    )
+
+
+class TestTaskQueue:
+    def test_single_worker_runs_in_priority_order(self):
+        log = []
+        tasks = [
+            FakeTask('low', priority=5, duration=0, log=log),
+            FakeTask('high', priority=1, duration=0, log=log),
+        ]
+        run_queue(TaskQueue(), tasks)
+        assert [name for kind, name, _ in log if kind == 'start'] == ['high', 'low']
+
+    def test_concurrent_workers(self):
+        log = []
+        task_queue = TaskQueue()
+        task_queue.configure({'max_concurrent_tasks': 2})
+        run_queue(task_queue, [FakeTask('a', log=log), FakeTask('b', log=log)])
+        assert overlapping(log, 'a', 'b')
+
+    def test_exclusive_plugins_are_serialized(self):
+        log = []
+        task_queue = TaskQueue()
+        task_queue.configure({'max_concurrent_tasks': 3, 'exclusive_plugins': ['deluge']})
+        manager = FakeManager({'templates': {'client': {'deluge': {}}}})
+        tasks = [
+            FakeTask('a', {'deluge': {}}, manager, log=log),
+            FakeTask('b', {'template': 'client'}, manager, log=log),
+            FakeTask('c', {'transmission': {}}, manager, log=log),
+        ]
+        run_queue(task_queue, tasks)
+        assert not overlapping(log, 'a', 'b')
+        assert overlapping(log, 'a', 'c')
+
+    def test_workers_state(self):
+        task_queue = TaskQueue()
+        task_queue.configure({'max_concurrent_tasks': 2})
+        task = FakeTask('a', duration=0.5)
+        task_queue.put(task)
+        task_queue.start()
+        try:
+            for _ in range(50):
+                if task_queue.running_tasks:
+                    break
+                time.sleep(0.01)
+            assert task_queue.running_tasks == [task]
+            assert task_queue.current_task is task
+        finally:
+            task_queue.shutdown(finish_queue=True)
+            task_queue.wait()
+        assert task_queue.running_tasks == []
+
+
+def test_task_plugin_names():
+    manager = FakeManager({
+        'templates': {
+            'global': {'seen': {}},
+            'tv': {'series': [], 'template': 'client'},
+            'client': {'deluge': {}},
+        }
+    })
+    assert task_plugin_names(FakeTask('a', {'template': 'tv'}, manager)) == {
+        'template',
+        'seen',
+        'series',
+        'deluge',
+    }
+    assert task_plugin_names(FakeTask('b', {'template': ['no_global']}, manager)) == {'template'}
+    assert task_plugin_names(FakeTask('c', {'mock': []}, manager)) == {'mock', 'seen'}
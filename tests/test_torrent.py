@@ -1,9 +1,22 @@
+import binascii
+import hashlib
+import socketserver
+import struct
+import threading
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
 import pytest
+from requests import Session as RequestsSession
 
-from flexget.utils.bittorrent import Torrent
+from flexget.utils.bittorrent import Torrent, bdecode, bencode
+
+# Blocked for all tests, saved here to talk to the local fake trackers
+requests_session_request = RequestsSession.request
+http_connection_request = HTTPConnection.request
 
 
 class TestInfoHash:
@@ -45,6 +58,48 @@ class TestInfoHash:
         )
 
 
+class TestBdecode:
+    def test_round_trip(self):
+        data = {
+            'announce': 'http://localhost/announce',
+            'info': {
+                'name': 'ünïcode',
+                'pieces': bytes(range(256)) * 2,
+                'files': [{'length': i, 'path': ['dir', f'file{i}']} for i in range(50)],
+            },
+            'negative': -5,
+            'list': [1, [b'\xff\xfe', {}], []],
+        }
+        assert bdecode(bencode(data)) == data
+
+    @pytest.mark.parametrize(
+        'data', [b'', b'i1', b'i1.5e', b'i 1e', b'5:abc', b'd1:ae', b'l', b'x', b'i1ei2e']
+    )
+    def test_invalid(self, data):
+        with pytest.raises(SyntaxError):
+            bdecode(data)
+
+    def test_info_hash_from_original_data(self):
+        # Keys out of order, re-encoding the info dict would produce a different hash
+        content = b'd4:infod4:name4:test6:lengthi5e12:piece lengthi1e6:pieces3:abcee'
+        torrent = Torrent(content)
+        expected = hashlib.sha1(content[7:-1]).hexdigest().upper()
+        assert torrent.info_hash == expected
+        torrent.modified = True
+        assert torrent.info_hash != expected
+
+    def test_lazy_pieces(self):
+        content = Path('test.torrent').read_bytes()
+        eager = Torrent(content)
+        lazy = Torrent(content, load_pieces=False)
+        assert 'pieces' not in lazy.content['info']
+        assert lazy.pieces == eager.content['info']['pieces']
+        assert lazy.info_hash == eager.info_hash
+        assert lazy.size == eager.size
+        assert lazy.encode() == eager.encode()
+        assert lazy.content['info']['pieces'] == eager.content['info']['pieces']
+
+
 class TestSeenInfoHash:
     config = """
         tasks:
@@ -311,15 +366,190 @@ class TestTorrentAlive:
         assert task._rerun_count == 0, 'Torrent should have been accepted without rerun.'
 
     def test_torrent_alive_udp_invalid_port(self):
-        from flexget.components.bittorrent.torrent_alive import get_udp_seeds
-
-        assert get_udp_seeds('udp://[2001::1]/announce', 'HASH') == 0
-        assert get_udp_seeds('udp://[::1]/announce', 'HASH') == 0
-        assert get_udp_seeds('udp://["2100::1"]:-1/announce', 'HASH') == 0
-        assert get_udp_seeds('udp://127.0.0.1/announce', 'HASH') == 0
-        assert get_udp_seeds('udp://127.0.0.1:-1/announce', 'HASH') == 0
-        assert get_udp_seeds('udp://127.0.0.1:PORT/announce', 'HASH') == 0
-        assert get_udp_seeds('udp://127.0.0.1:65536/announce', 'HASH') == 0
+        from flexget.components.bittorrent.torrent_alive import scrape_udp
+
+        assert scrape_udp('udp://[2001::1]/announce', ['HASH']) == {}
+        assert scrape_udp('udp://[::1]/announce', ['HASH']) == {}
+        assert scrape_udp('udp://["2100::1"]:-1/announce', ['HASH']) == {}
+        assert scrape_udp('udp://127.0.0.1/announce', ['HASH']) == {}
+        assert scrape_udp('udp://127.0.0.1:-1/announce', ['HASH']) == {}
+        assert scrape_udp('udp://127.0.0.1:PORT/announce', ['HASH']) == {}
+        assert scrape_udp('udp://127.0.0.1:65536/announce', ['HASH']) == {}
+
+
+class FakeUDPTracker(socketserver.BaseRequestHandler):
+    """Answers BEP 15 connect and scrape requests with the seeds in `server.seeds`."""
+
+    def handle(self):
+        data, sock = self.request
+        connection_id, action, transaction_id = struct.unpack(b'>QLL', data[:16])
+        self.server.actions.append(action)
+        if action == 0:
+            # Every connect hands out a new id, only the latest one is accepted
+            self.server.connection_id += 1
+            sock.sendto(
+                struct.pack(b'>LLQ', 0, transaction_id, self.server.connection_id),
+                self.client_address,
+            )
+            return
+        if connection_id != self.server.connection_id:
+            sock.sendto(
+                struct.pack(b'>LL', 3, transaction_id) + b'Connection ID mismatch',
+                self.client_address,
+            )
+            return
+        response = struct.pack(b'>LL', 2, transaction_id)
+        for offset in range(16, len(data), 20):
+            info_hash = binascii.hexlify(data[offset : offset + 20]).decode().upper()
+            response += struct.pack(b'>LLL', self.server.seeds.get(info_hash, 0), 0, 0)
+        sock.sendto(response, self.client_address)
+
+
+class FakeHTTPTracker(BaseHTTPRequestHandler):
+    """Answers scrape requests with the seeds in `server.seeds`, for only the first torrent if `server.single`."""
+
+    def do_GET(self):
+        if urlsplit(self.path).path.startswith('/dead/'):
+            self.send_error(500)
+            return
+        query = parse_qs(urlsplit(self.path).query, encoding='latin-1')
+        info_hashes = [value.encode('latin-1') for value in query['info_hash']]
+        self.server.requests.append(len(info_hashes))
+        if self.server.single:
+            info_hashes = info_hashes[:1]
+        files = {
+            info_hash: {
+                'complete': self.server.seeds.get(binascii.hexlify(info_hash).decode().upper(), 0)
+            }
+            for info_hash in info_hashes
+            if binascii.hexlify(info_hash).decode().upper() in self.server.seeds
+        }
+        body = bencode({'files': files})
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def trackers(monkeypatch, no_requests):
+    from flexget.components.bittorrent import torrent_alive
+
+    # Requests are blocked for all tests, the fake tracker is local though
+    monkeypatch.setattr(RequestsSession, 'request', requests_session_request)
+    monkeypatch.setattr(HTTPConnection, 'request', http_connection_request)
+    monkeypatch.setattr(torrent_alive, 'scrape_cache', torrent_alive.ScrapeCache())
+    monkeypatch.setattr(torrent_alive, '_udp_connections', {})
+    udp = socketserver.UDPServer(('127.0.0.1', 0), FakeUDPTracker)
+    http = HTTPServer(('127.0.0.1', 0), FakeHTTPTracker)
+    udp.actions, http.requests, http.single = [], [], False
+    udp.connection_id = 1233
+    udp.seeds = http.seeds = {f'{i:040X}': i for i in range(1, 101)}
+    for server in (udp, http):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield (
+        f'udp://127.0.0.1:{udp.server_address[1]}/announce',
+        f'http://127.0.0.1:{http.server_address[1]}/announce',
+        udp,
+        http,
+    )
+    for server in (udp, http):
+        server.shutdown()
+        server.server_close()
+
+
+class TestTorrentAliveScrape:
+    config = """
+        tasks:
+          test:
+            mock:
+              - {title: 'torrent 1', file: '__tmp__/1.torrent'}
+              - {title: 'torrent 2', file: '__tmp__/2.torrent'}
+              - {title: 'torrent 3', file: '__tmp__/3.torrent'}
+            accept_all: yes
+            disable: [seen, seen_info_hash]
+            torrent_alive: 2
+    """
+
+    def test_udp_batched(self, trackers):
+        from flexget.components.bittorrent.torrent_alive import scrape_udp
+
+        udp_url, _, udp, _ = trackers
+        info_hashes = [*udp.seeds, f'{0xFFF:040X}']
+        seeds = scrape_udp(udp_url, info_hashes)
+        assert seeds == {**udp.seeds, f'{0xFFF:040X}': 0}
+        # One connect, then 74 torrents per scrape
+        assert udp.actions == [0, 2, 2]
+        # The connection id is reused
+        assert scrape_udp(udp_url, info_hashes[:1]) == {info_hashes[0]: 1}
+        assert udp.actions == [0, 2, 2, 2]
+
+    def test_udp_stale_connection_id(self, trackers):
+        from flexget.components.bittorrent import torrent_alive
+
+        udp_url, _, udp, _ = trackers
+        info_hash = next(iter(udp.seeds))
+        assert torrent_alive.scrape_udp(udp_url, [info_hash]) == {info_hash: 1}
+        # Another client got a new connection id from the tracker, ours is rejected
+        udp.connection_id += 1
+        assert torrent_alive.scrape_udp(udp_url, [info_hash]) == {info_hash: 1}
+        # The rejected scrape is retried with a new connection id
+        assert udp.actions == [0, 2, 2, 0, 2]
+
+    def test_unanswered_not_cached(self, trackers):
+        from flexget.components.bittorrent import torrent_alive
+
+        _, http_url, _, http = trackers
+        info_hash = next(iter(http.seeds))
+        dead_url = f'http://127.0.0.1:{http.server_address[1]}/dead/announce'
+        http.seeds = {}
+        # The tracker answers 0 seeds, while the dead one fails
+        assert torrent_alive.get_seeds({info_hash: [http_url, dead_url]}) == {info_hash: 0}
+        assert torrent_alive.scrape_cache.get(http_url, info_hash) == 0
+        assert torrent_alive.scrape_cache.get(dead_url, info_hash) is None
+
+    def test_http_batched(self, trackers):
+        from flexget.components.bittorrent.torrent_alive import scrape_http
+
+        _, http_url, _, http = trackers
+        assert scrape_http(http_url, list(http.seeds)) == http.seeds
+        assert http.requests == [50, 50]
+
+    def test_http_single_scrape_fallback(self, trackers):
+        from flexget.components.bittorrent.torrent_alive import scrape_http
+
+        _, http_url, _, http = trackers
+        http.single = True
+        info_hashes = list(http.seeds)[:3]
+        assert scrape_http(http_url, info_hashes) == {h: http.seeds[h] for h in info_hashes}
+        assert http.requests == [3, 1, 1]
+
+    def test_task(self, trackers, execute_task, tmp_path):
+        udp_url, http_url, udp, http = trackers
+        udp.seeds, http.seeds = {}, {}
+        for i in (1, 2, 3):
+            content = {
+                'announce-list': [[udp_url], [http_url]],
+                'info': {'name': f'torrent {i}', 'piece length': 1, 'pieces': b'', 'length': i},
+            }
+            info_hash = Torrent(bencode(content)).info_hash
+            # The highest seeds of any tracker count
+            udp.seeds[info_hash] = 1
+            if i > 1:
+                http.seeds[info_hash] = i
+            (tmp_path / f'{i}.torrent').write_bytes(bencode(content))
+
+        task = execute_task('test')
+        assert [e['title'] for e in task.accepted] == ['torrent 2', 'torrent 3']
+        assert udp.actions == [0, 2]
+        assert http.requests == [3]
+        # Results are cached for other tasks
+        execute_task('test')
+        assert udp.actions == [0, 2]
+        assert http.requests == [3]
 
 
 class TestRtorrentMagnet: